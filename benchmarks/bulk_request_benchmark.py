@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (c) 2018 Keijack Wu
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+"""
+Compare the throughput of `do_services` with calling `do_service` one request after another.
+
+    python -m benchmarks.bulk_request_benchmark --requests 500 --latency 0.02
+
+Both the eureka server and the instances of the application are simulated by a local http server, every service call
+takes `--latency` seconds in the server.
+"""
+
+import argparse
+import asyncio
+import threading
+import time
+
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from py_eureka_client.eureka_client import EurekaClient, ServiceRequest
+
+
+_INSTANCE_XML = """<instance><instanceId>bench-{idx}</instanceId><hostName>127.0.0.1</hostName><app>BENCH</app>
+<ipAddr>127.0.0.1</ipAddr><status>UP</status><overriddenstatus>UNKNOWN</overriddenstatus>
+<port enabled="true">{port}</port><securePort enabled="false">443</securePort><countryId>1</countryId>
+<dataCenterInfo class="com.netflix.appinfo.InstanceInfo$DefaultDataCenterInfo"><name>MyOwn</name></dataCenterInfo>
+<leaseInfo><renewalIntervalInSecs>30</renewalIntervalInSecs><durationInSecs>90</durationInSecs></leaseInfo>
+<metadata><zone>default</zone></metadata><vipAddress>bench</vipAddress>
+<lastUpdatedTimestamp>1700000000000</lastUpdatedTimestamp><lastDirtyTimestamp>1700000000000</lastDirtyTimestamp>
+<actionType>ADDED</actionType></instance>"""
+
+
+def serve(instances: int, latency: float) -> ThreadingHTTPServer:
+
+    class Handler(BaseHTTPRequestHandler):
+
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.startswith("/eureka/apps/"):
+                port = self.server.server_address[1]
+                body = ("<applications><versions__delta>1</versions__delta><apps__hashcode>UP_1_</apps__hashcode>"
+                        "<application><name>BENCH</name>"
+                        + "".join(_INSTANCE_XML.format(idx=idx, port=port) for idx in range(instances))
+                        + "</application></applications>").encode()
+            else:
+                time.sleep(latency)
+                body = b"ok"
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--instances", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--concurrency", type=int, default=64)
+    args = parser.parse_args()
+
+    server = serve(args.instances, args.latency)
+    loop = asyncio.new_event_loop()
+    client = EurekaClient(eureka_server=f"http://127.0.0.1:{server.server_address[1]}/eureka",
+                          should_register=False, embedded_mode=True, renewal_interval_in_secs=300)
+    loop.run_until_complete(client.start())
+
+    start = time.monotonic()
+    for _ in range(args.requests):
+        loop.run_until_complete(client.do_service("BENCH", "/svc"))
+    sequential = time.monotonic() - start
+
+    async def bulk():
+        requests = [ServiceRequest("BENCH", "/svc") for _ in range(args.requests)]
+        return [res async for res in client.do_services(requests, concurrency=args.concurrency,
+                                                           concurrency_per_app=args.concurrency)]
+
+    start = time.monotonic()
+    results = loop.run_until_complete(bulk())
+    concurrent = time.monotonic() - start
+    assert all(res.ok for res in results), [res.error for res in results if not res.ok][:1]
+
+    print(f"{'':<14}{'seconds':>10}{'requests/s':>14}")
+    print(f"{'sequential':<14}{sequential:>10.2f}{args.requests / sequential:>14.0f}")
+    print(f"{'do_services':<14}{concurrent:>10.2f}{args.requests / concurrent:>14.0f}")
+    loop.run_until_complete(client.stop())
+    loop.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (c) 2018 Keijack Wu
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+
+"""
+Compare the CPU time a client spends on polling an unchanged delta, parsing every response against skipping
+the responses whose fingerprint is not changed.
+
+    python -m benchmarks.delta_fingerprint_benchmark --apps 500 --instances 4 --polls 50
+
+The delta is served by a local http server, with `--etag` it sends an `ETag` and answers `304` to a matched
+`If-None-Match` just like a caching proxy in front of the eureka server does.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import threading
+import time
+
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from py_eureka_client.eureka_basic import get_delta, get_delta_if_changed
+from benchmarks.registry_snapshot_benchmark import build_registry_xml
+
+
+def serve(body: bytes, etag: bool) -> ThreadingHTTPServer:
+    tag = f'"{hashlib.md5(body).hexdigest()}"'
+
+    class Handler(BaseHTTPRequestHandler):
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            if etag and self.headers.get("If-None-Match") == tag:
+                self.send_response(304)
+                self.send_header("ETag", tag)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/xml")
+            self.send_header("Content-Length", str(len(body)))
+            if etag:
+                self.send_header("ETag", tag)
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--apps", type=int, default=500)
+    parser.add_argument("--instances", type=int, default=4)
+    parser.add_argument("--polls", type=int, default=50)
+    parser.add_argument("--etag", action="store_true")
+    args = parser.parse_args()
+
+    body = build_registry_xml(args.apps, args.instances)
+    server = serve(body, args.etag)
+    url = f"http://127.0.0.1:{server.server_address[1]}/eureka/"
+    loop = asyncio.new_event_loop()
+
+    async def poll_and_parse():
+        for _ in range(args.polls):
+            await get_delta(url)
+
+    async def poll_with_fingerprint():
+        fingerprint = ""
+        for _ in range(args.polls):
+            _, fingerprint = await get_delta_if_changed(url, fingerprint=fingerprint)
+
+    def cpu_time(coro_fun) -> float:
+        start = time.process_time()
+        loop.run_until_complete(coro_fun())
+        return time.process_time() - start
+
+    parse_cost = cpu_time(poll_and_parse)
+    skip_cost = cpu_time(poll_with_fingerprint)
+    print(f"delta: {args.apps} apps x {args.instances} instances, xml {len(body) / 1024:.0f} KiB, "
+          f"{args.polls} polls, {'etag' if args.etag else 'body digest'}")
+    print(f"parse every delta  : {parse_cost * 1000:8.1f} ms cpu ({parse_cost / args.polls * 1000:.2f} ms/poll)")
+    print(f"skip unchanged     : {skip_cost * 1000:8.1f} ms cpu ({skip_cost / args.polls * 1000:.2f} ms/poll)")
+    print(f"saved              : {(1 - skip_cost / parse_cost) * 100:8.1f} %")
+    server.shutdown()
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (c) 2018 Keijack Wu
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+
+"""
+Measure how long each load balance strategy takes to choose an instance.
+
+    python -m benchmarks.load_balancer_benchmark --instances 10 100 1000
+
+`rebuilt` is the cost when the instances of the application change before every selection, so the state of the
+strategy is rebuilt each time, it shows what the cached state saves.
+"""
+
+import argparse
+import timeit
+
+from py_eureka_client import HA_STRATEGY_RANDOM, HA_STRATEGY_STICK, HA_STRATEGY_OTHER
+from py_eureka_client import HA_STRATEGY_ROUND_ROBIN, HA_STRATEGY_WEIGHTED_RANDOM, HA_STRATEGY_LEAST_OUTSTANDING
+from py_eureka_client import HA_STRATEGY_LEAST_LATENCY
+from py_eureka_client.eureka_basic import Application, Instance
+from py_eureka_client.load_balancer import get_strategy
+
+_STRATEGIES = {
+    "random": HA_STRATEGY_RANDOM,
+    "stick": HA_STRATEGY_STICK,
+    "other": HA_STRATEGY_OTHER,
+    "round robin": HA_STRATEGY_ROUND_ROBIN,
+    "weighted random": HA_STRATEGY_WEIGHTED_RANDOM,
+    "least outstanding": HA_STRATEGY_LEAST_OUTSTANDING,
+    "least latency (p2c)": HA_STRATEGY_LEAST_LATENCY
+}
+
+
+def build_app(instances: int) -> Application:
+    app = Application(name="BENCH")
+    for idx in range(instances):
+        app.add_instance(Instance(instanceId=f"bench-{idx}", app="BENCH", status="UP",
+                                  metadata={"weight": str(1 + idx % 5)}))
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--instances", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+
+    print(f"{'strategy':<20}{'instances':>10}{'cached (us)':>14}{'rebuilt (us)':>14}")
+    for instances in args.instances:
+        app = build_app(instances)
+        candidates = app.up_instances
+        for name, ha_strategy in _STRATEGIES.items():
+            strategy = get_strategy(ha_strategy)
+
+            def choose():
+                instance = strategy.choose(app, candidates, [], "/bench")
+                strategy.on_request_start(app.name, instance)
+                strategy.on_request_end(app.name, instance, 0.01)
+
+            def change_and_choose():
+                app.update_instance(candidates[0])
+                choose()
+
+            cached = min(timeit.repeat(choose, number=args.number, repeat=3)) / args.number
+            rebuilt = min(timeit.repeat(change_and_choose, number=args.number // 10, repeat=3)) / (args.number // 10)
+            print(f"{name:<20}{instances:>10}{cached * 1e6:>14.2f}{rebuilt * 1e6:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
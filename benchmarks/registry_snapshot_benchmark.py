@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (c) 2018 Keijack Wu
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+"""
+Compare the time to get the registry from a snapshot file with the time to pull it from an eureka server.
+
+    python -m benchmarks.registry_snapshot_benchmark --apps 3000 --instances 3
+
+The eureka server is simulated by a local http server that returns a prepared registry, so the network
+time here is the best case, a real eureka server across the network will be slower.
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import threading
+import time
+
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from py_eureka_client.eureka_basic import get_applications
+from py_eureka_client.registry_snapshot import applications_to_dict, save_snapshot, load_snapshot
+
+
+_INSTANCE_XML = """<instance><instanceId>{app}-{idx}</instanceId><hostName>host-{idx}.{app}</hostName><app>{app}</app>
+<ipAddr>10.0.{idx}.1</ipAddr><status>UP</status><overriddenstatus>UNKNOWN</overriddenstatus>
+<port enabled="true">8080</port><securePort enabled="false">443</securePort><countryId>1</countryId>
+<dataCenterInfo class="com.netflix.appinfo.InstanceInfo$DefaultDataCenterInfo"><name>MyOwn</name></dataCenterInfo>
+<leaseInfo><renewalIntervalInSecs>30</renewalIntervalInSecs><durationInSecs>90</durationInSecs>
+<registrationTimestamp>1700000000000</registrationTimestamp><lastRenewalTimestamp>1700000000000</lastRenewalTimestamp>
+<evictionTimestamp>0</evictionTimestamp><serviceUpTimestamp>1700000000000</serviceUpTimestamp></leaseInfo>
+<metadata><management.port>8080</management.port><zone>zone1</zone></metadata>
+<homePageUrl>http://host-{idx}.{app}:8080/</homePageUrl><statusPageUrl>http://host-{idx}.{app}:8080/info</statusPageUrl>
+<healthCheckUrl>http://host-{idx}.{app}:8080/health</healthCheckUrl><vipAddress>{app}</vipAddress>
+<secureVipAddress>{app}</secureVipAddress><isCoordinatingDiscoveryServer>false</isCoordinatingDiscoveryServer>
+<lastUpdatedTimestamp>1700000000000</lastUpdatedTimestamp><lastDirtyTimestamp>1700000000000</lastDirtyTimestamp>
+<actionType>ADDED</actionType></instance>"""
+
+
+def build_registry_xml(apps: int, instances: int) -> bytes:
+    parts = ["<applications><versions__delta>1</versions__delta>",
+             f"<apps__hashcode>UP_{apps * instances}_</apps__hashcode>"]
+    for a in range(apps):
+        app = f"APP-{a}"
+        parts.append(f"<application><name>{app}</name>")
+        parts.extend(_INSTANCE_XML.format(app=app, idx=i) for i in range(instances))
+        parts.append("</application>")
+    parts.append("</applications>")
+    return "".join(parts).encode()
+
+
+def serve(body: bytes) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "application/xml")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def best_of(runs: int, fun) -> float:
+    costs = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fun()
+        costs.append(time.perf_counter() - start)
+    return min(costs)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--apps", type=int, default=3000)
+    parser.add_argument("--instances", type=int, default=3)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    body = build_registry_xml(args.apps, args.instances)
+    server = serve(body)
+    url = f"http://127.0.0.1:{server.server_address[1]}/eureka/"
+    loop = asyncio.new_event_loop()
+
+    def pull():
+        return loop.run_until_complete(get_applications(url))
+
+    applications = pull()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "registry.snapshot")
+        save_snapshot(path, applications_to_dict(applications))
+        save_cost = best_of(args.runs, lambda: save_snapshot(path, applications_to_dict(applications)))
+        pull_cost = best_of(args.runs, pull)
+        load_cost = best_of(args.runs, lambda: load_snapshot(path))
+        print(f"registry: {args.apps} apps x {args.instances} instances, "
+              f"xml {len(body) / 1024:.0f} KiB, snapshot {os.path.getsize(path) / 1024:.0f} KiB")
+        print(f"network pull   : {pull_cost * 1000:8.1f} ms")
+        print(f"snapshot load  : {load_cost * 1000:8.1f} ms ({pull_cost / load_cost:.1f}x faster)")
+        print(f"snapshot save  : {save_cost * 1000:8.1f} ms")
+    server.shutdown()
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (c) 2018 Keijack Wu
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+"""
+Measure the cost of choosing an instance and building the url of a service on it for one request.
+
+    python -m benchmarks.service_url_benchmark --instances 10 100 1000
+
+`per request` derives the schema, port and host of the instance for every request as it was done before, `precomputed`
+appends the service path to the base url that is built when the instance is added to the registry.
+"""
+
+import argparse
+import timeit
+
+from py_eureka_client import HA_STRATEGY_RANDOM
+from py_eureka_client.eureka_basic import Application, Instance, PortWrapper
+from py_eureka_client.load_balancer import get_strategy
+
+
+def generate_service_url(instance: Instance, prefer_ip, prefer_https):
+    schema = "http"
+    port = 0
+    if instance.port.port and not instance.securePort.enabled:
+        schema = "http"
+        port = instance.port.port
+    elif not instance.port.port and instance.securePort.enabled:
+        schema = "https"
+        port = instance.securePort.port
+    elif instance.port.port and instance.securePort.enabled:
+        if prefer_https:
+            schema = "https"
+            port = instance.securePort.port
+        else:
+            schema = "http"
+            port = instance.port.port
+    else:
+        assert False, "generate_service_url error: No port is available"
+
+    host = instance.ipAddr if prefer_ip else instance.hostName
+
+    if (schema == "http" and port == 80) or (schema == 'https' and port == 443):
+        return f"{schema}://{host}/"
+    else:
+        return f"{schema}://{host}:{port}/"
+
+
+def build_app(instances: int) -> Application:
+    app = Application(name="BENCH")
+    for idx in range(instances):
+        app.add_instance(Instance(instanceId=f"bench-{idx}", app="BENCH", status="UP",
+                                  ipAddr=f"10.0.{idx // 256}.{idx % 256}", hostName=f"bench-{idx}.local",
+                                  port=PortWrapper(port=8080, enabled=True), securePort=PortWrapper(port=8443, enabled=True)))
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--instances", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--number", type=int, default=50000)
+    args = parser.parse_args()
+
+    service = "/api/v1/orders"
+    path = service[1:]
+    print(f"{'instances':>10}{'per request (us)':>20}{'precomputed (us)':>20}{'saved':>10}")
+    for instances in args.instances:
+        app = build_app(instances)
+        candidates = app.up_instances
+        strategy = get_strategy(HA_STRATEGY_RANDOM)
+
+        def per_request():
+            instance = strategy.choose(app, candidates, [], service)
+            url = generate_service_url(instance, True, False)
+            if service.startswith("/"):
+                url = url + service[1:]
+            else:
+                url = url + service
+            return url
+
+        def precomputed():
+            return strategy.choose(app, candidates, [], service).base_url(True, False) + path
+
+        assert per_request().rsplit("/", 3)[1:] == precomputed().rsplit("/", 3)[1:]
+        before = min(timeit.repeat(per_request, number=args.number, repeat=3)) / args.number
+        after = min(timeit.repeat(precomputed, number=args.number, repeat=3)) / args.number
+        print(f"{instances:>10}{before * 1e6:>20.2f}{after * 1e6:>20.2f}{(1 - after / before) * 100:>9.0f}%")
+
+
+if __name__ == "__main__":
+    main()
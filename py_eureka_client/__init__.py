@@ -53,6 +53,39 @@ HA_STRATEGY_STICK: int = 2
 This is for the DiscoveryClient, when this strategy is set, get_service_url will always return a new instance if any other instances are up
 """
 HA_STRATEGY_OTHER: int = 3
+"""
+This is for the DiscoveryClient, when this strategy is set, the UP instances will be chosen one after another
+"""
+HA_STRATEGY_ROUND_ROBIN: int = 4
+"""
+This is for the DiscoveryClient, when this strategy is set, the UP instances will be chosen randomly by the `weight` in their metadata
+"""
+HA_STRATEGY_WEIGHTED_RANDOM: int = 5
+"""
+This is for the DiscoveryClient, when this strategy is set, the UP instance with the fewest requests in flight will be chosen
+"""
+HA_STRATEGY_LEAST_OUTSTANDING: int = 6
+"""
+This is for the DiscoveryClient, when this strategy is set, two UP instances will be picked randomly and the one with the
+lower latency and fewer requests in flight will be chosen
+"""
+HA_STRATEGY_LEAST_LATENCY: int = 7
+"""
+This is for the DiscoveryClient, when this strategy is set, the requests with the same `hash_key` will go to the same UP instance,
+and only a few keys move to other instances when the instances are added or removed
+"""
+HA_STRATEGY_CONSISTENT_HASH: int = 8
+
+"""
+This is for the eureka server connection, when this mode is set, the eureka servers will be tried one after another.
+This is the default mode
+"""
+FAILOVER_SEQUENTIAL: int = 1
+"""
+This is for the eureka server connection, when this mode is set, the next eureka server will be tried when the previous one
+fails or does not respond in a short delay, the first success wins and the others are cancelled.
+"""
+FAILOVER_HEDGED: int = 2
 
 """
 The error types that will send back to on_error callback function
@@ -81,6 +114,34 @@ Default configurations
 _DEFAULT_ENCODING = "utf-8"
 _DEFAUTL_ZONE = "default"
 """
+Default heartbeat scheduler settings
+"""
+_HEARTBEAT_JITTER_RATIO = 0.0
+_HEARTBEAT_EXPONENTIAL_BACKOFF_BOUND = 10
+"""
+Default hedged failover settings
+"""
+_FAILOVER_HEDGE_DELAY_IN_SECS = 0.5
+_FAILOVER_DEADLINE_IN_SECS = 10
+"""
+Default fan out settings, when calling all the instances of an application
+"""
+_FAN_OUT_CONCURRENCY = 8
+"""
+Default bulk request settings
+"""
+_BULK_CONCURRENCY = 64
+_BULK_CONCURRENCY_PER_APP = 16
+_BULK_WINDOW_FACTOR = 2
+"""
+The min interval of the registry pulls that `walk_nodes` starts when the registry is not pulled yet
+"""
+_REGISTRY_ON_DEMAND_PULL_MIN_INTERVAL_IN_SECS = 5
+"""
+Default registry snapshot settings
+"""
+_REGISTRY_SNAPSHOT_MAX_STALENESS_IN_SECS = 300
+"""
 The timeout seconds that all http request to the eureka server
 """
 _DEFAULT_TIME_OUT = 5
@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (c) 2018 Keijack Wu
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import asyncio
+import concurrent.futures
+import math
+
+from collections import deque
+from threading import RLock
+from typing import Deque, Dict
+
+import py_eureka_client.http_client as http_client
+from py_eureka_client.logger import get_logger
+from py_eureka_client.outlier_detection import is_node_failure
+
+
+_logger = get_logger("concurrency_limit")
+
+"""
+The algorithms that adapt the concurrency limit of an application
+"""
+CONCURRENCY_LIMIT_AIMD: str = "aimd"
+CONCURRENCY_LIMIT_GRADIENT: str = "gradient"
+
+_CONCURRENCY_LIMIT_INITIAL = 20
+_CONCURRENCY_LIMIT_MIN = 1
+_CONCURRENCY_LIMIT_MAX = 200
+_CONCURRENCY_LIMIT_QUEUE_SIZE = 0
+_CONCURRENCY_LIMIT_QUEUE_TIMEOUT_IN_SECS = 1
+_AIMD_BACKOFF_RATIO = 0.9
+_GRADIENT_SMOOTHING = 0.2
+_GRADIENT_TOLERANCE = 1.5
+_GRADIENT_SHORT_WINDOW = 10
+_GRADIENT_LONG_WINDOW = 100
+
+
+class ConcurrencyLimitExceeded(http_client.URLError):
+    pass
+
+
+class _AppLimit:
+
+    def __init__(self, limit: float):
+        self.limit: float = limit
+        self.in_flight: int = 0
+        self.waiters: Deque[concurrent.futures.Future] = deque()
+        self.accepted: int = 0
+        self.rejected: int = 0
+        self.dropped: int = 0
+        self.short_latency: float = 0
+        self.long_latency: float = 0
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Limits the requests in flight to each application, and adapts the limit to how the application responds, so that the
+    requests do not pile up when it slows down.
+
+    * `CONCURRENCY_LIMIT_AIMD`: the limit grows by 1 for each request that succeeds while more than half of the limit is in use,
+        and is multiplied by `0.9` when a request fails by a connection error, a timeout or a 5xx response.
+    * `CONCURRENCY_LIMIT_GRADIENT`: the limit follows the ratio of the long term average latency to the recent one, it shrinks
+        when the recent latency goes over 1.5 times of the long term one, and grows by `sqrt(limit)` when the latency is steady
+        and more than half of the limit is in use.
+
+    When the limit is reached, the request waits in a queue of `queue_size` for at most `queue_timeout_in_secs`, or fails at once
+    with `ConcurrencyLimitExceeded` if the queue is full or `queue_size` is `0`.
+    """
+
+    def __init__(self,
+                 algorithm: str = "",
+                 initial_limit: int = _CONCURRENCY_LIMIT_INITIAL,
+                 min_limit: int = _CONCURRENCY_LIMIT_MIN,
+                 max_limit: int = _CONCURRENCY_LIMIT_MAX,
+                 queue_size: int = _CONCURRENCY_LIMIT_QUEUE_SIZE,
+                 queue_timeout_in_secs: float = _CONCURRENCY_LIMIT_QUEUE_TIMEOUT_IN_SECS):
+        assert algorithm in ("", CONCURRENCY_LIMIT_AIMD, CONCURRENCY_LIMIT_GRADIENT), f"concurrency limit algorithm {algorithm} is not supported."
+        assert 0 < min_limit <= initial_limit <= max_limit, "the limits should be 0 < min_limit <= initial_limit <= max_limit"
+        self.algorithm: str = algorithm
+        self.initial_limit: int = initial_limit
+        self.min_limit: int = min_limit
+        self.max_limit: int = max_limit
+        self.queue_size: int = queue_size
+        self.queue_timeout_in_secs: float = queue_timeout_in_secs
+        self.__apps: Dict[str, _AppLimit] = {}
+        self.__lock = RLock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.algorithm != ""
+
+    def __app(self, app_name: str) -> _AppLimit:
+        if app_name not in self.__apps:
+            self.__apps[app_name] = _AppLimit(self.initial_limit)
+        return self.__apps[app_name]
+
+    async def acquire(self, app_name: str) -> None:
+        """
+        Take a slot of the application, every `acquire` must be followed by a `release`.
+        """
+        if not self.enabled:
+            return
+        with self.__lock:
+            app = self.__app(app_name)
+            if app.in_flight < int(app.limit) and not app.waiters:
+                app.in_flight += 1
+                app.accepted += 1
+                return
+            if len(app.waiters) >= self.queue_size:
+                app.rejected += 1
+                raise ConcurrencyLimitExceeded(f"{app.in_flight} requests to [{app_name}] are in flight, which reaches the limit {int(app.limit)}.")
+            waiter = concurrent.futures.Future()
+            app.waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.wrap_future(waiter), self.queue_timeout_in_secs)
+        except asyncio.TimeoutError:
+            self.__give_up(app, waiter, rejected=True)
+            raise ConcurrencyLimitExceeded(f"Wait for the concurrency limit of [{app_name}] timeout.")
+        except asyncio.CancelledError:
+            self.__give_up(app, waiter, rejected=False)
+            raise
+
+    def __give_up(self, app: _AppLimit, waiter: concurrent.futures.Future, rejected: bool) -> None:
+        with self.__lock:
+            if waiter.done() and not waiter.cancelled():
+                # The slot is handed over just before the waiter gives up.
+                self.__release_slot(app)
+                return
+            waiter.cancel()
+            if waiter in app.waiters:
+                app.waiters.remove(waiter)
+            if rejected:
+                app.rejected += 1
+
+    def __release_slot(self, app: _AppLimit) -> None:
+        while app.waiters and app.in_flight <= int(app.limit):
+            waiter = app.waiters.popleft()
+            if waiter.set_running_or_notify_cancel():
+                # The slot is passed to the waiter, so `in_flight` does not change.
+                app.accepted += 1
+                waiter.set_result(True)
+                return
+        app.in_flight -= 1
+
+    def release(self, app_name: str, latency: float, error: BaseException = None) -> None:
+        if not self.enabled:
+            return
+        with self.__lock:
+            app = self.__app(app_name)
+            dropped = error is not None and is_node_failure(error)
+            if dropped:
+                app.dropped += 1
+            in_flight = app.in_flight
+            if self.algorithm == CONCURRENCY_LIMIT_AIMD:
+                limit = self.__aimd(app, in_flight, dropped)
+            else:
+                limit = self.__gradient(app, in_flight, latency)
+            limit = min(self.max_limit, max(self.min_limit, limit))
+            if int(limit) != int(app.limit):
+                _logger.debug(f"concurrency limit of [{app_name}] changes from {int(app.limit)} to {int(limit)}.")
+            app.limit = limit
+            self.__release_slot(app)
+
+    def __aimd(self, app: _AppLimit, in_flight: int, dropped: bool) -> float:
+        if dropped:
+            return app.limit * _AIMD_BACKOFF_RATIO
+        if in_flight * 2 >= app.limit:
+            return app.limit + 1
+        return app.limit
+
+    def __gradient(self, app: _AppLimit, in_flight: int, latency: float) -> float:
+        if app.long_latency == 0:
+            app.short_latency = app.long_latency = latency
+            return app.limit
+        app.short_latency += (latency - app.short_latency) / _GRADIENT_SHORT_WINDOW
+        app.long_latency += (latency - app.long_latency) / _GRADIENT_LONG_WINDOW
+        if app.long_latency / max(app.short_latency, 1e-6) > 2:
+            # Recover fast from a slow period, otherwise the long term latency keeps the limit low for a long time.
+            app.long_latency = app.short_latency * 2
+        gradient = max(0.5, min(1.0, _GRADIENT_TOLERANCE * app.long_latency / max(app.short_latency, 1e-6)))
+        # Only grow the limit when it is used, or it grows without a bound when the application is idle.
+        queue = math.sqrt(app.limit) if in_flight * 2 >= app.limit else 0
+        new_limit = app.limit * gradient + queue
+        return app.limit * (1 - _GRADIENT_SMOOTHING) + new_limit * _GRADIENT_SMOOTHING
+
+    def snapshot(self) -> Dict[str, Dict]:
+        with self.__lock:
+            return {app_name: {
+                "limit": int(app.limit),
+                "in_flight": app.in_flight,
+                "queued": len(app.waiters),
+                "accepted": app.accepted,
+                "rejected": app.rejected,
+                "dropped": app.dropped
+            } for app_name, app in self.__apps.items()}
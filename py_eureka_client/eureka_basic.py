@@ -24,9 +24,10 @@ SOFTWARE.
 
 
 import json
+import hashlib
 
 
-from typing import Dict, List
+from typing import Dict, List, Tuple
 import xml.etree.ElementTree as ElementTree
 from threading import RLock
 from urllib.parse import quote
@@ -138,6 +139,7 @@ class Instance:
         self.lastDirtyTimestamp: int = lastDirtyTimestamp
         self.actionType: int = actionType
         self.asgName: int = asgName
+        self.__base_urls: Dict[Tuple[bool, bool], str] = {}
 
     @property
     def instanceId(self):
@@ -157,6 +159,40 @@ class Instance:
         else:
             return _DEFAUTL_ZONE
 
+    def build_base_urls(self) -> Dict[Tuple[bool, bool], str]:
+        """
+        Build the base urls of this instance, keyed by `(prefer_ip, prefer_https)`. It is called when the instance is added to or
+        updated in an application, call it again after changing the address or the ports of an instance that is already added.
+        """
+        urls = {}
+        for prefer_https in (False, True):
+            if self.port.port and not self.securePort.enabled:
+                schema, port = "http", self.port.port
+            elif not self.port.port and self.securePort.enabled:
+                schema, port = "https", self.securePort.port
+            elif self.port.port and self.securePort.enabled:
+                schema, port = ("https", self.securePort.port) if prefer_https else ("http", self.port.port)
+            else:
+                schema, port = None, 0
+            for prefer_ip in (False, True):
+                host = self.ipAddr if prefer_ip else self.hostName
+                if schema is None:
+                    urls[(prefer_ip, prefer_https)] = None
+                elif (schema == "http" and port == 80) or (schema == 'https' and port == 443):
+                    urls[(prefer_ip, prefer_https)] = f"{schema}://{host}/"
+                else:
+                    urls[(prefer_ip, prefer_https)] = f"{schema}://{host}:{port}/"
+        self.__base_urls = urls
+        return urls
+
+    def base_url(self, prefer_ip: bool = False, prefer_https: bool = False) -> str:
+        """
+        The url that the service paths of this instance are appended to, e.g. `http://10.0.0.1:8080/`.
+        """
+        url = (self.__base_urls or self.build_base_urls())[(bool(prefer_ip), bool(prefer_https))]
+        assert url is not None, "generate_service_url error: No port is available"
+        return url
+
 
 class Application:
 
@@ -169,6 +205,14 @@ class Application:
                 self.add_instance(ins)
         self.__instances_dict = {}
         self.__inst_lock = RLock()
+        self.__version = 0
+
+    @property
+    def version(self) -> int:
+        """
+        Increases every time an instance is added, updated or removed.
+        """
+        return self.__version
 
     @property
     def instances(self) -> List[Instance]:
@@ -188,18 +232,23 @@ class Application:
                 return None
 
     def add_instance(self, instance: Instance) -> None:
+        instance.build_base_urls()
         with self.__inst_lock:
             self.__instances_dict[instance.instanceId] = instance
+            self.__version += 1
 
     def update_instance(self, instance: Instance) -> None:
+        instance.build_base_urls()
         with self.__inst_lock:
             _logger.debug(f"update instance {instance.instanceId}")
             self.__instances_dict[instance.instanceId] = instance
+            self.__version += 1
 
     def remove_instance(self, instance: Instance) -> None:
         with self.__inst_lock:
             if instance.instanceId in self.__instances_dict:
                 del self.__instances_dict[instance.instanceId]
+                self.__version += 1
 
     def up_instances_in_zone(self, zone: str) -> List[Instance]:
         with self.__inst_lock:
@@ -241,6 +290,12 @@ class Applications:
             self.__applications.append(application)
             self.__application_name_dic[application.name] = application
 
+    def remove_application(self, app_name: str = "") -> None:
+        with self.__app_lock:
+            aname = app_name.upper()
+            if aname in self.__application_name_dic:
+                self.__applications.remove(self.__application_name_dic.pop(aname))
+
     def get_application(self, app_name: str = "") -> Application:
         with self.__app_lock:
             aname = app_name.upper()
@@ -361,11 +416,16 @@ def _format_url(url):
         return url + "/"
 
 
-async def _get_applications_(url, regions=[]):
+def _with_regions(url, regions=[]):
     _url = url
     if len(regions) > 0:
         _url = _url + ("&" if "?" in _url else "?") + \
             "regions=" + (",".join(regions))
+    return _url
+
+
+async def _get_applications_(url, regions=[]):
+    _url = _with_regions(url, regions)
 
     res = await http_client.http_client.urlopen(
         _url, timeout=_DEFAULT_TIME_OUT)
@@ -512,6 +572,35 @@ async def get_delta(eureka_server: str, regions: List[str] = []) -> Applications
     return res
 
 
+async def get_delta_if_changed(eureka_server: str, regions: List[str] = [], fingerprint: str = "") -> Tuple[Applications, str]:
+    """
+    Get the delta only if it is different from the one that `fingerprint` is taken from. Return `(None, fingerprint)`
+    when it is unchanged, without parsing the response.
+
+    When the eureka server sends an `ETag`, the fingerprint is the ETag and it is sent back in `If-None-Match`, so that
+    an unchanged delta costs a `304` response. Otherwise the fingerprint is a digest of the response body.
+    """
+    req = http_client.HttpRequest(_with_regions(f"{_format_url(eureka_server)}apps/delta", regions))
+    if fingerprint.startswith("etag:"):
+        req.add_header("If-None-Match", fingerprint[len("etag:"):])
+    try:
+        res = await http_client.http_client.urlopen(req, timeout=_DEFAULT_TIME_OUT)
+    except http_client.HTTPError as e:
+        if e.code == 304:
+            return None, fingerprint
+        raise
+    headers = getattr(res.raw_response, "headers", None)
+    etag = headers.get("ETag", "") if headers is not None else ""
+    body = res.body_text.encode(_DEFAULT_ENCODING)
+    if etag:
+        new_fingerprint = f"etag:{etag}"
+    else:
+        new_fingerprint = f"blake2b:{hashlib.blake2b(body, digest_size=16).hexdigest()}"
+    if new_fingerprint == fingerprint:
+        return None, fingerprint
+    return _build_applications(ElementTree.fromstring(body)), new_fingerprint
+
+
 async def get_vip(eureka_server: str, vip: str, regions: List[str] = []) -> Applications:
     res = await _get_applications_(f"{_format_url(eureka_server)}vips/{vip}", regions)
     return res
@@ -24,18 +24,21 @@ SOFTWARE.
 
 
 import asyncio
+import concurrent.futures
 
+import itertools
 import json
 import re
 import socket
 import threading
 import time
+import uuid
 
 import random
 
 from copy import copy
-from typing import Callable, Dict, List, Union
-from threading import RLock, Timer
+from typing import AsyncIterator, Callable, Dict, Iterable, Iterator, List, Tuple, Union
+from threading import RLock
 from urllib.parse import quote
 
 import py_eureka_client.http_client as http_client
@@ -47,13 +50,38 @@ from py_eureka_client.__aws_info_loader import AmazonInfo
 from py_eureka_client import INSTANCE_STATUS_UP, INSTANCE_STATUS_DOWN, INSTANCE_STATUS_STARTING, INSTANCE_STATUS_OUT_OF_SERVICE, INSTANCE_STATUS_UNKNOWN
 from py_eureka_client import ACTION_TYPE_ADDED, ACTION_TYPE_MODIFIED, ACTION_TYPE_DELETED
 from py_eureka_client import HA_STRATEGY_RANDOM, HA_STRATEGY_STICK, HA_STRATEGY_OTHER
+from py_eureka_client import HA_STRATEGY_ROUND_ROBIN, HA_STRATEGY_WEIGHTED_RANDOM, HA_STRATEGY_LEAST_OUTSTANDING
+from py_eureka_client import HA_STRATEGY_LEAST_LATENCY, HA_STRATEGY_CONSISTENT_HASH
+from py_eureka_client import FAILOVER_SEQUENTIAL, FAILOVER_HEDGED
 from py_eureka_client import ERROR_REGISTER, ERROR_DISCOVER, ERROR_STATUS_UPDATE
 from py_eureka_client import _DEFAULT_EUREKA_SERVER_URL, _DEFAULT_INSTNACE_PORT, _DEFAULT_INSTNACE_SECURE_PORT, _RENEWAL_INTERVAL_IN_SECS, _RENEWAL_INTERVAL_IN_SECS, _DURATION_IN_SECS, _DEFAULT_DATA_CENTER_INFO, _DEFAULT_DATA_CENTER_INFO_CLASS, _AMAZON_DATA_CENTER_INFO_CLASS
 from py_eureka_client import _DEFAUTL_ZONE, _DEFAULT_TIME_OUT
+from py_eureka_client import _HEARTBEAT_JITTER_RATIO, _HEARTBEAT_EXPONENTIAL_BACKOFF_BOUND
+from py_eureka_client import _FAILOVER_HEDGE_DELAY_IN_SECS, _FAILOVER_DEADLINE_IN_SECS
+from py_eureka_client import _REGISTRY_SNAPSHOT_MAX_STALENESS_IN_SECS, _REGISTRY_ON_DEMAND_PULL_MIN_INTERVAL_IN_SECS
+from py_eureka_client import _FAN_OUT_CONCURRENCY
+from py_eureka_client import _BULK_CONCURRENCY, _BULK_CONCURRENCY_PER_APP, _BULK_WINDOW_FACTOR
+
+from py_eureka_client.load_balancer import LoadBalanceStrategy, SelectionContext, get_strategy
+from py_eureka_client.outlier_detection import OutlierDetector, OUTLIER_ACTIVE, OUTLIER_EJECTED, OUTLIER_RECOVERING
+from py_eureka_client.outlier_detection import _OUTLIER_CONSECUTIVE_FAILURES, _OUTLIER_ERROR_RATE_THRESHOLD, _OUTLIER_BASE_EJECTION_IN_SECS, \
+    _OUTLIER_MAX_EJECTION_PERCENT, _OUTLIER_REINSTATEMENT_IN_SECS
+from py_eureka_client.health_checker import InstanceHealthChecker
+from py_eureka_client.health_checker import _HEALTH_CHECK_TIMEOUT_IN_SECS, _HEALTH_CHECK_CONCURRENCY, _HEALTH_CHECK_UNHEALTHY_THRESHOLD
+from py_eureka_client.zone_avoidance import ZoneAvoidance, _ZONE_ERROR_RATE_THRESHOLD, _ZONE_MAX_LOAD_PER_INSTANCE
+from py_eureka_client.slow_start import SlowStart, SLOW_START_LINEAR, SLOW_START_EXPONENTIAL, _SLOW_START_WINDOW_IN_SECS, _SLOW_START_MIN_WEIGHT
+from py_eureka_client.subsetting import Subsetter, _SUBSET_SIZE
+from py_eureka_client.concurrency_limit import AdaptiveConcurrencyLimiter, ConcurrencyLimitExceeded, CONCURRENCY_LIMIT_AIMD, CONCURRENCY_LIMIT_GRADIENT
+from py_eureka_client.concurrency_limit import _CONCURRENCY_LIMIT_INITIAL, _CONCURRENCY_LIMIT_MIN, _CONCURRENCY_LIMIT_MAX, \
+    _CONCURRENCY_LIMIT_QUEUE_SIZE, _CONCURRENCY_LIMIT_QUEUE_TIMEOUT_IN_SECS
+from py_eureka_client.retry import RetryPolicy, RetryBudget
+from py_eureka_client.retry import _RETRY_MAX_ATTEMPTS, _RETRY_BACKOFF_IN_SECS, _RETRY_BACKOFF_MAX_IN_SECS, _RETRY_BUDGET_RATIO, _RETRY_BUDGET_MIN_PER_SEC
+from py_eureka_client.registry_snapshot import load_snapshot, save_snapshot, applications_to_dict
+from py_eureka_client.eureka_server_health import EurekaServerHealthTracker, is_server_error, _BREAKER_FAILURE_THRESHOLD, _BREAKER_RESET_IN_SECS
 
 from py_eureka_client.eureka_basic import LeaseInfo, DataCenterInfo, PortWrapper, Instance, Application, Applications
 from py_eureka_client.eureka_basic import register, _register, cancel, send_heartbeat, status_update, delete_status_override
-from py_eureka_client.eureka_basic import get_applications, get_delta, get_vip, get_secure_vip, get_application, get_app_instance, get_instance
+from py_eureka_client.eureka_basic import get_applications, get_delta_if_changed, get_vip, get_secure_vip, get_application, get_app_instance, get_instance
 
 _logger = get_logger("eureka_client")
 
@@ -62,6 +90,193 @@ def _current_time_millis():
     return int(time.time() * 1000)
 
 
+class HeartbeatScheduler:
+    """
+    Computes when the next heartbeat should run.
+
+    The schedule is anchored to the monotonic clock: every run is planned from the time the previous run was planned,
+    not from the time it finished, so the period does not drift by the duration of the requests. A random jitter of
+    `jitter_ratio * delay` is added (or subtracted) to every delay so that clients started at the same moment spread out.
+    When a run fails, the delay is doubled until it reaches `interval * backoff_bound`, and it is reset on the next success.
+    """
+
+    def __init__(self,
+                 interval: float = _RENEWAL_INTERVAL_IN_SECS,
+                 jitter_ratio: float = _HEARTBEAT_JITTER_RATIO,
+                 backoff_bound: int = _HEARTBEAT_EXPONENTIAL_BACKOFF_BOUND):
+        assert interval > 0, "interval must be positive"
+        assert 0 <= jitter_ratio < 1, "jitter_ratio must be in [0, 1)"
+        assert backoff_bound >= 1, "backoff_bound must not be less than 1"
+        self.interval: float = interval
+        self.jitter_ratio: float = jitter_ratio
+        self.backoff_bound: int = backoff_bound
+        self.__failures = 0
+
+    @property
+    def failures(self) -> int:
+        return self.__failures
+
+    @property
+    def current_delay(self) -> float:
+        """
+        The delay before the next run without jitter.
+        """
+        return self.interval * min(2 ** self.__failures, self.backoff_bound)
+
+    def __jitter(self, delay: float) -> float:
+        if not self.jitter_ratio:
+            return delay
+        return delay + delay * random.uniform(-self.jitter_ratio, self.jitter_ratio)
+
+    def first_run_at(self, now: float = None) -> float:
+        now = time.monotonic() if now is None else now
+        return now + self.__jitter(self.interval)
+
+    def next_run_at(self, last_run_at: float, succeeded: bool = True, now: float = None) -> float:
+        if succeeded:
+            self.__failures = 0
+        elif 2 ** self.__failures < self.backoff_bound:
+            self.__failures += 1
+        now = time.monotonic() if now is None else now
+        # If the last run took longer than the delay, run at once rather than trying to catch up the missed runs.
+        return max(last_run_at + self.__jitter(self.current_delay), now)
+
+
+class AdaptiveFetchInterval:
+    """
+    Adapts the registry fetch interval to the churn of the registry.
+
+    Every time the fetched delta carries changes (or the hash mismatches), the interval is halved down to `min_interval`,
+    and every time the registry is unchanged, it grows by half up to `max_interval`. The churn rate is the exponentially
+    weighted moving average of the changed instances per second.
+    """
+
+    def __init__(self, interval: float, min_interval: float, max_interval: float, alpha: float = 0.3):
+        assert 0 < min_interval <= max_interval, "min_interval must be positive and not greater than max_interval"
+        self.min_interval: float = min_interval
+        self.max_interval: float = max_interval
+        self.alpha: float = alpha
+        self.interval: float = min(max(interval, min_interval), max_interval)
+        self.churn_rate: float = 0
+        self.last_changes: int = 0
+        self.__last_update = time.monotonic()
+
+    def update(self, changes: int, now: float = None) -> float:
+        now = time.monotonic() if now is None else now
+        elapsed = now - self.__last_update
+        self.__last_update = now
+        rate = changes / elapsed if elapsed > 0 else 0
+        self.churn_rate = self.alpha * rate + (1 - self.alpha) * self.churn_rate
+        self.last_changes = changes
+        if changes:
+            self.interval = max(self.min_interval, self.interval / 2)
+        else:
+            self.interval = min(self.max_interval, self.interval * 1.5)
+        return self.interval
+
+
+def _merge_delta(applications: Applications, delta: Applications) -> None:
+    _logger.debug(
+        f"merge delta...length of application got from delta::{len(delta.applications)}")
+    for application in delta.applications:
+        for instance in application.instances:
+            _logger.debug(
+                f"instance [{instance.instanceId}] has {instance.actionType}")
+            if instance.actionType in (ACTION_TYPE_ADDED, ACTION_TYPE_MODIFIED):
+                existingApp = applications.get_application(
+                    application.name)
+                if existingApp is None:
+                    applications.add_application(application)
+                else:
+                    existingApp.update_instance(instance)
+            elif instance.actionType == ACTION_TYPE_DELETED:
+                existingApp = applications.get_application(
+                    application.name)
+                if existingApp is None:
+                    applications.add_application(application)
+                existingApp.remove_instance(instance)
+
+
+def _applications_hash(applications: Applications) -> str:
+    app_hash = ""
+    app_status_count = {}
+    for application in applications.applications:
+        for instance in application.instances:
+            if instance.status not in app_status_count:
+                app_status_count[instance.status.upper()] = 0
+            app_status_count[instance.status.upper(
+            )] = app_status_count[instance.status.upper()] + 1
+
+    sorted_app_status_count = sorted(
+        app_status_count.items(), key=lambda item: item[0])
+    for item in sorted_app_status_count:
+        app_hash = f"{app_hash}{item[0]}_{item[1]}_"
+    return app_hash
+
+
+def _merge_regions(local: Applications, remotes: List[Applications]) -> Applications:
+    """
+    Merge the registries of the regions into one view. An application is taken from the local region when it has up
+    instances there, otherwise from the first remote region that has.
+    """
+    registries = [apps for apps in [local] + remotes if apps is not None]
+    merged = Applications(apps__hashcode=local.appsHashcode if local else "",
+                          versions__delta=local.versionsDelta if local else "")
+    app_names = {}
+    for apps in registries:
+        for application in apps.applications:
+            app_names.setdefault(application.name, None)
+    for app_name in app_names:
+        candidates = [apps.get_application(app_name) for apps in registries]
+        chosen = next((app for app in candidates if app.up_instances), None) \
+            or next((app for app in candidates if app.instances), candidates[0])
+        merged.add_application(chosen)
+    return merged
+
+
+class RegionRegistry:
+    """
+    The registry of one remote region.
+
+    Eureka server returns the applications of its own region together with the ones of the asked remote regions, so each
+    remote region is fetched on its own, with its own delta version and hash, then a slow or failing region will not hold up
+    the others.
+    """
+
+    def __init__(self, region: str, scheduler: HeartbeatScheduler):
+        self.region: str = region
+        self.scheduler: HeartbeatScheduler = scheduler
+        self.applications: Applications = None
+        self.delta: Applications = None
+        self.fingerprint: str = ""
+
+    async def pull(self, eureka_server: str) -> int:
+        self.applications = await get_applications(eureka_server, [self.region])
+        self.delta = self.applications
+        return sum(len(app.instances) for app in self.applications.applications)
+
+    async def refresh(self, eureka_server: str) -> int:
+        """
+        Pull the full registry of this region at the first time and merge the deltas after that, return how many instances
+        are changed.
+        """
+        if self.applications is None:
+            return await self.pull(eureka_server)
+        delta, self.fingerprint = await get_delta_if_changed(eureka_server, [self.region], self.fingerprint)
+        if delta is None or (self.delta is not None
+                             and delta.versionsDelta == self.delta.versionsDelta
+                             and delta.appsHashcode == self.delta.appsHashcode):
+            return 0
+        changes = sum(len(app.instances) for app in delta.applications)
+        _merge_delta(self.applications, delta)
+        self.delta = delta
+        if _applications_hash(self.applications) != delta.appsHashcode:
+            _logger.debug(f"hash of region [{self.region}] mismatches, pull its full registry.")
+            await self.pull(eureka_server)
+            changes += 1
+        return changes
+
+
 """====================== Client ======================================="""
 
 
@@ -184,6 +399,64 @@ class NodeError:
         self.error = error
 
 
+class NodeResult:
+    """
+    The result of calling one instance in `walk_all_nodes`, `error` is `None` when the call succeeds.
+    """
+
+    def __init__(self, node, url: str, result=None, error: BaseException = None, latency: float = 0):
+        self.node = node
+        self.url: str = url
+        self.result = result
+        self.error: BaseException = error
+        self.latency: float = latency
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class ServiceRequest:
+    """
+    One request of `do_services`, the arguments are the same as the ones of `do_service`.
+    """
+
+    def __init__(self, app_name: str = "", service: str = "", return_type: str = "string",
+                 prefer_ip: bool = False, prefer_https: bool = False,
+                 method: str = "GET", headers: Dict[str, str] = None,
+                 data: Union[bytes, str, Dict] = None, timeout: float = _DEFAULT_TIME_OUT,
+                 hash_key: str = "",
+                 retry_policy: RetryPolicy = None):
+        self.app_name: str = app_name
+        self.service: str = service
+        self.return_type: str = return_type
+        self.prefer_ip: bool = prefer_ip
+        self.prefer_https: bool = prefer_https
+        self.method: str = method
+        self.headers: Dict[str, str] = headers
+        self.data: Union[bytes, str, Dict] = data
+        self.timeout: float = timeout
+        self.hash_key: str = hash_key
+        self.retry_policy: RetryPolicy = retry_policy
+
+
+class ServiceResult:
+    """
+    The result of a `ServiceRequest`, `index` is the position of the request in the requests that are given to `do_services`.
+    """
+
+    def __init__(self, index: int, request: ServiceRequest, result=None, error: Exception = None, latency: float = 0):
+        self.index: int = index
+        self.request: ServiceRequest = request
+        self.result = result
+        self.error: Exception = error
+        self.latency: float = latency
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
 class WalkNodeException(http_client.URLError):
 
     def __init__(self, reason, node_errors: List[NodeError] = []):
@@ -343,13 +616,156 @@ class EurekaClient:
 
     * metadata: The metadata map of this instances.
 
-    * remote_regions: Will also find the services that belongs to these regions.
+    * remote_regions: Will also find the services that belongs to these regions. Each region is fetched concurrently on its own schedule,
+        and an application is taken from the local region when it has up instances there, otherwise from the remote regions in order.
 
-    * ha_strategy: Specify the strategy how to choose a instance when there are more than one instanse of an App. 
+    * ha_strategy: Specify the strategy how to choose a instance when there are more than one instanse of an App. It can be one of the
+        `HA_STRATEGY_*` constants, or an instance of a subclass of `py_eureka_client.load_balancer.LoadBalanceStrategy`.
 
     * strict_service_error_policy: When set to True, all errors(Including connection error and HttpError, like http 
         status code is not 200) will consider as errors; Otherwise, only (ConnectionError, TimeoutError, socket.timeout) 
-        will be considered as errors, and other excptions and errors will be raised to upstream. Default is True.
+        will be considered as errors, and other excptions and errors will be raised to upstream. The http errors are retried
+        as the retry policy says, when `retry_on_status_codes` is not given, a strict client retries all of them and the other
+        client retries none of them. A non-idempotent call of `do_service`, e.g. a `POST`, is never retried on an http error.
+        Default is True.
+
+    * heartbeat_jitter_ratio: A random jitter of `heartbeat_jitter_ratio * interval` will be added to or subtracted from each
+        heartbeat delay, so that the clients started at the same moment will not send heartbeats in lockstep. Default is `0`.
+
+    * heartbeat_exponential_backoff_bound: When the eureka servers fail, the heartbeat delay will be doubled each time until it
+        reaches `renewal_interval_in_secs * heartbeat_exponential_backoff_bound`. Default is `10`.
+
+    * embedded_mode: When set to True, `start()` will schedule the heartbeat and the registry refreshing as a task in the running
+        event loop of the caller instead of starting a dedicated thread with its own event loop, and `stop()` will cancel that task.
+        `start()` and `stop()` must be awaited in that running loop, which must keep running, so it is not supported by the sync `init()`.
+        Default is `False`.
+
+    * failover_mode: How to fail over between the eureka servers. `FAILOVER_SEQUENTIAL` tries the servers one after another,
+        `FAILOVER_HEDGED` starts the next server when the previous one fails or does not respond in `failover_hedge_delay_in_secs`,
+        the first success wins and the late requests are cancelled. Default is `FAILOVER_SEQUENTIAL`.
+
+    * failover_hedge_delay_in_secs: In `FAILOVER_HEDGED` mode, how long to wait for a server before also trying the next one,
+        set to `0` to race all the servers at the same time. Default is `0.5`.
+
+    * failover_deadline_in_secs: In `FAILOVER_HEDGED` mode, the total time an operation may take across all the servers. Default is `10`.
+
+    * eureka_server_breaker_threshold: After this number of consecutive failures, the circuit of an eureka server opens and the server
+        is skipped without paying a timeout. Set to `0` to disable the circuit breaker. Default is `3`.
+
+    * eureka_server_breaker_reset_in_secs: How long an open circuit stays open before one probe request is let through. Default is `30`.
+
+    * eureka_server_read_write_split: When set to True, the writes (register, heartbeat, status update and cancel) stick to the
+        eureka server that owns the lease of this instance, while the registry pulls go to the fastest healthy server regardless
+        of zones. Default is `False`.
+
+    * background_start: When set to True, `start()` returns at once, the registration and the first registry pull run in the
+        background at the same time. Use `is_ready` and `wait_until_ready()` to check whether they are finished. Default is `False`.
+
+    * wait_for_ready_in_secs: In `background_start` mode, how long `walk_nodes` and `do_service` wait for the first registry pull
+        before giving up. Default is `5`.
+
+    * registry_snapshot_path: When specified, the registry will be saved to this file after each successful refresh, and be loaded
+        from it when the client starts, so that the services can be found before the first registry pull finishes, or even if the
+        eureka servers are unreachable at boot. Default is `""`, which disables the snapshot.
+
+    * registry_snapshot_max_staleness_in_secs: A snapshot older than this will not be loaded, `0` means no limit. Default is `300`.
+        When the registry is not changed, the snapshot is only saved again after half of this time.
+
+    * registry_fetch_min_interval_in_secs, registry_fetch_max_interval_in_secs: When both are set and the min one is less than the max one,
+        the registry fetch interval adapts to the churn of the registry: it shrinks towards the min one while the deltas carry changes,
+        and grows towards the max one while the registry is unchanged. Otherwise, the registry is fetched every `renewal_interval_in_secs`.
+
+    * fetch_interested_apps_only: When set to `True`, the client does not pull the whole registry, it only keeps the applications it is
+        interested in, each of them is fetched by its own request and all of them are refreshed concurrently. An application that is
+        not known yet will be loaded when it is used in `walk_nodes` at the first time, and then be kept refreshed. An application that
+        eureka server does not know is polled less and less often, until every `renewal_interval_in_secs` multiplied by
+        `heartbeat_exponential_backoff_bound` seconds, and as usual again once it is registered. Default is `False`.
+
+    * interested_apps: The applications that will be loaded at start when `fetch_interested_apps_only` is `True`.
+
+    * outlier_consecutive_failures: An instance that fails this many times in a row in `walk_nodes` is ejected from the selection of all
+        the following calls for a while, e.g. `5`. Connection errors, timeouts and 5xx responses are failures. Default is `0`, which
+        disables it.
+
+    * outlier_error_rate_threshold: An instance is also ejected when the moving average of its error rate reaches this value, from 0 to 1.
+        Default is `0`, which disables it.
+
+    * outlier_base_ejection_in_secs: How long an instance is ejected at the first time, it gets longer every time the instance is ejected
+        again. Default is `30`.
+
+    * outlier_max_ejection_percent: No more than this percent of the UP instances of an application will be ejected at the same time,
+        but one instance can always be ejected. Default is `50`.
+
+    * outlier_reinstatement_in_secs: After the ejection, an instance gets a growing share of the traffic in this period before it is fully
+        reinstated, and one failure in this period ejects it again. Default is `30`.
+
+    * health_check_interval_in_secs: When set, the `healthCheckUrl` of the UP instances of the applications that are called by `walk_nodes`
+        are probed in background in every this seconds, the probes are spread over the interval. An instance that fails the probes is
+        skipped in selection even if the registry still says it is UP. Default is `0`, which disables the health check.
+
+    * health_check_timeout_in_secs: The timeout of a health check probe. Default is `2`.
+
+    * health_check_concurrency: How many probes can be in flight at the same time. Default is `4`.
+
+    * health_check_unhealthy_threshold: An instance is skipped after failing this many probes in a row, until a probe succeeds again.
+        Default is `2`.
+
+    * zone_avoidance: Works with `prefer_same_zone`. When set to `True`, a part of the traffic is spilled to the other zones when the zone
+        of this client is unhealthy or over loaded, rather than only when all the instances in the zone are down. Default is `False`.
+
+    * zone_avoidance_error_rate_threshold: The error rate of the local zone from which the traffic starts to be spilled, the spilled part
+        grows to all when the error rate reaches twice of it. Default is `0.2`.
+
+    * zone_avoidance_max_load_per_instance: When set, the requests in flight per instance in the local zone over this value are spilled.
+        Default is `0`, which disables it.
+
+    * slow_start_window_in_secs: When set, the share of the traffic of a new instance grows in this period from its `serviceUpTimestamp`,
+        or from the time it is first seen when the eureka server does not give one, so it can warm up. Default is `0`, which disables it.
+
+    * slow_start_curve: How the share grows, `SLOW_START_LINEAR` or `SLOW_START_EXPONENTIAL`. Default is `SLOW_START_LINEAR`.
+
+    * slow_start_min_weight: The share of a new instance at the beginning of the window, from `0` to `1`, compared to a warmed one.
+        Default is `0.1`.
+
+    * slow_start_apps: The slow start settings of some applications that are different from the above, keyed by the application name,
+        e.g. `{"ORDER-SERVICE": {"window_in_secs": 120, "curve": SLOW_START_EXPONENTIAL}}`. Default is `None`.
+
+    * subset_size: When set, this client only calls a stable subset of this many instances in each zone of an application, chosen by
+        the instance id of this client, so the connections of a large fleet are kept few and warm. The other instances are called
+        only when all the instances in the subset are not available. The calls with a `hash_key` of `HA_STRATEGY_CONSISTENT_HASH` are
+        not limited to the subset, so a key goes to the same instance from all the clients. Default is `0`, which disables it.
+
+    * concurrency_limit_algorithm: When set, the requests in flight to each application that are sent by `walk_nodes` and `do_service`
+        are limited, and the limit is adapted by how the application responds. `CONCURRENCY_LIMIT_AIMD` grows the limit by one when the
+        requests succeed and shrinks it when they fail, `CONCURRENCY_LIMIT_GRADIENT` shrinks it when the latency goes up. A request over
+        the limit raises `ConcurrencyLimitExceeded`. Default is `""`, which disables it.
+
+    * concurrency_limit_initial: The limit of an application before it is adapted. Default is `20`.
+
+    * concurrency_limit_min: The limit never goes below this. Default is `1`.
+
+    * concurrency_limit_max: The limit never goes above this. Default is `200`.
+
+    * concurrency_limit_queue_size: How many requests over the limit can wait for a slot. Default is `0`, the requests fail at once.
+
+    * concurrency_limit_queue_timeout_in_secs: How long a request can wait for a slot. Default is `1`.
+
+    * retry_max_attempts: How many instances `walk_nodes` tries for one call. Default is `0`, all the UP instances are tried.
+
+    * retry_backoff_in_secs: The wait before the first retry, it doubles for each next retry up to `retry_backoff_max_in_secs`, and
+        a random wait from `0` to it is used. Default is `0`, the next instance is tried at once.
+
+    * retry_backoff_max_in_secs: The max wait before a retry. Default is `1`.
+
+    * retry_on_status_codes: The response status codes that are retried on the next instance, e.g. `[502, 503, 504]`, `do_service` only
+        retries them for idempotent methods. Default is `None`, see `strict_service_error_policy`.
+
+    * retry_budget_ratio: When set, the retries of this client in the last 10 seconds are limited to this ratio of the requests, plus 10
+        retries per second, the calls that are over the budget fail without retrying. e.g. `0.2`. Default is `0`, which disables it.
+
+    * retry_budget_min_per_sec: The retries per second that are always allowed by the retry budget. Default is `10`.
+
+    The retry settings are the default `RetryPolicy`, a call of `walk_nodes` or `do_service` can use another one by `retry_policy`.
 
     """
 
@@ -388,13 +804,58 @@ class EurekaClient:
                  is_coordinating_discovery_server: bool = False,
                  metadata: Dict = {},
                  remote_regions: List[str] = [],
-                 ha_strategy: int = HA_STRATEGY_RANDOM,
-                 strict_service_error_policy: bool = True):
+                 ha_strategy: Union[int, LoadBalanceStrategy] = HA_STRATEGY_RANDOM,
+                 strict_service_error_policy: bool = True,
+                 heartbeat_jitter_ratio: float = _HEARTBEAT_JITTER_RATIO,
+                 heartbeat_exponential_backoff_bound: int = _HEARTBEAT_EXPONENTIAL_BACKOFF_BOUND,
+                 embedded_mode: bool = False,
+                 failover_mode: int = FAILOVER_SEQUENTIAL,
+                 failover_hedge_delay_in_secs: float = _FAILOVER_HEDGE_DELAY_IN_SECS,
+                 failover_deadline_in_secs: float = _FAILOVER_DEADLINE_IN_SECS,
+                 eureka_server_breaker_threshold: int = _BREAKER_FAILURE_THRESHOLD,
+                 eureka_server_breaker_reset_in_secs: float = _BREAKER_RESET_IN_SECS,
+                 eureka_server_read_write_split: bool = False,
+                 background_start: bool = False,
+                 wait_for_ready_in_secs: float = _DEFAULT_TIME_OUT,
+                 registry_snapshot_path: str = "",
+                 registry_snapshot_max_staleness_in_secs: float = _REGISTRY_SNAPSHOT_MAX_STALENESS_IN_SECS,
+                 registry_fetch_min_interval_in_secs: float = 0,
+                 registry_fetch_max_interval_in_secs: float = 0,
+                 fetch_interested_apps_only: bool = False,
+                 interested_apps: List[str] = None,
+                 outlier_consecutive_failures: int = _OUTLIER_CONSECUTIVE_FAILURES,
+                 outlier_error_rate_threshold: float = _OUTLIER_ERROR_RATE_THRESHOLD,
+                 outlier_base_ejection_in_secs: float = _OUTLIER_BASE_EJECTION_IN_SECS,
+                 outlier_max_ejection_percent: float = _OUTLIER_MAX_EJECTION_PERCENT,
+                 outlier_reinstatement_in_secs: float = _OUTLIER_REINSTATEMENT_IN_SECS,
+                 health_check_interval_in_secs: float = 0,
+                 health_check_timeout_in_secs: float = _HEALTH_CHECK_TIMEOUT_IN_SECS,
+                 health_check_concurrency: int = _HEALTH_CHECK_CONCURRENCY,
+                 health_check_unhealthy_threshold: int = _HEALTH_CHECK_UNHEALTHY_THRESHOLD,
+                 zone_avoidance: bool = False,
+                 zone_avoidance_error_rate_threshold: float = _ZONE_ERROR_RATE_THRESHOLD,
+                 zone_avoidance_max_load_per_instance: float = _ZONE_MAX_LOAD_PER_INSTANCE,
+                 slow_start_window_in_secs: float = _SLOW_START_WINDOW_IN_SECS,
+                 slow_start_curve: str = SLOW_START_LINEAR,
+                 slow_start_min_weight: float = _SLOW_START_MIN_WEIGHT,
+                 slow_start_apps: Dict[str, Dict] = None,
+                 subset_size: int = _SUBSET_SIZE,
+                 concurrency_limit_algorithm: str = "",
+                 concurrency_limit_initial: int = _CONCURRENCY_LIMIT_INITIAL,
+                 concurrency_limit_min: int = _CONCURRENCY_LIMIT_MIN,
+                 concurrency_limit_max: int = _CONCURRENCY_LIMIT_MAX,
+                 concurrency_limit_queue_size: int = _CONCURRENCY_LIMIT_QUEUE_SIZE,
+                 concurrency_limit_queue_timeout_in_secs: float = _CONCURRENCY_LIMIT_QUEUE_TIMEOUT_IN_SECS,
+                 retry_max_attempts: int = _RETRY_MAX_ATTEMPTS,
+                 retry_backoff_in_secs: float = _RETRY_BACKOFF_IN_SECS,
+                 retry_backoff_max_in_secs: float = _RETRY_BACKOFF_MAX_IN_SECS,
+                 retry_on_status_codes: List[int] = None,
+                 retry_budget_ratio: float = _RETRY_BUDGET_RATIO,
+                 retry_budget_min_per_sec: float = _RETRY_BUDGET_MIN_PER_SEC):
         assert app_name is not None and app_name != "" if should_register else True, "application name must be specified."
         assert instance_port > 0 if should_register else True, "port is unvalid"
         assert isinstance(metadata, dict), "metadata must be dict"
-        assert ha_strategy in (HA_STRATEGY_RANDOM, HA_STRATEGY_STICK,
-                               HA_STRATEGY_OTHER) if should_discover else True, f"do not support strategy {ha_strategy}"
+        assert failover_mode in (FAILOVER_SEQUENTIAL, FAILOVER_HEDGED), f"do not support failover mode {failover_mode}"
 
         self.__net_lock = RLock()
         self.__eureka_server_conf = EurekaServerConf(
@@ -409,14 +870,43 @@ class EurekaClient:
             zone=zone
         )
         self.__cache_eureka_url = {}
+        self.__failover_mode = failover_mode
+        self.__failover_hedge_delay = failover_hedge_delay_in_secs
+        self.__failover_deadline = failover_deadline_in_secs
+        self.__eureka_server_health = EurekaServerHealthTracker(failure_threshold=eureka_server_breaker_threshold,
+                                                                reset_in_secs=eureka_server_breaker_reset_in_secs)
+        self.__read_write_split = eureka_server_read_write_split
+        self.__lease_owner_url = ""
         self.__should_register = should_register
         self.__should_discover = should_discover
         self.__prefer_same_zone = prefer_same_zone
         self.__alive = False
         self.__heartbeat_interval = renewal_interval_in_secs
-        self.__heartbeat_timer = Timer(self.__heartbeat_interval, self.__heartbeat_thread)
-        self.__heartbeat_timer.name = "HeartbeatThread"
-        self.__heartbeat_timer.daemon = True
+        self.__heartbeat_scheduler = HeartbeatScheduler(interval=renewal_interval_in_secs,
+                                                        jitter_ratio=heartbeat_jitter_ratio,
+                                                        backoff_bound=heartbeat_exponential_backoff_bound)
+        self.__registry_fetch_scheduler = HeartbeatScheduler(interval=renewal_interval_in_secs,
+                                                             jitter_ratio=heartbeat_jitter_ratio,
+                                                             backoff_bound=heartbeat_exponential_backoff_bound)
+        if 0 < registry_fetch_min_interval_in_secs < registry_fetch_max_interval_in_secs:
+            self.__registry_fetch_interval = AdaptiveFetchInterval(renewal_interval_in_secs,
+                                                                   registry_fetch_min_interval_in_secs,
+                                                                   registry_fetch_max_interval_in_secs)
+            self.__registry_fetch_scheduler.interval = self.__registry_fetch_interval.interval
+        else:
+            self.__registry_fetch_interval = None
+        self.__heartbeat_timer = threading.Thread(target=self.__heartbeat_thread, name="HeartbeatThread", daemon=True)
+        self.__heartbeat_loop = None
+        self.__heartbeat_task = None
+        self.__heartbeat_stopped = False
+        self.__heartbeat_lock = RLock()
+        self.__embedded_mode = embedded_mode
+        self.__background_start = background_start
+        self.__wait_for_ready = wait_for_ready_in_secs
+        self.__ready_future = concurrent.futures.Future()
+        self.__registry_snapshot_path = registry_snapshot_path
+        self.__registry_snapshot_max_staleness = registry_snapshot_max_staleness_in_secs
+        self.__registry_snapshot_saved_at = 0
 
         self.__instance_id = instance_id
         self.__instance_ip = instance_ip
@@ -443,16 +933,79 @@ class EurekaClient:
 
         # For Registery
         self.__instance = {}
+        self.__instance_prepared = False
 
         # For discovery
         self.__remote_regions = remote_regions if remote_regions is not None else []
+        self.__remote_registries: List[RegionRegistry] = [
+            RegionRegistry(region, HeartbeatScheduler(interval=renewal_interval_in_secs,
+                                                      jitter_ratio=heartbeat_jitter_ratio,
+                                                      backoff_bound=heartbeat_exponential_backoff_bound))
+            for region in self.__remote_regions]
         self.__applications = None
+        self.__merged_applications = None
         self.__delta = None
-        self.__ha_strategy = ha_strategy
+        self.__ha_strategy = get_strategy(ha_strategy) if should_discover else None
         self.__strict_service_error_policy = strict_service_error_policy
-        self.__ha_cache = {}
+        self.__last_delta_changes = 0
+        self.__delta_fingerprint = ""
+        self.__fetch_interested_apps_only = fetch_interested_apps_only
+        self.__interested_apps: Dict[str, concurrent.futures.Future] = {
+            app_name.upper(): concurrent.futures.Future() for app_name in (interested_apps or [])}
+        self.__interested_apps_lock = RLock()
+        # The interested applications that eureka server does not know: (misses, when to poll them next)
+        self.__unknown_apps: Dict[str, Tuple[int, float]] = {}
+
+        self.__outlier_detector = OutlierDetector(consecutive_failures=outlier_consecutive_failures,
+                                                  error_rate_threshold=outlier_error_rate_threshold,
+                                                  base_ejection_in_secs=outlier_base_ejection_in_secs,
+                                                  max_ejection_percent=outlier_max_ejection_percent,
+                                                  reinstatement_in_secs=outlier_reinstatement_in_secs)
+
+        self.__health_checker = InstanceHealthChecker(interval_in_secs=health_check_interval_in_secs,
+                                                      timeout_in_secs=health_check_timeout_in_secs,
+                                                      concurrency=health_check_concurrency,
+                                                      unhealthy_threshold=health_check_unhealthy_threshold)
+        self.__health_check_scheduler = HeartbeatScheduler(interval=health_check_interval_in_secs,
+                                                           jitter_ratio=heartbeat_jitter_ratio,
+                                                           backoff_bound=heartbeat_exponential_backoff_bound) \
+            if health_check_interval_in_secs > 0 else None
+
+        self.__zone_avoidance = ZoneAvoidance(enabled=zone_avoidance and prefer_same_zone,
+                                              error_rate_threshold=zone_avoidance_error_rate_threshold,
+                                              max_load_per_instance=zone_avoidance_max_load_per_instance)
+
+        self.__slow_start = SlowStart(window_in_secs=slow_start_window_in_secs,
+                                      curve=slow_start_curve,
+                                      min_weight=slow_start_min_weight)
+        for app_name, conf in (slow_start_apps or {}).items():
+            self.__slow_start.configure(app_name, **conf)
+
+        self.__subsetter = Subsetter(subset_size=subset_size)
+        self.__subset_client_id = uuid.uuid4().hex
+
+        self.__concurrency_limiter = AdaptiveConcurrencyLimiter(algorithm=concurrency_limit_algorithm,
+                                                                initial_limit=concurrency_limit_initial,
+                                                                min_limit=concurrency_limit_min,
+                                                                max_limit=concurrency_limit_max,
+                                                                queue_size=concurrency_limit_queue_size,
+                                                                queue_timeout_in_secs=concurrency_limit_queue_timeout_in_secs)
+
+        if retry_on_status_codes is None and not strict_service_error_policy:
+            # A client that is not strict raises the http errors to the caller.
+            retry_on_status_codes = []
+        self.__retry_policy = RetryPolicy(max_attempts=retry_max_attempts,
+                                          backoff_in_secs=retry_backoff_in_secs,
+                                          backoff_max_in_secs=retry_backoff_max_in_secs,
+                                          retry_on_status_codes=retry_on_status_codes)
+        self.__retry_budget = RetryBudget(ratio=retry_budget_ratio, min_retries_per_sec=retry_budget_min_per_sec)
+
+        self.__pooled_http_client: http_client.PooledHttpClient = None
 
         self.__application_mth_lock = RLock()
+        self.__in_flight: Dict[str, concurrent.futures.Future] = {}
+        self.__in_flight_lock = RLock()
+        self.__on_demand_pulled_at: float = None
 
     async def __parepare_instance_info(self):
         if self.__data_center_name == "Amazon":
@@ -563,24 +1116,129 @@ class EurekaClient:
     def zone(self) -> str:
         return self.__eureka_server_conf.zone
 
+    @property
+    def is_ready(self) -> bool:
+        """
+        Whether the registration and the first registry pull are finished, no matter they succeed or not.
+        """
+        return self.__ready_future.done()
+
+    async def wait_until_ready(self, timeout: float = None) -> bool:
+        """
+        Wait until the registration and the first registry pull are finished, return False if `timeout` expires first.
+        This method can be awaited in any event loop.
+        """
+        try:
+            await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(self.__ready_future)), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    @property
+    def heartbeat_scheduler(self) -> HeartbeatScheduler:
+        return self.__heartbeat_scheduler
+
+    @property
+    def registry_fetch_metrics(self) -> Dict:
+        """
+        The current registry fetch interval in seconds, the churn rate in changed instances per second, and the changes of the last fetch.
+        """
+        adaptive = self.__registry_fetch_interval
+        return {
+            "interval": self.__registry_fetch_scheduler.interval,
+            "churn_rate": adaptive.churn_rate if adaptive else 0,
+            "last_changes": adaptive.last_changes if adaptive else 0
+        }
+
+    @property
+    def interested_apps(self) -> List[str]:
+        """
+        The applications that are kept refreshed when `fetch_interested_apps_only` is set.
+        """
+        with self.__interested_apps_lock:
+            return list(self.__interested_apps.keys())
+
+    @property
+    def outlier_detection(self) -> Dict:
+        """
+        The number of the instances that are ejected now, the total ejections, and the outlier states of the instances, keyed by instance id.
+        """
+        return self.__outlier_detector.snapshot()
+
+    @property
+    def instance_health(self) -> Dict[str, Dict]:
+        """
+        The results of the health checks of the instances that are probed, keyed by instance id.
+        """
+        return self.__health_checker.snapshot()
+
+    @property
+    def zone_stats(self) -> Dict[str, Dict[str, Dict]]:
+        """
+        The statistics of the zones of the called applications that zone avoidance uses, including how many requests are spilled.
+        """
+        return self.__zone_avoidance.snapshot()
+
+    @property
+    def slow_start(self) -> SlowStart:
+        """
+        The slow start of the new instances, use its `configure` method to change the settings of an application at runtime.
+        """
+        return self.__slow_start
+
+    @property
+    def concurrency_limits(self) -> Dict[str, Dict]:
+        """
+        The concurrency limits of the called applications, with the requests that are in flight, queued, accepted and rejected.
+        """
+        return self.__concurrency_limiter.snapshot()
+
+    @property
+    def retry_stats(self) -> Dict:
+        """
+        The requests and the retries in the window of the retry budget, and how many retries are stopped by it.
+        """
+        return self.__retry_budget.snapshot()
+
+    @property
+    def warming_instances(self) -> Dict[str, Dict[str, float]]:
+        """
+        The weights of the instances that are in the slow start window now, keyed by application name and instance id.
+        """
+        return self.__slow_start.snapshot()
+
+    @property
+    def eureka_server_health(self) -> Dict[str, Dict]:
+        """
+        The health scores of the eureka servers that have been connected, keyed by url.
+        """
+        return self.__eureka_server_health.snapshot()
+
     @property
     def applications(self) -> Applications:
         if not self.should_discover:
             raise DiscoverException(
                 "should_discover set to False, no registry is pulled, cannot find any applications.")
         with self.__application_mth_lock:
-            if self.__applications is None:
-                self.__pull_full_registry()
-            return self.__applications
+            if not self.__remote_registries:
+                return self.__applications
+            if self.__merged_applications is None:
+                self.__merged_applications = _merge_regions(self.__applications,
+                                                            [registry.applications for registry in self.__remote_registries])
+            return self.__merged_applications
 
     async def __try_eureka_server_in_cache(self, fun):
         ok = False
         invalid_keys = []
-        for z, url in self.__cache_eureka_url.items():
+        for z, url in list(self.__cache_eureka_url.items()):
+            if not self.__eureka_server_health.get(url).allow_request():
+                _logger.debug(f"The circuit of eureka server [{url}] is open, skip it.")
+                invalid_keys.append(z)
+                continue
             try:
                 _logger.debug(
                     f"Try to do {fun.__name__} in zone[{z}] using cached url {url}. ")
-                await fun(url)
+                await self.__call_eureka_server(fun, url)
             except (http_client.HTTPError, http_client.URLError):
                 _logger.warn(
                     f"Eureka server [{url}] is down, use next url to try.", exc_info=True)
@@ -637,12 +1295,15 @@ class EurekaClient:
         with self.__net_lock:
             ok = False
             _zone = zone if zone else _DEFAUTL_ZONE
-            for url in eureka_servers:
+            for url in self.__eureka_server_health.sort(eureka_servers):
                 url = url.strip()
+                if not self.__eureka_server_health.get(url).allow_request():
+                    _logger.debug(f"The circuit of eureka server [{url}] is open, skip it.")
+                    continue
                 try:
                     _logger.debug(
                         f"try to do {fun.__name__} in zone[{_zone}] using url {url}. ")
-                    await fun(url)
+                    await self.__call_eureka_server(fun, url)
                 except (http_client.HTTPError, http_client.URLError):
                     _logger.warn(
                         f"Eureka server [{url}] is down, use next url to try.", exc_info=True)
@@ -657,8 +1318,146 @@ class EurekaClient:
                 raise EurekaServerConnectionException(
                     f"All eureka servers in zone[{_zone}] are down!")
 
-    async def __connect_to_eureka_server(self, fun):
-        if self.__cache_eureka_url:
+    def __eureka_server_candidates(self):
+        candidates = [(z, url) for z, url in self.__cache_eureka_url.items()]
+        if self.__prefer_same_zone:
+            zones = [(self.zone, self.__eureka_server_conf.servers_in_zone)] + \
+                list(self.__eureka_server_conf.servers_not_in_zone.items())
+        else:
+            zones = self.__eureka_server_conf.servers.items()
+        for zone, urls in zones:
+            _zone = zone if zone else _DEFAUTL_ZONE
+            for url in self.__eureka_server_health.sort(urls):
+                if (_zone, url.strip()) not in candidates:
+                    candidates.append((_zone, url.strip()))
+        return candidates
+
+    def __eureka_server_candidates_for_read(self):
+        candidates = [(zone if zone else _DEFAUTL_ZONE, url.strip())
+                      for zone, urls in self.__eureka_server_conf.servers.items() for url in urls]
+        # Shuffle before sorting, so that the servers with the same rank, e.g. the ones never connected, share the load of the fleet.
+        random.shuffle(candidates)
+        return sorted(candidates, key=lambda candidate: self.__eureka_server_health.get(candidate[1]).rank)
+
+    async def __try_eureka_servers_in_order(self, fun, candidates):
+        for zone, url in candidates:
+            if not self.__eureka_server_health.get(url).allow_request():
+                _logger.debug(f"The circuit of eureka server [{url}] is open, skip it.")
+                continue
+            try:
+                _logger.debug(f"try to do {fun.__name__} in zone[{zone}] using url {url}. ")
+                await self.__call_eureka_server(fun, url)
+            except (http_client.HTTPError, http_client.URLError):
+                _logger.warn(f"Eureka server [{url}] is down, use next url to try.", exc_info=True)
+            else:
+                return zone, url
+        raise EurekaServerConnectionException(f"Cannot do {fun.__name__} in any eureka server!")
+
+    async def __hedge_eureka_servers(self, fun, candidates):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.__failover_deadline
+        candidates = iter(candidates)
+        pending = {}
+
+        def try_next():
+            for candidate in candidates:
+                if not self.__eureka_server_health.get(candidate[1]).allow_request():
+                    _logger.debug(f"The circuit of eureka server [{candidate[1]}] is open, skip it.")
+                    continue
+                _logger.debug(f"try to do {fun.__name__} in zone[{candidate[0]}] using url {candidate[1]}. ")
+                pending[asyncio.ensure_future(self.__call_eureka_server(fun, candidate[1]))] = candidate
+                return True
+            return False
+
+        try:
+            while try_next() and self.__failover_hedge_delay <= 0:
+                pass
+            while pending:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                if self.__failover_hedge_delay > 0:
+                    remaining = min(self.__failover_hedge_delay, remaining)
+                done, _ = await asyncio.wait(pending.keys(), timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    # The servers in flight are slow, hedge with the next one.
+                    try_next()
+                    continue
+                for task in done:
+                    zone, url = pending.pop(task)
+                    error = task.exception()
+                    if error is None:
+                        return zone, url
+                    if not isinstance(error, (http_client.HTTPError, http_client.URLError)):
+                        raise error
+                    _logger.warning(f"Eureka server [{url}] is down, use next url to try. Error: {error}")
+                    if self.__cache_eureka_url.get(zone) == url:
+                        del self.__cache_eureka_url[zone]
+                    try_next()
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending.keys(), return_exceptions=True)
+        raise EurekaServerConnectionException(
+            f"Cannot do {fun.__name__} in any eureka server within {self.__failover_deadline} seconds!")
+
+    async def __call_eureka_server(self, fun, url):
+        health = self.__eureka_server_health.get(url)
+        health.start_request()
+        start = time.monotonic()
+        try:
+            await fun(url)
+        except asyncio.CancelledError:
+            health.release()
+            raise
+        except Exception as e:
+            if is_server_error(e):
+                health.record_failure(time.monotonic() - start)
+            elif isinstance(e, http_client.HTTPError):
+                health.record_success(time.monotonic() - start)
+            else:
+                health.release()
+            raise
+        else:
+            health.record_success(time.monotonic() - start)
+
+    async def __read_from_eureka_servers(self, fun):
+        candidates = self.__eureka_server_candidates_for_read()
+        if self.__failover_mode == FAILOVER_HEDGED:
+            await self.__hedge_eureka_servers(fun, candidates)
+        else:
+            await self.__try_eureka_servers_in_order(fun, candidates)
+
+    async def __write_to_eureka_servers(self, fun):
+        with self.__net_lock:
+            owner = self.__lease_owner_url
+            if owner and self.__eureka_server_health.get(owner).allow_request():
+                try:
+                    _logger.debug(f"try to do {fun.__name__} using the lease owner url {owner}. ")
+                    await self.__call_eureka_server(fun, owner)
+                except (http_client.HTTPError, http_client.URLError):
+                    _logger.warn(f"Eureka server [{owner}] that owns the lease is down, use next url to try.", exc_info=True)
+                else:
+                    return
+            candidates = [candidate for candidate in self.__eureka_server_candidates() if candidate[1] != owner]
+            if self.__failover_mode == FAILOVER_HEDGED:
+                zone, url = await self.__hedge_eureka_servers(fun, candidates)
+            else:
+                zone, url = await self.__try_eureka_servers_in_order(fun, candidates)
+            self.__cache_eureka_url[zone] = url
+            self.__lease_owner_url = url
+
+    async def __connect_to_eureka_server(self, fun, for_read: bool = False):
+        if self.__read_write_split:
+            if for_read:
+                await self.__read_from_eureka_servers(fun)
+            else:
+                await self.__write_to_eureka_servers(fun)
+        elif self.__failover_mode == FAILOVER_HEDGED:
+            with self.__net_lock:
+                zone, url = await self.__hedge_eureka_servers(fun, self.__eureka_server_candidates())
+                self.__cache_eureka_url[zone] = url
+        elif self.__cache_eureka_url:
             try:
                 await self.__try_eureka_server_in_cache(fun)
             except EurekaServerConnectionException:
@@ -791,148 +1590,641 @@ class EurekaClient:
             await self.register(status=INSTANCE_STATUS_DOWN)
             await self.cancel()
 
+    def __start_heartbeat_task(self, loop: asyncio.AbstractEventLoop) -> asyncio.Task:
+        with self.__heartbeat_lock:
+            if self.__heartbeat_stopped:
+                return None
+            self.__heartbeat_loop = loop
+            self.__heartbeat_task = loop.create_task(self.__run_in_background())
+            return self.__heartbeat_task
+
+    async def __stop_heartbeat_task(self):
+        with self.__heartbeat_lock:
+            self.__heartbeat_stopped = True
+            loop, task = self.__heartbeat_loop, self.__heartbeat_task
+            if task is None or loop.is_closed():
+                return
+            if loop is not asyncio.get_running_loop():
+                loop.call_soon_threadsafe(task.cancel)
+                return
+            task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            _logger.debug("Heartbeat stopped.")
+
     def __heartbeat_thread(self):
         _logger.debug("Start heartbeat!")
         loop = asyncio.new_event_loop()
-        while True:
-            loop.run_until_complete(self.__heartbeat())
-            time.sleep(self.__heartbeat_interval)
+        if self.__start_heartbeat_task(loop) is None:
+            loop.close()
+            return
+        try:
+            loop.run_until_complete(self.__heartbeat_task)
+        except asyncio.CancelledError:
+            _logger.debug("Heartbeat stopped.")
+        finally:
+            with self.__heartbeat_lock:
+                loop.close()
+
+    async def __run_in_background(self):
+        if self.__background_start:
+            try:
+                await self.__startup()
+            except Exception:
+                _logger.exception("Start eureka client in background error, will try in next heartbeat. ")
+        await self.__heartbeat_schedule()
 
-    async def __heartbeat(self):
+    async def __heartbeat_schedule(self):
+        jobs = []
         if self.__should_register:
-            _logger.debug("sending heartbeat to eureka server ")
-            await self.send_heartbeat()
+            jobs.append(self.__schedule(self.__heartbeat_scheduler, self.__renew, "Heartbeat"))
         if self.__should_discover:
-            _logger.debug("loading services from  eureka server")
-            await self.__fetch_delta()
+            jobs.append(self.__schedule(self.__registry_fetch_scheduler, self.__fetch_registry, "Registry fetch"))
+            if self.__health_checker.enabled:
+                jobs.append(self.__schedule(self.__health_check_scheduler, self.__check_instances_health, "Health check"))
+            if not self.__fetch_interested_apps_only:
+                for registry in self.__remote_registries:
+                    jobs.append(self.__schedule(registry.scheduler, lambda registry=registry: self.__fetch_region(registry),
+                                                f"Registry fetch of region [{registry.region}]"))
+        await asyncio.gather(*jobs)
+
+    async def __schedule(self, scheduler: HeartbeatScheduler, job: Callable, name: str):
+        run_at = scheduler.first_run_at()
+        while True:
+            await asyncio.sleep(max(0, run_at - time.monotonic()))
+            try:
+                succeeded = await job()
+            except Exception:
+                _logger.exception(f"{name} error!")
+                succeeded = False
+            run_at = scheduler.next_run_at(run_at, succeeded)
+            if not succeeded:
+                _logger.debug(f"{name} failed {scheduler.failures} time(s), "
+                              f"next one will run in {run_at - time.monotonic():.2f} seconds.")
+
+    async def __check_instances_health(self) -> bool:
+        apps = self.applications
+        if not apps:
+            return True
+        instances = []
+        for app_name in self.__health_checker.watched_apps:
+            instances.extend(apps.get_application(app_name).up_instances)
+        await self.__health_checker.check(instances)
+        return True
+
+    async def __renew(self) -> bool:
+        if not self.__instance_prepared:
+            _logger.debug("The instance information is not prepared, prepare it and register again.")
+            await self.__prepare_and_register()
+            return self.__alive
+        _logger.debug("sending heartbeat to eureka server ")
+        await self.send_heartbeat()
+        return self.__alive
+
+    async def __fetch_registry(self) -> bool:
+        _logger.debug("loading services from  eureka server")
+        self.__last_delta_changes = 0
+        if self.__fetch_interested_apps_only:
+            succeeded = await self.__single_flight("interested", self.__refresh_interested_apps)
+        else:
+            succeeded = await self.__fetch_delta()
+        if succeeded and self.__registry_fetch_interval is not None:
+            interval = self.__registry_fetch_interval.update(self.__last_delta_changes)
+            self.__registry_fetch_scheduler.interval = interval
+            _logger.debug(f"{self.__last_delta_changes} change(s) in registry, fetch it again in {interval:.2f} seconds.")
+        return succeeded
+
+    def __load_registry_snapshot(self):
+        if not self.__registry_snapshot_path or self.__applications is not None:
+            return
+        applications = load_snapshot(self.__registry_snapshot_path, self.__registry_snapshot_max_staleness)
+        if applications is not None:
+            _logger.info(f"Load {len(applications.applications)} application(s) from registry snapshot [{self.__registry_snapshot_path}].")
+            self.__applications = applications
+            self.__merged_applications = None
+            if self.__fetch_interested_apps_only:
+                with self.__interested_apps_lock:
+                    for application in applications.applications:
+                        if application.name not in self.__interested_apps:
+                            loaded = concurrent.futures.Future()
+                            loaded.set_result(True)
+                            self.__interested_apps[application.name] = loaded
+
+    async def __save_registry_snapshot(self, changed: bool = True):
+        if not self.__registry_snapshot_path or self.__applications is None:
+            return
+        if not changed and (self.__registry_snapshot_max_staleness <= 0 or
+                            time.monotonic() - self.__registry_snapshot_saved_at < self.__registry_snapshot_max_staleness / 2):
+            # Nothing is changed and the saved snapshot is still fresh enough to be loaded, do not write it again.
+            return
+        try:
+            data = applications_to_dict(self.__applications)
+            await asyncio.get_running_loop().run_in_executor(None, save_snapshot, self.__registry_snapshot_path, data)
+            self.__registry_snapshot_saved_at = time.monotonic()
+        except Exception:
+            _logger.warning(f"Save registry snapshot to [{self.__registry_snapshot_path}] error!", exc_info=True)
+
+    async def __single_flight(self, key: str, fetch: Callable, *joinable_keys: str) -> bool:
+        """
+        Run `fetch` unless a fetch of `key` (or of one of `joinable_keys`) is in flight, in which case wait for that one and
+        share its result. The in-flight fetch can be joined from any event loop.
+        """
+        with self.__in_flight_lock:
+            in_flight = next((self.__in_flight[k] for k in (key,) + joinable_keys if k in self.__in_flight), None)
+            if in_flight is None:
+                result = self.__in_flight[key] = concurrent.futures.Future()
+        if in_flight is not None:
+            _logger.debug(f"Registry fetch [{key}] joins the one in flight.")
+            return await asyncio.shield(asyncio.wrap_future(in_flight))
+        succeeded = False
+        try:
+            succeeded = await fetch()
+            return succeeded
+        finally:
+            with self.__in_flight_lock:
+                del self.__in_flight[key]
+            result.set_result(succeeded)
+
+    async def refresh(self) -> bool:
+        """
+        Refresh the registry now and return whether it succeeds. If a registry fetch is in flight, wait for it and share its
+        result rather than starting another one.
+        """
+        if not self.should_discover:
+            raise DiscoverException("should_discover set to False, no registry is pulled.")
+        if self.__fetch_interested_apps_only:
+            return await self.__single_flight("interested", self.__refresh_interested_apps)
+        results = await asyncio.gather(self.__fetch_delta(),
+                                       *[self.__fetch_region(registry) for registry in self.__remote_registries])
+        return all(results)
+
+    async def __pull_full_registry(self) -> bool:
+        return await self.__single_flight("full", self.__do_pull_full_registry)
 
-    async def __pull_full_registry(self):
+    async def __do_pull_full_registry(self) -> bool:
         async def do_pull(url):  # the actual function body
-            self.__applications = await get_applications(url, self.__remote_regions)
+            self.__applications = await get_applications(url)
             self.__delta = self.__applications
+            self.__merged_applications = None
         try:
-            await self.__connect_to_eureka_server(do_pull)
+            await self.__connect_to_eureka_server(do_pull, for_read=True)
         except Exception as e:
             _logger.warn(
                 "pull full registry from eureka server error!", exc_info=True)
             await self._on_error(ERROR_DISCOVER, e)
+            return False
+        else:
+            await self.__save_registry_snapshot()
+            return True
+
+    async def __fetch_delta(self) -> bool:
+        # A full pull in flight brings a newer registry than a delta, join it too.
+        return await self.__single_flight("delta", self.__do_fetch_delta, "full")
+
+    async def __do_fetch_delta(self) -> bool:
+        if self.__applications is None or len(self.__applications.applications) == 0:
+            return await self.__pull_full_registry()
+        hash_mismatch = {}
+        changes = []
 
-    async def __fetch_delta(self):
         async def do_fetch(url):
-            if self.__applications is None or len(self.__applications.applications) == 0:
-                await self.__pull_full_registry()
+            delta, self.__delta_fingerprint = await get_delta_if_changed(url, fingerprint=self.__delta_fingerprint)
+            if delta is None:
+                _logger.debug("delta is not changed, skip parsing it.")
                 return
-            delta = await get_delta(url, self.__remote_regions)
             _logger.debug(
                 f"delta got: v.{delta.versionsDelta}::{delta.appsHashcode}")
             if self.__delta is not None \
                     and delta.versionsDelta == self.__delta.versionsDelta \
                     and delta.appsHashcode == self.__delta.appsHashcode:
                 return
-            self.__merge_delta(delta)
+            self.__last_delta_changes = sum(len(app.instances) for app in delta.applications)
+            changes.append(self.__last_delta_changes)
+            _merge_delta(self.__applications, delta)
             self.__delta = delta
+            self.__merged_applications = None
             if not self.__is_hash_match():
-                await self.__pull_full_registry()
+                self.__last_delta_changes += 1
+                hash_mismatch["pull"] = True
         try:
-            await self.__connect_to_eureka_server(do_fetch)
+            await self.__connect_to_eureka_server(do_fetch, for_read=True)
         except Exception as e:
             _logger.warn(
                 "fetch delta from eureka server error!", exc_info=True)
             await self._on_error(ERROR_DISCOVER, e)
+            return False
+        if hash_mismatch:
+            # The result of the full pull is the result of this fetch, so a failed one is retried with the backoff.
+            return await self.__pull_full_registry()
+        # Most of the fetches bring no change, rewrite the snapshot only when there are some, or when it is getting stale.
+        await self.__save_registry_snapshot(changed=sum(changes) > 0)
+        return True
+
+    async def __fetch_region(self, registry: RegionRegistry) -> bool:
+        return await self.__single_flight(f"region:{registry.region}", lambda: self.__do_fetch_region(registry))
+
+    async def __do_fetch_region(self, registry: RegionRegistry) -> bool:
+        changes = {}
+
+        async def do_fetch(url):
+            changes["count"] = await registry.refresh(url)
+        try:
+            await self.__connect_to_eureka_server(do_fetch, for_read=True)
+        except Exception as e:
+            _logger.warning(f"fetch registry of region [{registry.region}] from eureka server error!", exc_info=True)
+            await self._on_error(ERROR_DISCOVER, e)
+            return False
+        if changes["count"]:
+            _logger.debug(f"{changes['count']} change(s) in registry of region [{registry.region}].")
+            with self.__application_mth_lock:
+                self.__merged_applications = None
+        return True
+
+    async def __fetch_application(self, app_name: str) -> int:
+        """
+        Fetch one interested application and replace the local one, return how many instances are changed.
+        """
+        fetched = {}
+
+        async def do_fetch(url):
+            try:
+                fetched["app"] = await get_application(url, app_name)
+            except http_client.HTTPError as e:
+                if e.code != 404:
+                    raise
+                fetched["app"] = None
+
+        def signatures(application):
+            return {ins.instanceId: (ins.status, ins.lastDirtyTimestamp) for ins in application.instances} if application else {}
+
+        try:
+            await self.__connect_to_eureka_server(do_fetch, for_read=True)
+            application = fetched["app"]
+            self.__track_unknown_app(app_name, application is None)
+            with self.__application_mth_lock:
+                if self.__applications is None:
+                    self.__applications = Applications()
+                old_one = self.__applications.get_application(app_name)
+                self.__applications.remove_application(app_name)
+                if application is not None:
+                    self.__applications.add_application(application)
+                self.__merged_applications = None
+            old_sigs = signatures(old_one)
+            new_sigs = signatures(application)
+            return len([ins_id for ins_id in old_sigs.keys() | new_sigs.keys() if old_sigs.get(ins_id) != new_sigs.get(ins_id)])
+        finally:
+            with self.__interested_apps_lock:
+                loaded = self.__interested_apps.get(app_name)
+            if loaded is not None and not loaded.done():
+                loaded.set_result(True)
+
+    def __track_unknown_app(self, app_name: str, unknown: bool) -> None:
+        with self.__interested_apps_lock:
+            if not unknown:
+                if self.__unknown_apps.pop(app_name, None) is not None:
+                    _logger.info(f"Application [{app_name}] is found in eureka server, refresh it as usual.")
+                return
+            misses, _ = self.__unknown_apps.get(app_name, (0, 0))
+            if misses == 0:
+                _logger.warning(f"Application [{app_name}] is not found in eureka server, poll it less often until it is found.")
+            scheduler = self.__registry_fetch_scheduler
+            delay = scheduler.interval * min(2 ** (misses + 1), scheduler.backoff_bound)
+            self.__unknown_apps[app_name] = (misses + 1, time.monotonic() + delay)
+
+    async def __refresh_interested_apps(self) -> bool:
+        now = time.monotonic()
+        with self.__interested_apps_lock:
+            app_names = [app_name for app_name in self.__interested_apps
+                         if app_name not in self.__unknown_apps or self.__unknown_apps[app_name][1] <= now]
+        results = await asyncio.gather(*[self.__fetch_application(app_name) for app_name in app_names], return_exceptions=True)
+        errors = [res for res in results if isinstance(res, Exception)]
+        self.__last_delta_changes = sum(res for res in results if not isinstance(res, Exception))
+        if errors:
+            _logger.warning(f"refresh {len(errors)} of {len(app_names)} interested application(s) from eureka server error!",
+                            exc_info=errors[0])
+            await self._on_error(ERROR_DISCOVER, errors[0])
+            return False
+        await self.__save_registry_snapshot()
+        return True
+
+    async def __load_interested_app(self, app_name: str) -> None:
+        with self.__interested_apps_lock:
+            loaded = self.__interested_apps.get(app_name)
+            first_use = loaded is None
+            if first_use:
+                loaded = self.__interested_apps[app_name] = concurrent.futures.Future()
+        if first_use:
+            _logger.debug(f"Application [{app_name}] is used at the first time, load it from eureka server.")
+            try:
+                await self.__fetch_application(app_name)
+            except Exception as e:
+                _logger.warning(f"load application [{app_name}] from eureka server error!", exc_info=True)
+                await self._on_error(ERROR_DISCOVER, e)
+        elif not loaded.done():
+            try:
+                await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(loaded)), self.__wait_for_ready)
+            except asyncio.TimeoutError:
+                _logger.debug(f"Application [{app_name}] is not loaded in {self.__wait_for_ready} seconds.")
 
     def __is_hash_match(self):
-        app_hash = self.__get_applications_hash()
+        app_hash = _applications_hash(self.__applications)
         _logger.debug(
             f"check hash, local[{app_hash}], remote[{self.__delta.appsHashcode}]")
         return app_hash == self.__delta.appsHashcode
 
-    def __merge_delta(self, delta):
-        _logger.debug(
-            f"merge delta...length of application got from delta::{len(delta.applications)}")
-        for application in delta.applications:
-            for instance in application.instances:
-                _logger.debug(
-                    f"instance [{instance.instanceId}] has {instance.actionType}")
-                if instance.actionType in (ACTION_TYPE_ADDED, ACTION_TYPE_MODIFIED):
-                    existingApp = self.applications.get_application(
-                        application.name)
-                    if existingApp is None:
-                        self.applications.add_application(application)
-                    else:
-                        existingApp.update_instance(instance)
-                elif instance.actionType == ACTION_TYPE_DELETED:
-                    existingApp = self.applications.get_application(
-                        application.name)
-                    if existingApp is None:
-                        self.applications.add_application(application)
-                    existingApp.remove_instance(instance)
-
-    def __get_applications_hash(self):
-        app_hash = ""
-        app_status_count = {}
-        for application in self.__applications.applications:
-            for instance in application.instances:
-                if instance.status not in app_status_count:
-                    app_status_count[instance.status.upper()] = 0
-                app_status_count[instance.status.upper(
-                )] = app_status_count[instance.status.upper()] + 1
-
-        sorted_app_status_count = sorted(
-            app_status_count.items(), key=lambda item: item[0])
-        for item in sorted_app_status_count:
-            app_hash = f"{app_hash}{item[0]}_{item[1]}_"
-        return app_hash
-
     async def walk_nodes(self,
                          app_name: str = "",
                          service: str = "",
                          prefer_ip: bool = False,
                          prefer_https: bool = False,
-                         walker: Callable = None) -> Union[str, Dict, http_client.HttpResponse]:
+                         walker: Callable = None,
+                         hash_key: str = "",
+                         retry_policy: RetryPolicy = None) -> Union[str, Dict, http_client.HttpResponse]:
+        """
+        Find an instance of `app_name` and call `walker` with the url of `service` on it, if the call fails, try the next instance
+        as `retry_policy` says, the default policy of this client is used when it is not given.
+        `hash_key` is passed to the load balance strategy, with `HA_STRATEGY_CONSISTENT_HASH`, the calls with the same key go to
+        the same instance.
+        """
+        return await self.__call_nodes(app_name, service, prefer_ip, prefer_https, walker, hash_key, retry_policy, True)
+
+    async def __call_nodes(self, app_name: str, service: str, prefer_ip: bool, prefer_https: bool, walker: Callable, hash_key: str,
+                           retry_policy: RetryPolicy, idempotent: bool):
         assert app_name is not None and app_name != "", "application_name should not be null"
 
-        error_nodes = []
         app_name = app_name.upper()
-        node = self.__get_available_service(app_name)
+        await self.__wait_for_registry(app_name)
+        await self.__concurrency_limiter.acquire(app_name)
+        start = time.monotonic()
+        error = None
+        try:
+            return await self.__walk_nodes(app_name, service, prefer_ip, prefer_https, walker, hash_key,
+                                           retry_policy or self.__retry_policy, idempotent)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self.__concurrency_limiter.release(app_name, time.monotonic() - start, error)
+
+    async def __walk_nodes(self, app_name: str, service: str, prefer_ip: bool, prefer_https: bool, walker: Callable, hash_key: str,
+                           retry_policy: RetryPolicy, idempotent: bool):
+        error_nodes = []
+        self.__health_checker.watch(app_name)
+        self.__retry_budget.record_request()
+        node = self.__get_available_service(app_name, request_key=service, hash_key=hash_key)
         node_errors: List[NodeError] = []
+        path = service[1:] if service.startswith("/") else service
 
         while node is not None:
             try:
-                url = self.__generate_service_url(
-                    node, prefer_ip, prefer_https)
-                if service.startswith("/"):
-                    url = url + service[1:]
-                else:
-                    url = url + service
+                url = self.__generate_service_url(node, prefer_ip, prefer_https) + path
                 _logger.debug("do service with url::" + url)
-                obj = walker(url)
-                if asyncio.iscoroutine(obj):
-                    return await obj
-                else:
-                    return obj
+                return await self.__walk(app_name, node, walker, url)
             except (ConnectionError, TimeoutError, socket.timeout) as e:
                 node_errors.append(NodeError(node.instanceId, e))
                 _logger.warning(
                     f"do service {service} in node [{node.instanceId}] error, use next node. Error: {e}")
                 error_nodes.append(node.instanceId)
-                node = self.__get_available_service(app_name, error_nodes)
             except (http_client.HTTPError, http_client.URLError) as e:
                 node_errors.append(NodeError(node.instanceId, e))
-                if self.__strict_service_error_policy:
+                if isinstance(e, http_client.HTTPError):
+                    # The instance has answered, whether the call can be sent again is up to the retry policy.
+                    retry = retry_policy.retry_on_status(e, idempotent)
+                else:
+                    retry = self.__strict_service_error_policy
+                if retry:
                     _logger.warning(
                         f"do service {service} in node [{node.instanceId}] error, use next node. Error: {e}")
                     error_nodes.append(node.instanceId)
-                    node = self.__get_available_service(app_name, error_nodes)
                 else:
                     raise e
+            if not retry_policy.can_attempt(len(error_nodes)):
+                raise WalkNodeException(f"Try {len(error_nodes)} instances, but all fail", node_errors)
+            node = self.__get_available_service(app_name, error_nodes, service, hash_key)
+            if node is None:
+                break
+            if not self.__retry_budget.try_retry():
+                _logger.warning(f"The retry budget is used up, do not retry {service} of [{app_name}].")
+                raise WalkNodeException("The retry budget is used up", node_errors)
+            backoff = retry_policy.backoff(len(error_nodes))
+            if backoff > 0:
+                await asyncio.sleep(backoff)
 
         raise WalkNodeException("Try all up instances in registry, but all fail", node_errors)
 
+    async def __wait_for_registry(self, app_name: str) -> None:
+        if self.__should_discover and self.__fetch_interested_apps_only:
+            await self.__load_interested_app(app_name)
+        elif self.__should_discover and self.__applications is None and not self.is_ready:
+            _logger.debug(f"The registry is not pulled yet, wait for at most {self.__wait_for_ready} seconds.")
+            await self.wait_until_ready(self.__wait_for_ready)
+        if self.__should_discover and self.__applications is None and not self.__fetch_interested_apps_only:
+            await self.__single_flight("on-demand", self.__pull_on_demand, "delta", "full")
+
+    async def __pull_on_demand(self) -> bool:
+        # The calls share the pull in flight, and do not pull again right after a failed one, so a burst of calls when the
+        # eureka servers are unreachable does not cause a burst of registry downloads.
+        now = time.monotonic()
+        if self.__on_demand_pulled_at is not None and now - self.__on_demand_pulled_at < _REGISTRY_ON_DEMAND_PULL_MIN_INTERVAL_IN_SECS:
+            _logger.debug("The registry was pulled a moment ago and failed, do not pull it again now.")
+            return False
+        self.__on_demand_pulled_at = now
+        _logger.debug("The registry is not pulled yet, pull it now.")
+        return await self.refresh()
+
+    async def walk_all_nodes(self,
+                             app_name: str = "",
+                             service: str = "",
+                             prefer_ip: bool = False,
+                             prefer_https: bool = False,
+                             walker: Callable = None,
+                             concurrency: int = _FAN_OUT_CONCURRENCY,
+                             timeout: float = _DEFAULT_TIME_OUT,
+                             min_successes: int = 0,
+                             quorum: bool = False) -> List[NodeResult]:
+        """
+        Call `walker` with the url of `service` on every UP instance of `app_name`, e.g. to invalidate their caches, and return
+        a `NodeResult` for each instance, the errors are returned rather than raised.
+
+        * concurrency: How many instances are called at the same time, `0` means all of them.
+        * timeout: The timeout of the call to each instance.
+        * min_successes: When set, return as soon as this many calls succeed, the calls that are not finished are cancelled
+            and their results have an `asyncio.CancelledError`.
+        * quorum: When set to `True`, return as soon as more than half of the instances succeed.
+
+        When `min_successes` or `quorum` is set, it also returns as soon as too many calls fail for it to be reached.
+        A `WalkNodeException` is raised when `app_name` has no UP instance, for there is nothing to walk.
+        """
+        assert app_name is not None and app_name != "", "application_name should not be null"
+        app_name = app_name.upper()
+        await self.__wait_for_registry(app_name)
+        apps = self.applications
+        if not apps:
+            raise DiscoverException(
+                "Cannot load registry from eureka server, please check your configurations. ")
+        nodes = apps.get_application(app_name).up_instances
+        if not nodes:
+            raise WalkNodeException(f"There is no UP instance of [{app_name}] in registry.")
+        path = service[1:] if service.startswith("/") else service
+        required = max(min_successes, len(nodes) // 2 + 1 if quorum else 0)
+        semaphore = asyncio.Semaphore(concurrency if concurrency > 0 else max(len(nodes), 1))
+
+        async def call(node: Instance, result: NodeResult) -> NodeResult:
+            async with semaphore:
+                start = time.monotonic()
+                try:
+                    result.result = await asyncio.wait_for(self.__walk(app_name, node, walker, result.url), timeout)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    _logger.warning(f"do service {service} in node [{node.instanceId}] error. Error: {e}")
+                    result.error = e
+                finally:
+                    result.latency = time.monotonic() - start
+            return result
+
+        results = [NodeResult(node.instanceId, self.__generate_service_url(node, prefer_ip, prefer_https) + path) for node in nodes]
+        tasks = {asyncio.ensure_future(call(node, result)): result for node, result in zip(nodes, results)}
+        pending = set(tasks.keys())
+        successes = failures = 0
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.result().ok:
+                        successes += 1
+                    else:
+                        failures += 1
+                if required and (successes >= required or len(nodes) - failures < required):
+                    break
+        finally:
+            for task in pending:
+                task.cancel()
+                tasks[task].error = asyncio.CancelledError()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        _logger.debug(f"call {service} in {len(nodes)} nodes of [{app_name}]: {successes} succeed, {failures} fail, {len(pending)} cancelled.")
+        return results
+
+    async def __walk(self, app_name: str, node: Instance, walker: Callable, url: str):
+        self.__ha_strategy.on_request_start(app_name, node)
+        self.__zone_avoidance.on_request_start(app_name, node.zone)
+        start = time.monotonic()
+        error = None
+        try:
+            obj = walker(url)
+            if asyncio.iscoroutine(obj):
+                return await obj
+            else:
+                return obj
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            latency = time.monotonic() - start
+            self.__ha_strategy.on_request_end(app_name, node, latency, error)
+            self.__zone_avoidance.on_request_end(app_name, node.zone, latency, error)
+            self.__outlier_detector.record(app_name, node.instanceId, error)
+
     async def do_service(self, app_name: str = "", service: str = "", return_type: str = "string",
                          prefer_ip: bool = False, prefer_https: bool = False,
                          method: str = "GET", headers: Dict[str, str] = None,
-                         data: Union[bytes, str, Dict] = None, timeout: float = _DEFAULT_TIME_OUT
+                         data: Union[bytes, str, Dict] = None, timeout: float = _DEFAULT_TIME_OUT,
+                         hash_key: str = "",
+                         retry_policy: RetryPolicy = None
                          ) -> Union[str, Dict, http_client.HttpResponse]:
+        walk_using_urllib = self.__urllib_walker(return_type, method, headers, data, timeout)
+        policy = retry_policy or self.__retry_policy
+        return await self.__call_nodes(app_name, service, prefer_ip, prefer_https, walk_using_urllib, hash_key,
+                                       policy, policy.is_idempotent(method))
+
+    async def do_service_all(self, app_name: str = "", service: str = "", return_type: str = "string",
+                             prefer_ip: bool = False, prefer_https: bool = False,
+                             method: str = "GET", headers: Dict[str, str] = None,
+                             data: Union[bytes, str, Dict] = None, timeout: float = _DEFAULT_TIME_OUT,
+                             concurrency: int = _FAN_OUT_CONCURRENCY,
+                             min_successes: int = 0,
+                             quorum: bool = False
+                             ) -> List[NodeResult]:
+        """
+        Send the request to every UP instance of `app_name`, see `walk_all_nodes`.
+        """
+        walk_using_urllib = self.__urllib_walker(return_type, method, headers, data, timeout)
+        return await self.walk_all_nodes(app_name, service, prefer_ip, prefer_https, walk_using_urllib,
+                                         concurrency=concurrency, timeout=timeout, min_successes=min_successes, quorum=quorum)
+
+    async def do_services(self, requests: Iterable[ServiceRequest],
+                          concurrency: int = _BULK_CONCURRENCY,
+                          concurrency_per_app: int = _BULK_CONCURRENCY_PER_APP) -> AsyncIterator[ServiceResult]:
+        """
+        Send many requests at the same time and yield a `ServiceResult` for each of them as soon as it completes, so the order
+        is not the one of the requests, use `ServiceResult.index` to match them. Each request is sent like `do_service`,
+        the errors are returned in the results rather than raised.
+
+        * concurrency: How many requests can be in flight at the same time, twice as many are taken from `requests` ahead,
+            so it can be a generator of any length.
+        * concurrency_per_app: How many requests to one application can be in flight at the same time, so a slow application
+            does not take all the slots.
+
+        The connections are pooled and reused between the requests, unless a custom http client is set by
+        `http_client.set_http_client`, in which case it is used as it is.
+        """
+        client = self.__bulk_http_client()
+        global_limit = asyncio.Semaphore(concurrency)
+        app_limits: Dict[str, asyncio.Semaphore] = {}
+
+        async def send(index: int, req: ServiceRequest) -> ServiceResult:
+            result = ServiceResult(index, req)
+            app_limit = app_limits.setdefault(req.app_name.upper(), asyncio.Semaphore(concurrency_per_app))
+            # Wait for the slot of the application first, so the requests of a busy application do not hold the global slots.
+            async with app_limit, global_limit:
+                start = time.monotonic()
+                try:
+                    walker = self.__urllib_walker(req.return_type, req.method, req.headers, req.data, req.timeout, client)
+                    policy = req.retry_policy or self.__retry_policy
+                    result.result = await self.__call_nodes(req.app_name, req.service, req.prefer_ip, req.prefer_https, walker,
+                                                            req.hash_key, policy, policy.is_idempotent(req.method))
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    result.error = e
+                finally:
+                    result.latency = time.monotonic() - start
+            return result
+
+        # The requests are taken from the iterable only when there is room in the window, so a long or endless one is not
+        # turned into tasks all at once.
+        window = max(concurrency, 1) * _BULK_WINDOW_FACTOR
+        requests = enumerate(requests)
+        pending = set()
+
+        def feed():
+            for index, req in itertools.islice(requests, window - len(pending)):
+                pending.add(asyncio.ensure_future(send(index, req)))
+
+        feed()
+        try:
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                pending.difference_update(done)
+                feed()
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    def __bulk_http_client(self) -> http_client.HttpClient:
+        if type(http_client.http_client) is not http_client.HttpClient:
+            return http_client.http_client
+        if self.__pooled_http_client is None:
+            self.__pooled_http_client = http_client.PooledHttpClient()
+        return self.__pooled_http_client
+
+    def __urllib_walker(self, return_type: str, method: str, headers: Dict[str, str],
+                        data: Union[bytes, str, Dict], timeout: float, client: http_client.HttpClient = None) -> Callable:
         if data and isinstance(data, dict):
             _data = json.dumps(data).encode()
         elif data and isinstance(data, str):
@@ -943,7 +2235,7 @@ class EurekaClient:
         async def walk_using_urllib(url):
             req = http_client.HttpRequest(url, method=method, headers=headers)
 
-            res: http_client.HttpResponse = await http_client.http_client.urlopen(
+            res: http_client.HttpResponse = await (client or http_client.http_client).urlopen(
                 req, data=_data, timeout=timeout)
             if return_type.lower() in ("json", "dict", "dictionary"):
                 return json.loads(res.body_text)
@@ -951,13 +2243,13 @@ class EurekaClient:
                 return res.raw_response
             else:
                 return res.body_text
-        return await self.walk_nodes(app_name, service, prefer_ip, prefer_https, walk_using_urllib)
+        return walk_using_urllib
 
     def __get_service_not_in_ignore_list(self, instances, ignores):
         ign = ignores if ignores else []
         return [item for item in instances if item.instanceId not in ign]
 
-    def __get_available_service(self, application_name, ignore_instance_ids=None):
+    def __get_available_service(self, application_name, ignore_instance_ids=None, request_key="", hash_key=""):
         apps = self.applications
         if not apps:
             raise DiscoverException(
@@ -965,108 +2257,107 @@ class EurekaClient:
         app = apps.get_application(application_name)
         if app is None:
             return None
+        up_instances = app.up_instances
+
+        def usable(instances):
+            return self.__health_checker.filter(self.__outlier_detector.filter(application_name, instances, len(up_instances)))
+        # A key has to go to the same instance from every client, so it is not limited to the subset of this client.
+        if self.__subsetter.enabled and not (hash_key and self.__ha_strategy.key_affine):
+            client_id = self.__instance.get("instanceId") or self.__instance_id or self.__subset_client_id
+
+            def usable_in_subset(instances):
+                return usable(self.__subsetter.filter(app, instances, client_id))
+            candidates = self.__get_candidates(application_name, app, ignore_instance_ids, usable_in_subset)
+            if not candidates:
+                # All the instances in the subset are not available, use the others.
+                candidates = self.__get_candidates(application_name, app, ignore_instance_ids, usable)
+        else:
+            candidates = self.__get_candidates(application_name, app, ignore_instance_ids, usable)
+        if not candidates and up_instances:
+            # All the instances that are left are ejected, try them rather than fail at once.
+            candidates = self.__get_candidates(application_name, app, ignore_instance_ids)
+        # The warming instances are filtered from the chosen zone only, so a deploy does not move the traffic to the other zones.
+        candidates = self.__slow_start.filter(app, candidates) or candidates
+
+        return self.__ha_strategy.choose(app, candidates, ignore_instance_ids, request_key, hash_key)
+
+    def __get_candidates(self, application_name, app, ignore_instance_ids=None, usable=lambda instances: instances):
         up_instances = []
         if self.__prefer_same_zone:
-            ups_same_zone = app.up_instances_in_zone(self.zone)
+            ups_same_zone = usable(app.up_instances_in_zone(self.zone))
             up_instances = self.__get_service_not_in_ignore_list(
                 ups_same_zone, ignore_instance_ids)
+            if up_instances and self.__zone_avoidance.enabled:
+                ups_not_same_zone = self.__get_service_not_in_ignore_list(
+                    usable(app.up_instances_not_in_zone(self.zone)), ignore_instance_ids)
+                up_instances = self.__zone_avoidance.choose(application_name, self.zone, up_instances, ups_not_same_zone)
             if not up_instances:
-                ups_not_same_zone = app.up_instances_not_in_zone(self.zone)
+                ups_not_same_zone = usable(app.up_instances_not_in_zone(self.zone))
                 _logger.debug(
                     f"app[{application_name}]'s up instances not in same zone are all down, using the one that's not in the same zone: {[ins.instanceId for ins in ups_not_same_zone]}")
                 up_instances = self.__get_service_not_in_ignore_list(
                     ups_not_same_zone, ignore_instance_ids)
         else:
             up_instances = self.__get_service_not_in_ignore_list(
-                app.up_instances, ignore_instance_ids)
-
-        if len(up_instances) == 0:
-            # no up instances
-            return None
-        elif len(up_instances) == 1:
-            # only one available instance, then doesn't matter which strategy is.
-            instance = up_instances[0]
-            self.__ha_cache[application_name] = instance.instanceId
-            return instance
-
-        def random_one(instances):
-            if len(instances) == 1:
-                idx = 0
-            else:
-                idx = random.randint(0, len(instances) - 1)
-            selected_instance = instances[idx]
-            self.__ha_cache[application_name] = selected_instance.instanceId
-            return selected_instance
-
-        if self.__ha_strategy == HA_STRATEGY_RANDOM:
-            return random_one(up_instances)
-        elif self.__ha_strategy == HA_STRATEGY_STICK:
-            if application_name in self.__ha_cache:
-                cache_id = self.__ha_cache[application_name]
-                cahce_instance = app.get_instance(cache_id)
-                if cahce_instance is not None and cahce_instance.status == INSTANCE_STATUS_UP:
-                    return cahce_instance
-                else:
-                    return random_one(up_instances)
-            else:
-                return random_one(up_instances)
-        elif self.__ha_strategy == HA_STRATEGY_OTHER:
-            if application_name in self.__ha_cache:
-                cache_id = self.__ha_cache[application_name]
-                other_instances = []
-                for up_instance in up_instances:
-                    if up_instance.instanceId != cache_id:
-                        other_instances.append(up_instance)
-                return random_one(other_instances)
-            else:
-                return random_one(up_instances)
-        else:
-            return None
+                usable(app.up_instances), ignore_instance_ids)
+        return up_instances
 
     def __generate_service_url(self, instance: Instance, prefer_ip, prefer_https):
         if instance is None:
             return None
-        schema = "http"
-        port = 0
-        if instance.port.port and not instance.securePort.enabled:
-            schema = "http"
-            port = instance.port.port
-        elif not instance.port.port and instance.securePort.enabled:
-            schema = "https"
-            port = instance.securePort.port
-        elif instance.port.port and instance.securePort.enabled:
-            if prefer_https:
-                schema = "https"
-                port = instance.securePort.port
-            else:
-                schema = "http"
-                port = instance.port.port
-        else:
-            assert False, "generate_service_url error: No port is available"
-
-        host = instance.ipAddr if prefer_ip else instance.hostName
+        return instance.base_url(prefer_ip, prefer_https)
 
-        if (schema == "http" and port == 80) or (schema == 'https' and port == 443):
-            return f"{schema}://{host}/"
+    async def __start_discover(self):
+        if self.__fetch_interested_apps_only:
+            await self.__single_flight("interested", self.__refresh_interested_apps)
         else:
-            return f"{schema}://{host}:{port}/"
+            await asyncio.gather(self.__pull_full_registry(),
+                                 *[self.__fetch_region(registry) for registry in self.__remote_registries])
 
-    async def __start_discover(self):
-        await self.__pull_full_registry()
+    async def __prepare_and_register(self):
+        if not self.__instance_prepared:
+            await self.__parepare_instance_info()
+            self.__instance_prepared = True
+        await self.__start_register()
+
+    async def __startup(self):
+        try:
+            if self.__background_start:
+                jobs = []
+                if self.should_register:
+                    jobs.append(self.__prepare_and_register())
+                if self.should_discover:
+                    jobs.append(self.__start_discover())
+                # Wait for all of them, so that the client is not ready while one of them is still running.
+                for error in await asyncio.gather(*jobs, return_exceptions=True):
+                    if isinstance(error, Exception):
+                        _logger.error("Start eureka client in background error, will try in next heartbeat. ", exc_info=error)
+            else:
+                if self.should_register:
+                    await self.__prepare_and_register()
+                if self.should_discover:
+                    await self.__start_discover()
+        finally:
+            if not self.__ready_future.done():
+                self.__ready_future.set_result(True)
 
     async def start(self) -> None:
-        if self.should_register:
-            await self.__parepare_instance_info()
-            await self.__start_register()
         if self.should_discover:
-            await self.__start_discover()
-        self.__heartbeat_timer.start()
+            self.__load_registry_snapshot()
+        if not self.__background_start:
+            await self.__startup()
+        if self.__embedded_mode:
+            _logger.debug("Start heartbeat in the running event loop!")
+            self.__start_heartbeat_task(asyncio.get_running_loop())
+        else:
+            self.__heartbeat_timer.start()
 
     async def stop(self) -> None:
-        if self.__heartbeat_timer.is_alive():
-            self.__heartbeat_timer.cancel()
+        await self.__stop_heartbeat_task()
         if self.__should_register:
             await self.__stop_registery()
+        if self.__pooled_http_client is not None:
+            await self.__pooled_http_client.aclose()
 
 
 __cache_key = "default"
@@ -1108,8 +2399,54 @@ async def init_async(eureka_server: str = _DEFAULT_EUREKA_SERVER_URL,
                      is_coordinating_discovery_server: bool = False,
                      metadata: Dict = {},
                      remote_regions: List[str] = [],
-                     ha_strategy: int = HA_STRATEGY_RANDOM,
-                     strict_service_error_policy: bool = True) -> EurekaClient:
+                     ha_strategy: Union[int, LoadBalanceStrategy] = HA_STRATEGY_RANDOM,
+                     strict_service_error_policy: bool = True,
+                     heartbeat_jitter_ratio: float = _HEARTBEAT_JITTER_RATIO,
+                     heartbeat_exponential_backoff_bound: int = _HEARTBEAT_EXPONENTIAL_BACKOFF_BOUND,
+                     embedded_mode: bool = False,
+                     failover_mode: int = FAILOVER_SEQUENTIAL,
+                     failover_hedge_delay_in_secs: float = _FAILOVER_HEDGE_DELAY_IN_SECS,
+                     failover_deadline_in_secs: float = _FAILOVER_DEADLINE_IN_SECS,
+                     eureka_server_breaker_threshold: int = _BREAKER_FAILURE_THRESHOLD,
+                     eureka_server_breaker_reset_in_secs: float = _BREAKER_RESET_IN_SECS,
+                     eureka_server_read_write_split: bool = False,
+                     background_start: bool = False,
+                     wait_for_ready_in_secs: float = _DEFAULT_TIME_OUT,
+                     registry_snapshot_path: str = "",
+                     registry_snapshot_max_staleness_in_secs: float = _REGISTRY_SNAPSHOT_MAX_STALENESS_IN_SECS,
+                     registry_fetch_min_interval_in_secs: float = 0,
+                     registry_fetch_max_interval_in_secs: float = 0,
+                     fetch_interested_apps_only: bool = False,
+                     interested_apps: List[str] = None,
+                     outlier_consecutive_failures: int = _OUTLIER_CONSECUTIVE_FAILURES,
+                     outlier_error_rate_threshold: float = _OUTLIER_ERROR_RATE_THRESHOLD,
+                     outlier_base_ejection_in_secs: float = _OUTLIER_BASE_EJECTION_IN_SECS,
+                     outlier_max_ejection_percent: float = _OUTLIER_MAX_EJECTION_PERCENT,
+                     outlier_reinstatement_in_secs: float = _OUTLIER_REINSTATEMENT_IN_SECS,
+                     health_check_interval_in_secs: float = 0,
+                     health_check_timeout_in_secs: float = _HEALTH_CHECK_TIMEOUT_IN_SECS,
+                     health_check_concurrency: int = _HEALTH_CHECK_CONCURRENCY,
+                     health_check_unhealthy_threshold: int = _HEALTH_CHECK_UNHEALTHY_THRESHOLD,
+                     zone_avoidance: bool = False,
+                     zone_avoidance_error_rate_threshold: float = _ZONE_ERROR_RATE_THRESHOLD,
+                     zone_avoidance_max_load_per_instance: float = _ZONE_MAX_LOAD_PER_INSTANCE,
+                     slow_start_window_in_secs: float = _SLOW_START_WINDOW_IN_SECS,
+                     slow_start_curve: str = SLOW_START_LINEAR,
+                     slow_start_min_weight: float = _SLOW_START_MIN_WEIGHT,
+                     slow_start_apps: Dict[str, Dict] = None,
+                     subset_size: int = _SUBSET_SIZE,
+                     concurrency_limit_algorithm: str = "",
+                     concurrency_limit_initial: int = _CONCURRENCY_LIMIT_INITIAL,
+                     concurrency_limit_min: int = _CONCURRENCY_LIMIT_MIN,
+                     concurrency_limit_max: int = _CONCURRENCY_LIMIT_MAX,
+                     concurrency_limit_queue_size: int = _CONCURRENCY_LIMIT_QUEUE_SIZE,
+                     concurrency_limit_queue_timeout_in_secs: float = _CONCURRENCY_LIMIT_QUEUE_TIMEOUT_IN_SECS,
+                     retry_max_attempts: int = _RETRY_MAX_ATTEMPTS,
+                     retry_backoff_in_secs: float = _RETRY_BACKOFF_IN_SECS,
+                     retry_backoff_max_in_secs: float = _RETRY_BACKOFF_MAX_IN_SECS,
+                     retry_on_status_codes: List[int] = None,
+                     retry_budget_ratio: float = _RETRY_BUDGET_RATIO,
+                     retry_budget_min_per_sec: float = _RETRY_BUDGET_MIN_PER_SEC) -> EurekaClient:
     """
     Initialize an EurekaClient object and put it to cache, you can use a set of functions to do the service.
 
@@ -1122,7 +2459,7 @@ async def init_async(eureka_server: str = _DEFAULT_EUREKA_SERVER_URL,
         if __cache_key in __cache_clients:
             _logger.warn(
                 "A client is already running, try to stop it and start the new one!")
-            __cache_clients[__cache_key].stop()
+            await __cache_clients[__cache_key].stop()
             del __cache_clients[__cache_key]
         client = EurekaClient(eureka_server=eureka_server,
                               eureka_domain=eureka_domain,
@@ -1159,7 +2496,53 @@ async def init_async(eureka_server: str = _DEFAULT_EUREKA_SERVER_URL,
                               metadata=metadata,
                               remote_regions=remote_regions,
                               ha_strategy=ha_strategy,
-                              strict_service_error_policy=strict_service_error_policy)
+                              strict_service_error_policy=strict_service_error_policy,
+                              heartbeat_jitter_ratio=heartbeat_jitter_ratio,
+                              heartbeat_exponential_backoff_bound=heartbeat_exponential_backoff_bound,
+                              embedded_mode=embedded_mode,
+                              failover_mode=failover_mode,
+                              failover_hedge_delay_in_secs=failover_hedge_delay_in_secs,
+                              failover_deadline_in_secs=failover_deadline_in_secs,
+                              eureka_server_breaker_threshold=eureka_server_breaker_threshold,
+                              eureka_server_breaker_reset_in_secs=eureka_server_breaker_reset_in_secs,
+                              eureka_server_read_write_split=eureka_server_read_write_split,
+                              background_start=background_start,
+                              wait_for_ready_in_secs=wait_for_ready_in_secs,
+                              registry_snapshot_path=registry_snapshot_path,
+                              registry_snapshot_max_staleness_in_secs=registry_snapshot_max_staleness_in_secs,
+                              registry_fetch_min_interval_in_secs=registry_fetch_min_interval_in_secs,
+                              registry_fetch_max_interval_in_secs=registry_fetch_max_interval_in_secs,
+                              fetch_interested_apps_only=fetch_interested_apps_only,
+                              interested_apps=interested_apps,
+                              outlier_consecutive_failures=outlier_consecutive_failures,
+                              outlier_error_rate_threshold=outlier_error_rate_threshold,
+                              outlier_base_ejection_in_secs=outlier_base_ejection_in_secs,
+                              outlier_max_ejection_percent=outlier_max_ejection_percent,
+                              outlier_reinstatement_in_secs=outlier_reinstatement_in_secs,
+                              health_check_interval_in_secs=health_check_interval_in_secs,
+                              health_check_timeout_in_secs=health_check_timeout_in_secs,
+                              health_check_concurrency=health_check_concurrency,
+                              health_check_unhealthy_threshold=health_check_unhealthy_threshold,
+                              zone_avoidance=zone_avoidance,
+                              zone_avoidance_error_rate_threshold=zone_avoidance_error_rate_threshold,
+                              zone_avoidance_max_load_per_instance=zone_avoidance_max_load_per_instance,
+                              slow_start_window_in_secs=slow_start_window_in_secs,
+                              slow_start_curve=slow_start_curve,
+                              slow_start_min_weight=slow_start_min_weight,
+                              slow_start_apps=slow_start_apps,
+                              subset_size=subset_size,
+                              concurrency_limit_algorithm=concurrency_limit_algorithm,
+                              concurrency_limit_initial=concurrency_limit_initial,
+                              concurrency_limit_min=concurrency_limit_min,
+                              concurrency_limit_max=concurrency_limit_max,
+                              concurrency_limit_queue_size=concurrency_limit_queue_size,
+                              concurrency_limit_queue_timeout_in_secs=concurrency_limit_queue_timeout_in_secs,
+                              retry_max_attempts=retry_max_attempts,
+                              retry_backoff_in_secs=retry_backoff_in_secs,
+                              retry_backoff_max_in_secs=retry_backoff_max_in_secs,
+                              retry_on_status_codes=retry_on_status_codes,
+                              retry_budget_ratio=retry_budget_ratio,
+                              retry_budget_min_per_sec=retry_budget_min_per_sec)
         __cache_clients[__cache_key] = client
         await client.start()
         return client
@@ -1177,19 +2560,24 @@ async def walk_nodes_async(app_name: str = "",
                            service: str = "",
                            prefer_ip: bool = False,
                            prefer_https: bool = False,
-                           walker: Callable = None) -> Union[str, Dict, http_client.HttpResponse]:
+                           walker: Callable = None,
+                           hash_key: str = "",
+                           retry_policy: RetryPolicy = None) -> Union[str, Dict, http_client.HttpResponse]:
     cli = get_client()
     if cli is None:
         raise Exception("Discovery Client has not initialized. ")
     res = await cli.walk_nodes(app_name=app_name, service=service,
-                               prefer_ip=prefer_ip, prefer_https=prefer_https, walker=walker)
+                               prefer_ip=prefer_ip, prefer_https=prefer_https, walker=walker, hash_key=hash_key,
+                               retry_policy=retry_policy)
     return res
 
 
 async def do_service_async(app_name: str = "", service: str = "", return_type: str = "string",
                            prefer_ip: bool = False, prefer_https: bool = False,
                            method: str = "GET", headers: Dict[str, str] = None,
-                           data: Union[bytes, str, Dict] = None, timeout: float = _DEFAULT_TIME_OUT
+                           data: Union[bytes, str, Dict] = None, timeout: float = _DEFAULT_TIME_OUT,
+                           hash_key: str = "",
+                           retry_policy: RetryPolicy = None
                            ) -> Union[str, Dict, http_client.HttpResponse]:
     cli = get_client()
     if cli is None:
@@ -1197,11 +2585,58 @@ async def do_service_async(app_name: str = "", service: str = "", return_type: s
     res = await cli.do_service(app_name=app_name, service=service, return_type=return_type,
                                prefer_ip=prefer_ip, prefer_https=prefer_https,
                                method=method, headers=headers,
-                               data=data, timeout=timeout)
+                               data=data, timeout=timeout, hash_key=hash_key, retry_policy=retry_policy)
+
+    return res
 
+
+async def walk_all_nodes_async(app_name: str = "",
+                               service: str = "",
+                               prefer_ip: bool = False,
+                               prefer_https: bool = False,
+                               walker: Callable = None,
+                               concurrency: int = _FAN_OUT_CONCURRENCY,
+                               timeout: float = _DEFAULT_TIME_OUT,
+                               min_successes: int = 0,
+                               quorum: bool = False) -> List[NodeResult]:
+    cli = get_client()
+    if cli is None:
+        raise Exception("Discovery Client has not initialized. ")
+    res = await cli.walk_all_nodes(app_name=app_name, service=service,
+                                   prefer_ip=prefer_ip, prefer_https=prefer_https, walker=walker,
+                                   concurrency=concurrency, timeout=timeout, min_successes=min_successes, quorum=quorum)
     return res
 
 
+async def do_service_all_async(app_name: str = "", service: str = "", return_type: str = "string",
+                               prefer_ip: bool = False, prefer_https: bool = False,
+                               method: str = "GET", headers: Dict[str, str] = None,
+                               data: Union[bytes, str, Dict] = None, timeout: float = _DEFAULT_TIME_OUT,
+                               concurrency: int = _FAN_OUT_CONCURRENCY,
+                               min_successes: int = 0,
+                               quorum: bool = False
+                               ) -> List[NodeResult]:
+    cli = get_client()
+    if cli is None:
+        raise Exception("Discovery Client has not initialized. ")
+    res = await cli.do_service_all(app_name=app_name, service=service, return_type=return_type,
+                                   prefer_ip=prefer_ip, prefer_https=prefer_https,
+                                   method=method, headers=headers,
+                                   data=data, timeout=timeout,
+                                   concurrency=concurrency, min_successes=min_successes, quorum=quorum)
+    return res
+
+
+async def do_services_async(requests: Iterable[ServiceRequest],
+                            concurrency: int = _BULK_CONCURRENCY,
+                            concurrency_per_app: int = _BULK_CONCURRENCY_PER_APP) -> AsyncIterator[ServiceResult]:
+    cli = get_client()
+    if cli is None:
+        raise Exception("Discovery Client has not initialized. ")
+    async for res in cli.do_services(requests, concurrency=concurrency, concurrency_per_app=concurrency_per_app):
+        yield res
+
+
 async def stop_async() -> None:
     client = get_client()
     if client is not None:
@@ -1259,8 +2694,54 @@ def init(eureka_server: str = _DEFAULT_EUREKA_SERVER_URL,
          is_coordinating_discovery_server: bool = False,
          metadata: Dict = {},
          remote_regions: List[str] = [],
-         ha_strategy: int = HA_STRATEGY_RANDOM,
-         strict_service_error_policy: bool = True) -> EurekaClient:
+         ha_strategy: Union[int, LoadBalanceStrategy] = HA_STRATEGY_RANDOM,
+         strict_service_error_policy: bool = True,
+         heartbeat_jitter_ratio: float = _HEARTBEAT_JITTER_RATIO,
+         heartbeat_exponential_backoff_bound: int = _HEARTBEAT_EXPONENTIAL_BACKOFF_BOUND,
+         embedded_mode: bool = False,
+         failover_mode: int = FAILOVER_SEQUENTIAL,
+         failover_hedge_delay_in_secs: float = _FAILOVER_HEDGE_DELAY_IN_SECS,
+         failover_deadline_in_secs: float = _FAILOVER_DEADLINE_IN_SECS,
+         eureka_server_breaker_threshold: int = _BREAKER_FAILURE_THRESHOLD,
+         eureka_server_breaker_reset_in_secs: float = _BREAKER_RESET_IN_SECS,
+         eureka_server_read_write_split: bool = False,
+         background_start: bool = False,
+         wait_for_ready_in_secs: float = _DEFAULT_TIME_OUT,
+         registry_snapshot_path: str = "",
+         registry_snapshot_max_staleness_in_secs: float = _REGISTRY_SNAPSHOT_MAX_STALENESS_IN_SECS,
+         registry_fetch_min_interval_in_secs: float = 0,
+         registry_fetch_max_interval_in_secs: float = 0,
+         fetch_interested_apps_only: bool = False,
+         interested_apps: List[str] = None,
+         outlier_consecutive_failures: int = _OUTLIER_CONSECUTIVE_FAILURES,
+         outlier_error_rate_threshold: float = _OUTLIER_ERROR_RATE_THRESHOLD,
+         outlier_base_ejection_in_secs: float = _OUTLIER_BASE_EJECTION_IN_SECS,
+         outlier_max_ejection_percent: float = _OUTLIER_MAX_EJECTION_PERCENT,
+         outlier_reinstatement_in_secs: float = _OUTLIER_REINSTATEMENT_IN_SECS,
+         health_check_interval_in_secs: float = 0,
+         health_check_timeout_in_secs: float = _HEALTH_CHECK_TIMEOUT_IN_SECS,
+         health_check_concurrency: int = _HEALTH_CHECK_CONCURRENCY,
+         health_check_unhealthy_threshold: int = _HEALTH_CHECK_UNHEALTHY_THRESHOLD,
+         zone_avoidance: bool = False,
+         zone_avoidance_error_rate_threshold: float = _ZONE_ERROR_RATE_THRESHOLD,
+         zone_avoidance_max_load_per_instance: float = _ZONE_MAX_LOAD_PER_INSTANCE,
+         slow_start_window_in_secs: float = _SLOW_START_WINDOW_IN_SECS,
+         slow_start_curve: str = SLOW_START_LINEAR,
+         slow_start_min_weight: float = _SLOW_START_MIN_WEIGHT,
+         slow_start_apps: Dict[str, Dict] = None,
+         subset_size: int = _SUBSET_SIZE,
+         concurrency_limit_algorithm: str = "",
+         concurrency_limit_initial: int = _CONCURRENCY_LIMIT_INITIAL,
+         concurrency_limit_min: int = _CONCURRENCY_LIMIT_MIN,
+         concurrency_limit_max: int = _CONCURRENCY_LIMIT_MAX,
+         concurrency_limit_queue_size: int = _CONCURRENCY_LIMIT_QUEUE_SIZE,
+         concurrency_limit_queue_timeout_in_secs: float = _CONCURRENCY_LIMIT_QUEUE_TIMEOUT_IN_SECS,
+         retry_max_attempts: int = _RETRY_MAX_ATTEMPTS,
+         retry_backoff_in_secs: float = _RETRY_BACKOFF_IN_SECS,
+         retry_backoff_max_in_secs: float = _RETRY_BACKOFF_MAX_IN_SECS,
+         retry_on_status_codes: List[int] = None,
+         retry_budget_ratio: float = _RETRY_BUDGET_RATIO,
+         retry_budget_min_per_sec: float = _RETRY_BUDGET_MIN_PER_SEC) -> EurekaClient:
     """
     Initialize an EurekaClient object and put it to cache, you can use a set of functions to do the service.
 
@@ -1268,7 +2749,11 @@ def init(eureka_server: str = _DEFAULT_EUREKA_SERVER_URL,
     will start the client automatically after the object created.
 
     read EurekaClient for more information for the parameters details.
+
+    `embedded_mode` is not supported here, the loop that runs this method stops when it returns and the heartbeat would never
+    run, use `init_async` in a loop that keeps running instead.
     """
+    assert not embedded_mode, "embedded_mode only works with init_async in a running event loop, use init_async instead"
     return get_event_loop().run_until_complete(init_async(eureka_server=eureka_server,
                                                           eureka_domain=eureka_domain,
                                                           region=region,
@@ -1304,28 +2789,126 @@ def init(eureka_server: str = _DEFAULT_EUREKA_SERVER_URL,
                                                           metadata=metadata,
                                                           remote_regions=remote_regions,
                                                           ha_strategy=ha_strategy,
-                                                          strict_service_error_policy=strict_service_error_policy))
+                                                          strict_service_error_policy=strict_service_error_policy,
+                                                          heartbeat_jitter_ratio=heartbeat_jitter_ratio,
+                                                          heartbeat_exponential_backoff_bound=heartbeat_exponential_backoff_bound,
+                                                          embedded_mode=embedded_mode,
+                                                          failover_mode=failover_mode,
+                                                          failover_hedge_delay_in_secs=failover_hedge_delay_in_secs,
+                                                          failover_deadline_in_secs=failover_deadline_in_secs,
+                                                          eureka_server_breaker_threshold=eureka_server_breaker_threshold,
+                                                          eureka_server_breaker_reset_in_secs=eureka_server_breaker_reset_in_secs,
+                                                          eureka_server_read_write_split=eureka_server_read_write_split,
+                                                          background_start=background_start,
+                                                          wait_for_ready_in_secs=wait_for_ready_in_secs,
+                                                          registry_snapshot_path=registry_snapshot_path,
+                                                          registry_snapshot_max_staleness_in_secs=registry_snapshot_max_staleness_in_secs,
+                                                          registry_fetch_min_interval_in_secs=registry_fetch_min_interval_in_secs,
+                                                          registry_fetch_max_interval_in_secs=registry_fetch_max_interval_in_secs,
+                                                          fetch_interested_apps_only=fetch_interested_apps_only,
+                                                          interested_apps=interested_apps,
+                                                          outlier_consecutive_failures=outlier_consecutive_failures,
+                                                          outlier_error_rate_threshold=outlier_error_rate_threshold,
+                                                          outlier_base_ejection_in_secs=outlier_base_ejection_in_secs,
+                                                          outlier_max_ejection_percent=outlier_max_ejection_percent,
+                                                          outlier_reinstatement_in_secs=outlier_reinstatement_in_secs,
+                                                          health_check_interval_in_secs=health_check_interval_in_secs,
+                                                          health_check_timeout_in_secs=health_check_timeout_in_secs,
+                                                          health_check_concurrency=health_check_concurrency,
+                                                          health_check_unhealthy_threshold=health_check_unhealthy_threshold,
+                                                          zone_avoidance=zone_avoidance,
+                                                          zone_avoidance_error_rate_threshold=zone_avoidance_error_rate_threshold,
+                                                          zone_avoidance_max_load_per_instance=zone_avoidance_max_load_per_instance,
+                                                          slow_start_window_in_secs=slow_start_window_in_secs,
+                                                          slow_start_curve=slow_start_curve,
+                                                          slow_start_min_weight=slow_start_min_weight,
+                                                          slow_start_apps=slow_start_apps,
+                                                          subset_size=subset_size,
+                                                          concurrency_limit_algorithm=concurrency_limit_algorithm,
+                                                          concurrency_limit_initial=concurrency_limit_initial,
+                                                          concurrency_limit_min=concurrency_limit_min,
+                                                          concurrency_limit_max=concurrency_limit_max,
+                                                          concurrency_limit_queue_size=concurrency_limit_queue_size,
+                                                          concurrency_limit_queue_timeout_in_secs=concurrency_limit_queue_timeout_in_secs,
+                                                          retry_max_attempts=retry_max_attempts,
+                                                          retry_backoff_in_secs=retry_backoff_in_secs,
+                                                          retry_backoff_max_in_secs=retry_backoff_max_in_secs,
+                                                          retry_on_status_codes=retry_on_status_codes,
+                                                          retry_budget_ratio=retry_budget_ratio,
+                                                          retry_budget_min_per_sec=retry_budget_min_per_sec))
 
 
 def walk_nodes(app_name: str = "",
                service: str = "",
                prefer_ip: bool = False,
                prefer_https: bool = False,
-               walker: Callable = None) -> Union[str, Dict, http_client.HttpResponse]:
+               walker: Callable = None,
+               hash_key: str = "",
+               retry_policy: RetryPolicy = None) -> Union[str, Dict, http_client.HttpResponse]:
     return get_event_loop().run_until_complete(walk_nodes_async(app_name=app_name, service=service,
-                                                                prefer_ip=prefer_ip, prefer_https=prefer_https, walker=walker))
+                                                                prefer_ip=prefer_ip, prefer_https=prefer_https, walker=walker,
+                                                                hash_key=hash_key, retry_policy=retry_policy))
 
 
 def do_service(app_name: str = "", service: str = "", return_type: str = "string",
                prefer_ip: bool = False, prefer_https: bool = False,
                method: str = "GET", headers: Dict[str, str] = None,
-               data: Union[bytes, str, Dict] = None, timeout: float = _DEFAULT_TIME_OUT
+               data: Union[bytes, str, Dict] = None, timeout: float = _DEFAULT_TIME_OUT,
+               hash_key: str = "",
+               retry_policy: RetryPolicy = None
                ) -> Union[str, Dict, http_client.HttpResponse]:
 
     return get_event_loop().run_until_complete(do_service_async(app_name=app_name, service=service, return_type=return_type,
                                                                 prefer_ip=prefer_ip, prefer_https=prefer_https,
                                                                 method=method, headers=headers,
-                                                                data=data, timeout=timeout))
+                                                                data=data, timeout=timeout, hash_key=hash_key,
+                                                                retry_policy=retry_policy))
+
+
+def walk_all_nodes(app_name: str = "",
+                   service: str = "",
+                   prefer_ip: bool = False,
+                   prefer_https: bool = False,
+                   walker: Callable = None,
+                   concurrency: int = _FAN_OUT_CONCURRENCY,
+                   timeout: float = _DEFAULT_TIME_OUT,
+                   min_successes: int = 0,
+                   quorum: bool = False) -> List[NodeResult]:
+    return get_event_loop().run_until_complete(walk_all_nodes_async(app_name=app_name, service=service,
+                                                                    prefer_ip=prefer_ip, prefer_https=prefer_https, walker=walker,
+                                                                    concurrency=concurrency, timeout=timeout,
+                                                                    min_successes=min_successes, quorum=quorum))
+
+
+def do_service_all(app_name: str = "", service: str = "", return_type: str = "string",
+                   prefer_ip: bool = False, prefer_https: bool = False,
+                   method: str = "GET", headers: Dict[str, str] = None,
+                   data: Union[bytes, str, Dict] = None, timeout: float = _DEFAULT_TIME_OUT,
+                   concurrency: int = _FAN_OUT_CONCURRENCY,
+                   min_successes: int = 0,
+                   quorum: bool = False
+                   ) -> List[NodeResult]:
+    return get_event_loop().run_until_complete(do_service_all_async(app_name=app_name, service=service, return_type=return_type,
+                                                                    prefer_ip=prefer_ip, prefer_https=prefer_https,
+                                                                    method=method, headers=headers,
+                                                                    data=data, timeout=timeout,
+                                                                    concurrency=concurrency, min_successes=min_successes,
+                                                                    quorum=quorum))
+
+
+def do_services(requests: Iterable[ServiceRequest],
+                concurrency: int = _BULK_CONCURRENCY,
+                concurrency_per_app: int = _BULK_CONCURRENCY_PER_APP) -> Iterator[ServiceResult]:
+    loop = get_event_loop()
+    results = do_services_async(requests, concurrency=concurrency, concurrency_per_app=concurrency_per_app)
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(results.__anext__())
+            except StopAsyncIteration:
+                return
+    finally:
+        loop.run_until_complete(results.aclose())
 
 
 def stop() -> None:
@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (c) 2018 Keijack Wu
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import time
+
+from threading import RLock
+from typing import Dict, List
+
+import py_eureka_client.http_client as http_client
+from py_eureka_client.logger import get_logger
+
+from py_eureka_client import _DEFAULT_TIME_OUT
+
+
+_logger = get_logger("eureka_server_health")
+
+"""
+States of the circuit breaker of an eureka server
+"""
+CIRCUIT_CLOSED: str = "CLOSED"
+CIRCUIT_OPEN: str = "OPEN"
+CIRCUIT_HALF_OPEN: str = "HALF_OPEN"
+
+_EWMA_ALPHA = 0.3
+_BREAKER_FAILURE_THRESHOLD = 3
+_BREAKER_RESET_IN_SECS = 30
+
+
+def is_server_error(error: Exception) -> bool:
+    """
+    A 4xx response means the eureka server is up and answering (for example, a 404 on heartbeat when the instance
+    is not registered), so only connection errors and 5xx responses count against the server.
+    """
+    if isinstance(error, http_client.HTTPError):
+        return error.code is None or error.code >= 500
+    return isinstance(error, http_client.URLError)
+
+
+class EurekaServerHealth:
+    """
+    The health state of one eureka server url.
+
+    * ewma_latency: The exponentially weighted moving average of the request latency in seconds.
+    * error_rate: The exponentially weighted moving average of the failures, from 0 to 1. A failure is charged at least
+        `failure_penalty_in_secs` in the latency, so a server that fails fast does not look faster than a healthy one.
+    * in_flight: The requests that are sent to this server and not answered yet.
+    * circuit: `CLOSED` when the server is healthy. After `failure_threshold` consecutive failures, the circuit becomes
+        `OPEN` and the server is skipped for `reset_in_secs`. Then it becomes `HALF_OPEN` and one request is let through
+        as a probe, a success closes the circuit and a failure opens it again.
+    """
+
+    def __init__(self,
+                 url: str,
+                 alpha: float = _EWMA_ALPHA,
+                 failure_threshold: int = _BREAKER_FAILURE_THRESHOLD,
+                 reset_in_secs: float = _BREAKER_RESET_IN_SECS,
+                 failure_penalty_in_secs: float = _DEFAULT_TIME_OUT):
+        self.url: str = url
+        self.alpha: float = alpha
+        self.failure_threshold: int = failure_threshold
+        self.reset_in_secs: float = reset_in_secs
+        self.failure_penalty_in_secs: float = failure_penalty_in_secs
+        self.ewma_latency: float = 0
+        self.error_rate: float = 0
+        self.consecutive_failures: int = 0
+        self.in_flight: int = 0
+        self.requests: int = 0
+        self.failures: int = 0
+        self.__circuit: str = CIRCUIT_CLOSED
+        self.__opened_at: float = 0
+        self.__probing: bool = False
+        self.__lock = RLock()
+
+    @property
+    def circuit(self) -> str:
+        with self.__lock:
+            if self.__circuit == CIRCUIT_OPEN and time.monotonic() - self.__opened_at >= self.reset_in_secs:
+                self.__circuit = CIRCUIT_HALF_OPEN
+                self.__probing = False
+            return self.__circuit
+
+    @property
+    def score(self) -> float:
+        """
+        Lower is better. An unknown server is scored as if it answers at once, so it will be tried and measured.
+        """
+        return self.ewma_latency * (1 + 10 * self.error_rate) * (1 + self.in_flight)
+
+    @property
+    def rank(self) -> tuple:
+        """
+        The servers are tried in this order: the ones whose circuit is closed first, then by the score.
+        """
+        return (self.circuit != CIRCUIT_CLOSED, self.score)
+
+    def allow_request(self) -> bool:
+        with self.__lock:
+            circuit = self.circuit
+            if circuit == CIRCUIT_CLOSED:
+                return True
+            if circuit == CIRCUIT_HALF_OPEN and not self.__probing:
+                self.__probing = True
+                return True
+            return False
+
+    def start_request(self) -> None:
+        with self.__lock:
+            self.in_flight += 1
+
+    def __end_request(self) -> None:
+        self.in_flight = max(0, self.in_flight - 1)
+        self.__probing = False
+
+    def __ewma(self, avg: float, value: float) -> float:
+        return value if self.requests == 1 else self.alpha * value + (1 - self.alpha) * avg
+
+    def record_success(self, latency: float) -> None:
+        with self.__lock:
+            self.requests += 1
+            self.ewma_latency = self.__ewma(self.ewma_latency, latency)
+            self.error_rate = self.__ewma(self.error_rate, 0)
+            self.consecutive_failures = 0
+            self.__end_request()
+            if self.__circuit != CIRCUIT_CLOSED:
+                _logger.info(f"Eureka server [{self.url}] recovers, close the circuit.")
+            self.__circuit = CIRCUIT_CLOSED
+
+    def record_failure(self, latency: float = 0) -> None:
+        with self.__lock:
+            self.requests += 1
+            self.failures += 1
+            self.ewma_latency = self.__ewma(self.ewma_latency, max(latency, self.failure_penalty_in_secs))
+            self.error_rate = self.__ewma(self.error_rate, 1)
+            self.consecutive_failures += 1
+            self.__end_request()
+            if self.failure_threshold > 0 and (self.__circuit == CIRCUIT_HALF_OPEN or self.consecutive_failures >= self.failure_threshold):
+                if self.__circuit != CIRCUIT_OPEN:
+                    _logger.warning(f"Eureka server [{self.url}] fails {self.consecutive_failures} time(s), open the circuit.")
+                self.__circuit = CIRCUIT_OPEN
+                self.__opened_at = time.monotonic()
+
+    def release(self) -> None:
+        """
+        Give the probe slot back when a request is abandoned without a result, e.g. cancelled by a hedged request.
+        """
+        with self.__lock:
+            self.__end_request()
+
+    def to_dict(self) -> Dict:
+        return {
+            "url": self.url,
+            "circuit": self.circuit,
+            "ewma_latency": self.ewma_latency,
+            "error_rate": self.error_rate,
+            "score": self.score,
+            "consecutive_failures": self.consecutive_failures,
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "failures": self.failures
+        }
+
+
+class EurekaServerHealthTracker:
+
+    def __init__(self,
+                 alpha: float = _EWMA_ALPHA,
+                 failure_threshold: int = _BREAKER_FAILURE_THRESHOLD,
+                 reset_in_secs: float = _BREAKER_RESET_IN_SECS,
+                 failure_penalty_in_secs: float = _DEFAULT_TIME_OUT):
+        self.alpha: float = alpha
+        self.failure_threshold: int = failure_threshold
+        self.reset_in_secs: float = reset_in_secs
+        self.failure_penalty_in_secs: float = failure_penalty_in_secs
+        self.__servers: Dict[str, EurekaServerHealth] = {}
+        self.__lock = RLock()
+
+    def get(self, url: str) -> EurekaServerHealth:
+        with self.__lock:
+            if url not in self.__servers:
+                self.__servers[url] = EurekaServerHealth(url, alpha=self.alpha,
+                                                         failure_threshold=self.failure_threshold,
+                                                         reset_in_secs=self.reset_in_secs,
+                                                         failure_penalty_in_secs=self.failure_penalty_in_secs)
+            return self.__servers[url]
+
+    def sort(self, urls: List[str]) -> List[str]:
+        """
+        Sort the urls by their ranks, the fastest healthy one first. The order of the urls with the same rank is kept.
+        """
+        return sorted(urls, key=lambda url: self.get(url.strip()).rank)
+
+    def snapshot(self) -> Dict[str, Dict]:
+        with self.__lock:
+            return {url: health.to_dict() for url, health in self.__servers.items()}
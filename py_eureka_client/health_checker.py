@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (c) 2018 Keijack Wu
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import asyncio
+import time
+
+from threading import RLock
+from typing import Dict, List
+
+import py_eureka_client.http_client as http_client
+from py_eureka_client.logger import get_logger
+from py_eureka_client.eureka_basic import Instance
+
+
+_logger = get_logger("health_checker")
+
+_HEALTH_CHECK_TIMEOUT_IN_SECS = 2
+_HEALTH_CHECK_CONCURRENCY = 4
+_HEALTH_CHECK_UNHEALTHY_THRESHOLD = 2
+
+
+class _InstanceHealth:
+
+    def __init__(self):
+        self.healthy: bool = True
+        self.consecutive_failures: int = 0
+        self.checks: int = 0
+        self.failures: int = 0
+        self.checked_at: float = 0
+        self.error: str = ""
+
+
+class InstanceHealthChecker:
+    """
+    Probes the `healthCheckUrl` of the UP instances of the applications that are watched. An instance that fails `unhealthy_threshold`
+    probes in a row is taken as unhealthy until a probe succeeds again, even if the registry still says it is UP.
+
+    The probes of a round are spread evenly over `interval_in_secs`, and no more than `concurrency` of them are in flight at the same
+    time. The instances without a health check url are always healthy.
+    """
+
+    def __init__(self,
+                 interval_in_secs: float,
+                 timeout_in_secs: float = _HEALTH_CHECK_TIMEOUT_IN_SECS,
+                 concurrency: int = _HEALTH_CHECK_CONCURRENCY,
+                 unhealthy_threshold: int = _HEALTH_CHECK_UNHEALTHY_THRESHOLD):
+        assert concurrency > 0, "concurrency must be positive"
+        self.interval_in_secs: float = interval_in_secs
+        self.timeout_in_secs: float = timeout_in_secs
+        self.concurrency: int = concurrency
+        self.unhealthy_threshold: int = max(1, unhealthy_threshold)
+        self.__watched_apps: Dict[str, None] = {}
+        self.__instances: Dict[str, _InstanceHealth] = {}
+        self.__lock = RLock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.interval_in_secs > 0
+
+    @property
+    def watched_apps(self) -> List[str]:
+        with self.__lock:
+            return list(self.__watched_apps.keys())
+
+    def watch(self, app_name: str) -> None:
+        if self.enabled and app_name not in self.__watched_apps:
+            with self.__lock:
+                self.__watched_apps[app_name] = None
+
+    def is_healthy(self, instance_id: str) -> bool:
+        health = self.__instances.get(instance_id)
+        return health is None or health.healthy
+
+    def filter(self, instances: List[Instance]) -> List[Instance]:
+        if not self.__instances:
+            return instances
+        return [instance for instance in instances if self.is_healthy(instance.instanceId)]
+
+    @staticmethod
+    def health_check_url(instance: Instance) -> str:
+        return instance.healthCheckUrl or instance.secureHealthCheckUrl
+
+    async def probe(self, instance: Instance) -> bool:
+        url = self.health_check_url(instance)
+        try:
+            await http_client.http_client.urlopen(url, timeout=self.timeout_in_secs)
+        except Exception as e:
+            self.__record(instance.instanceId, str(e) or e.__class__.__name__)
+            return False
+        else:
+            self.__record(instance.instanceId)
+            return True
+
+    def __record(self, instance_id: str, error: str = "") -> None:
+        with self.__lock:
+            health = self.__instances.get(instance_id)
+            if health is None:
+                health = self.__instances[instance_id] = _InstanceHealth()
+            health.checks += 1
+            health.checked_at = time.time()
+            health.error = error
+            if not error:
+                if not health.healthy:
+                    _logger.info(f"Instance [{instance_id}] passes the health check again.")
+                health.healthy = True
+                health.consecutive_failures = 0
+                return
+            health.failures += 1
+            health.consecutive_failures += 1
+            if health.healthy and health.consecutive_failures >= self.unhealthy_threshold:
+                _logger.warning(f"Instance [{instance_id}] fails {health.consecutive_failures} health check(s), skip it. Error: {error}")
+                health.healthy = False
+
+    async def check(self, instances: List[Instance]) -> None:
+        """
+        Probe the instances once, spreading the probes over the interval.
+        """
+        instances = [instance for instance in instances if self.health_check_url(instance)]
+        with self.__lock:
+            ids = {instance.instanceId for instance in instances}
+            for instance_id in [instance_id for instance_id in self.__instances if instance_id not in ids]:
+                del self.__instances[instance_id]
+        if not instances:
+            return
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        spread = self.interval_in_secs / len(instances)
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def probe_at(idx, instance):
+            await asyncio.sleep(max(0, start + idx * spread - loop.time()))
+            async with semaphore:
+                await self.probe(instance)
+
+        await asyncio.gather(*[probe_at(idx, instance) for idx, instance in enumerate(instances)])
+
+    def snapshot(self) -> Dict[str, Dict]:
+        with self.__lock:
+            return {instance_id: {
+                "healthy": health.healthy,
+                "consecutive_failures": health.consecutive_failures,
+                "checks": health.checks,
+                "failures": health.failures,
+                "checked_at": health.checked_at,
+                "error": health.error
+            } for instance_id, health in self.__instances.items()}
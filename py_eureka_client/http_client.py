@@ -24,6 +24,8 @@ SOFTWARE.
 
 import re
 import base64
+import asyncio
+import weakref
 import httpx
 from urllib.error import HTTPError, URLError
 from io import BytesIO
@@ -31,6 +33,10 @@ from io import BytesIO
 from typing import Union
 from urllib.parse import unquote
 
+from py_eureka_client.logger import get_logger
+
+_logger = get_logger("http_client")
+
 
 _URL_REGEX = re.compile(
     r'^((?:http)s?)://'  # http:// or https://
@@ -125,32 +131,92 @@ class HttpResponse:
         self.__body_text = value
 
 
+def _to_request(request: Union[str, HttpRequest], data: bytes) -> HttpRequest:
+    if isinstance(request, HttpRequest):
+        req = request
+    elif isinstance(request, str):
+        req = HttpRequest(request)
+    else:
+        raise URLError("Invalid URL")
+
+    if data is not None:
+        req.content = data
+    return req
+
+
+async def _send(client: httpx.AsyncClient, request: httpx.Request) -> HttpResponse:
+    try:
+        res = await client.send(request)
+        res.raise_for_status()
+        return HttpResponse(res)
+    except httpx.HTTPStatusError as e:
+        raise HTTPError(e.request.url, e.response.status_code, str(e), e.response.headers, BytesIO(e.response.content)) from e
+    except httpx.RequestError as e:
+        raise URLError(str(e)) from e
+
+
 class HttpClient:
 
     async def urlopen(self, request: Union[str, HttpRequest] = None,
                       data: bytes = None, timeout: float = None) -> HttpResponse:
-        if isinstance(request, HttpRequest):
-            req = request
-        elif isinstance(request, str):
-            req = HttpRequest(request)
-        else:
-            raise URLError("Invalid URL")
-
-        if data is not None:
-            req.content = data
+        req = _to_request(request, data)
 
         req.add_header("Connection", "close")
         req.add_header("Accept-Encoding", "gzip, deflate")
 
-        try:
-            async with httpx.AsyncClient(timeout=timeout, follow_redirects=True) as client:
-                res = await client.send(req._to_httpx_request())
-                res.raise_for_status()
-                return HttpResponse(res)
-        except httpx.HTTPStatusError as e:
-            raise HTTPError(e.request.url, e.response.status_code, str(e), e.response.headers, BytesIO(e.response.content)) from e
-        except httpx.RequestError as e:
-            raise URLError(str(e)) from e
+        async with httpx.AsyncClient(timeout=timeout, follow_redirects=True) as client:
+            return await _send(client, req._to_httpx_request())
+
+
+class PooledHttpClient(HttpClient):
+    """
+    A `HttpClient` that keeps the connections alive and reuses them between the requests. The connections are pooled for
+    each event loop, because they can not be shared between the loops.
+    """
+
+    def __init__(self,
+                 max_connections: int = 100,
+                 max_keepalive_connections: int = 20,
+                 keepalive_expiry: float = 5):
+        self.limits = httpx.Limits(max_connections=max_connections,
+                                   max_keepalive_connections=max_keepalive_connections,
+                                   keepalive_expiry=keepalive_expiry)
+        self.__clients = weakref.WeakKeyDictionary()
+
+    def __client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_event_loop()
+        client = self.__clients.get(loop)
+        if client is None or client.is_closed:
+            client = self.__clients[loop] = httpx.AsyncClient(limits=self.limits, follow_redirects=True)
+        return client
+
+    async def urlopen(self, request: Union[str, HttpRequest] = None,
+                      data: bytes = None, timeout: float = None) -> HttpResponse:
+        req = _to_request(request, data)
+        req.add_header("Accept-Encoding", "gzip, deflate")
+
+        client = self.__client()
+        return await _send(client, client.build_request(req.method, req.url, headers=req.headers, content=req.content, timeout=timeout))
+
+    async def aclose(self) -> None:
+        """
+        Close the connections of the pools of all the event loops. A pool is closed in its own loop, so the ones of the loops
+        running in other threads are closed there, and the ones of the loops that are closed or not running are dropped, their
+        connections can not be used any more, or will be released with the loops.
+        """
+        current = asyncio.get_event_loop()
+        closing = []
+        for loop, client in list(self.__clients.items()):
+            del self.__clients[loop]
+            if client.is_closed:
+                continue
+            if loop is current:
+                closing.append(client.aclose())
+            elif loop.is_running() and not loop.is_closed():
+                closing.append(asyncio.wrap_future(asyncio.run_coroutine_threadsafe(client.aclose(), loop)))
+        for error in await asyncio.gather(*closing, return_exceptions=True):
+            if isinstance(error, Exception):
+                _logger.warning("Close the connection pool error.", exc_info=error)
 
 
 http_client = HttpClient()
@@ -0,0 +1,446 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (c) 2018 Keijack Wu
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import bisect
+import hashlib
+import heapq
+import itertools
+import math
+import random
+import time
+
+from threading import RLock
+from typing import Any, Dict, List, Union
+
+from py_eureka_client.logger import get_logger
+from py_eureka_client.eureka_basic import Application, Instance
+
+from py_eureka_client import HA_STRATEGY_RANDOM, HA_STRATEGY_STICK, HA_STRATEGY_OTHER
+from py_eureka_client import HA_STRATEGY_ROUND_ROBIN, HA_STRATEGY_WEIGHTED_RANDOM, HA_STRATEGY_LEAST_OUTSTANDING
+from py_eureka_client import HA_STRATEGY_LEAST_LATENCY, HA_STRATEGY_CONSISTENT_HASH
+from py_eureka_client import _DEFAULT_TIME_OUT
+
+
+_logger = get_logger("load_balancer")
+
+_WEIGHT_METADATA_KEY = "weight"
+_DEFAULT_WEIGHT = 1.0
+_LATENCY_EWMA_ALPHA = 0.3
+_LATENCY_DECAY_IN_SECS = 10
+_HASH_RING_VIRTUAL_NODES = 160
+
+
+class SelectionContext:
+    """
+    What a strategy knows when it chooses an instance for a request.
+
+    * app: The application.
+    * candidates: The UP instances to choose from. The excluded ones, and the ones not in the same zone when `prefer_same_zone`
+        works, are already filtered out.
+    * excluded_ids: The ids of the instances that are excluded, e.g. the ones that have failed in this `walk_nodes`.
+    * request_key: The service path of the request.
+    * state: The state of the application that the strategy builds in `build_state`.
+    * hash_key: The key that `walk_nodes` or `do_service` is called with, e.g. a user id, for the strategies that route by key.
+    """
+
+    def __init__(self,
+                 app: Application,
+                 candidates: List[Instance],
+                 excluded_ids: List[str] = None,
+                 request_key: str = "",
+                 state: Any = None,
+                 hash_key: str = ""):
+        self.app: Application = app
+        self.candidates: List[Instance] = candidates
+        self.excluded_ids: List[str] = excluded_ids if excluded_ids is not None else []
+        self.request_key: str = request_key
+        self.state: Any = state
+        self.hash_key: str = hash_key
+
+
+class LoadBalanceStrategy:
+    """
+    The base class of the strategies that choose an instance of an application for a request.
+
+    A strategy implements `select`. It can also implement `build_state` to prepare something from the instances of an application,
+    e.g. a weight table, the state is passed back in `SelectionContext.state` and it is rebuilt only when the instances of the
+    application change. A strategy that can apply the changes to the previous state implements `update_state` as well.
+    `on_request_start` and `on_request_end` are called around every request that `walk_nodes` sends to the
+    chosen instance, so that a strategy can learn from the results.
+
+    A strategy that routes the requests with the same `hash_key` to the same instance sets `key_affine`, then the requests with
+    a `hash_key` are chosen from all the instances rather than from the subset of this client.
+    """
+
+    key_affine: bool = False
+
+    def __init__(self):
+        self.__states: Dict[str, tuple] = {}
+        self.__state_lock = RLock()
+
+    def build_state(self, app: Application) -> Any:
+        return None
+
+    def update_state(self, app: Application, state: Any) -> Any:
+        """
+        Called instead of `build_state` when the instances of an application change and there is a previous state.
+        """
+        return self.build_state(app)
+
+    def select(self, context: SelectionContext) -> Instance:
+        raise NotImplementedError()
+
+    def on_request_start(self, app_name: str, instance: Instance) -> None:
+        pass
+
+    def on_request_end(self, app_name: str, instance: Instance, latency: float, error: Exception = None) -> None:
+        pass
+
+    def state_of(self, app: Application) -> Any:
+        with self.__state_lock:
+            cached = self.__states.get(app.name)
+            if cached is None or cached[0] is not app or cached[1] != app.version:
+                _logger.debug(f"build the load balance state of application [{app.name}] of version {app.version}.")
+                version = app.version
+                state = self.build_state(app) if cached is None else self.update_state(app, cached[2])
+                cached = (app, version, state)
+                self.__states[app.name] = cached
+            return cached[2]
+
+    def choose(self, app: Application, candidates: List[Instance], excluded_ids: List[str] = None, request_key: str = "",
+               hash_key: str = "") -> Instance:
+        if not candidates:
+            return None
+        return self.select(SelectionContext(app, candidates, excluded_ids, request_key, self.state_of(app), hash_key))
+
+
+class RandomStrategy(LoadBalanceStrategy):
+
+    def select(self, context: SelectionContext) -> Instance:
+        return random.choice(context.candidates)
+
+
+class StickStrategy(LoadBalanceStrategy):
+    """
+    Use one instance until it is not a candidate any more.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.__sticks: Dict[str, str] = {}
+
+    def select(self, context: SelectionContext) -> Instance:
+        stick_id = self.__sticks.get(context.app.name)
+        for instance in context.candidates:
+            if instance.instanceId == stick_id:
+                return instance
+        instance = random.choice(context.candidates)
+        self.__sticks[context.app.name] = instance.instanceId
+        return instance
+
+
+class OtherStrategy(LoadBalanceStrategy):
+    """
+    Always use a different instance from the last time if there is one.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.__lasts: Dict[str, str] = {}
+
+    def select(self, context: SelectionContext) -> Instance:
+        last_id = self.__lasts.get(context.app.name)
+        others = [instance for instance in context.candidates if instance.instanceId != last_id]
+        instance = random.choice(others if others else context.candidates)
+        self.__lasts[context.app.name] = instance.instanceId
+        return instance
+
+
+class RoundRobinStrategy(LoadBalanceStrategy):
+    """
+    Choose the candidates one after another. The counter of an application starts over when its instances change.
+    """
+
+    def build_state(self, app: Application) -> Any:
+        return itertools.count(random.randint(0, 1 << 16))
+
+    def select(self, context: SelectionContext) -> Instance:
+        return context.candidates[next(context.state) % len(context.candidates)]
+
+
+class WeightedRandomStrategy(LoadBalanceStrategy):
+    """
+    Choose the candidates randomly by their weights, the weight of an instance is read from its metadata, the key is `weight`
+    by default, and the instances without a weight get `default_weight`.
+    """
+
+    def __init__(self, weight_key: str = _WEIGHT_METADATA_KEY, default_weight: float = _DEFAULT_WEIGHT):
+        super().__init__()
+        self.weight_key: str = weight_key
+        self.default_weight: float = default_weight
+
+    def build_state(self, app: Application) -> Any:
+        weights = {}
+        for instance in app.instances:
+            metadata = instance.metadata or {}
+            try:
+                weights[instance.instanceId] = max(0.0, float(metadata.get(self.weight_key, self.default_weight)))
+            except (TypeError, ValueError):
+                _logger.warning(f"Weight of instance [{instance.instanceId}] is not a number, use the default one.")
+                weights[instance.instanceId] = self.default_weight
+        return weights
+
+    def select(self, context: SelectionContext) -> Instance:
+        weights = [context.state.get(instance.instanceId, self.default_weight) for instance in context.candidates]
+        if sum(weights) <= 0:
+            return random.choice(context.candidates)
+        return random.choices(context.candidates, weights=weights)[0]
+
+
+class LeastOutstandingStrategy(LoadBalanceStrategy):
+    """
+    Choose the candidate with the fewest requests in flight, the ties are broken randomly.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.__outstanding: Dict[str, int] = {}
+        self.__lock = RLock()
+
+    def outstanding(self, instance_id: str) -> int:
+        return self.__outstanding.get(instance_id, 0)
+
+    def on_request_start(self, app_name: str, instance: Instance) -> None:
+        with self.__lock:
+            self.__outstanding[instance.instanceId] = self.__outstanding.get(instance.instanceId, 0) + 1
+
+    def on_request_end(self, app_name: str, instance: Instance, latency: float, error: Exception = None) -> None:
+        with self.__lock:
+            count = self.__outstanding.get(instance.instanceId, 0) - 1
+            if count > 0:
+                self.__outstanding[instance.instanceId] = count
+            else:
+                self.__outstanding.pop(instance.instanceId, None)
+
+    def select(self, context: SelectionContext) -> Instance:
+        counts = [self.__outstanding.get(instance.instanceId, 0) for instance in context.candidates]
+        fewest = min(counts)
+        return random.choice([instance for instance, count in zip(context.candidates, counts) if count == fewest])
+
+
+class _LatencyStats:
+
+    def __init__(self, app_name: str = ""):
+        self.app_name: str = app_name
+        self.ewma_latency: float = 0
+        self.in_flight: int = 0
+        self.requests: int = 0
+        self.failures: int = 0
+        self.updated_at: float = 0
+
+
+class LeastLatencyStrategy(LoadBalanceStrategy):
+    """
+    Power of two choices: pick two candidates randomly and choose the one with the lower cost, the cost is the exponentially
+    weighted moving average of the latency multiplied by the requests in flight plus one. A failed request counts as
+    `error_penalty_in_secs` if it fails faster than that.
+
+    An instance that is not measured yet starts at the average latency of its application, so its requests in flight still
+    count. The latency of an instance that has not been chosen for a while decays towards that average by
+    `exp(-idle / decay_in_secs)`, so that an instance that was slow will be tried again. The statistics of the instances that
+    leave the application are dropped.
+    """
+
+    def __init__(self,
+                 alpha: float = _LATENCY_EWMA_ALPHA,
+                 decay_in_secs: float = _LATENCY_DECAY_IN_SECS,
+                 error_penalty_in_secs: float = _DEFAULT_TIME_OUT):
+        super().__init__()
+        self.alpha: float = alpha
+        self.decay_in_secs: float = decay_in_secs
+        self.error_penalty_in_secs: float = error_penalty_in_secs
+        self.__stats: Dict[str, _LatencyStats] = {}
+        self.__app_latency: Dict[str, float] = {}
+        self.__lock = RLock()
+
+    def build_state(self, app: Application) -> Any:
+        return frozenset(instance.instanceId for instance in app.instances)
+
+    def update_state(self, app: Application, state: Any) -> Any:
+        instance_ids = self.build_state(app)
+        with self.__lock:
+            for instance_id in state - instance_ids:
+                self.__stats.pop(instance_id, None)
+        return instance_ids
+
+    def __default_latency(self, app_name: str) -> float:
+        return self.__app_latency.get(app_name, self.error_penalty_in_secs)
+
+    def cost(self, instance_id: str, now: float = None) -> float:
+        with self.__lock:
+            stats = self.__stats.get(instance_id)
+            if stats is None:
+                # Never chosen, so there is nothing in flight, its first request makes it count.
+                return 0
+            default_latency = self.__default_latency(stats.app_name)
+            if stats.requests == 0:
+                return default_latency * (stats.in_flight + 1)
+            now = time.monotonic() if now is None else now
+            latency = stats.ewma_latency
+            if self.decay_in_secs > 0:
+                latency = default_latency + (latency - default_latency) * math.exp(-max(0, now - stats.updated_at) / self.decay_in_secs)
+            return latency * (stats.in_flight + 1)
+
+    def stats(self) -> Dict[str, Dict]:
+        """
+        The latency statistics of the instances that have been chosen, keyed by instance id.
+        """
+        with self.__lock:
+            return {instance_id: {"ewma_latency": stats.ewma_latency, "in_flight": stats.in_flight, "requests": stats.requests,
+                                  "failures": stats.failures, "cost": self.cost(instance_id)}
+                    for instance_id, stats in self.__stats.items()}
+
+    def on_request_start(self, app_name: str, instance: Instance) -> None:
+        with self.__lock:
+            stats = self.__stats.get(instance.instanceId)
+            if stats is None:
+                stats = self.__stats[instance.instanceId] = _LatencyStats(app_name)
+            stats.in_flight += 1
+
+    def on_request_end(self, app_name: str, instance: Instance, latency: float, error: Exception = None) -> None:
+        with self.__lock:
+            stats = self.__stats.get(instance.instanceId)
+            if stats is None:
+                # The instance has left the application.
+                return
+            stats.in_flight = max(0, stats.in_flight - 1)
+            if error is not None:
+                stats.failures += 1
+                latency = max(latency, self.error_penalty_in_secs)
+            stats.ewma_latency = latency if stats.requests == 0 else self.alpha * latency + (1 - self.alpha) * stats.ewma_latency
+            stats.requests += 1
+            stats.updated_at = time.monotonic()
+            app_latency = self.__app_latency.get(app_name)
+            self.__app_latency[app_name] = latency if app_latency is None else self.alpha * latency + (1 - self.alpha) * app_latency
+
+    def select(self, context: SelectionContext) -> Instance:
+        if len(context.candidates) == 1:
+            return context.candidates[0]
+        first, second = random.sample(context.candidates, 2)
+        now = time.monotonic()
+        with self.__lock:
+            return second if self.cost(second.instanceId, now) < self.cost(first.instanceId, now) else first
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], "big")
+
+
+class _HashRing:
+
+    def __init__(self, points: List[int] = None, owners: List[str] = None, members: Dict[str, List[int]] = None):
+        self.points: List[int] = points if points is not None else []
+        self.owners: List[str] = owners if owners is not None else []
+        self.members: Dict[str, List[int]] = members if members is not None else {}
+
+
+class ConsistentHashStrategy(LoadBalanceStrategy):
+    """
+    Route the requests with the same `hash_key` to the same instance with a hash ring, each instance is placed on the ring
+    `virtual_nodes` times. When an instance is added or removed, only the keys around its points move. When the owner of a key
+    is not a candidate, e.g. it is DOWN or has failed in this call, the next instance on the ring is used. The ring is updated
+    with the instances that are added and removed rather than being rebuilt. The requests without a `hash_key` are sent to a
+    random candidate.
+    """
+
+    key_affine: bool = True
+
+    def __init__(self, virtual_nodes: int = _HASH_RING_VIRTUAL_NODES):
+        super().__init__()
+        assert virtual_nodes > 0, "virtual_nodes must be positive"
+        self.virtual_nodes: int = virtual_nodes
+
+    def __points(self, instance_id: str) -> List[int]:
+        return [_hash(f"{instance_id}#{idx}") for idx in range(self.virtual_nodes)]
+
+    def __ring_of(self, members: Dict[str, List[int]]) -> List[tuple]:
+        return sorted((point, instance_id) for instance_id, points in members.items() for point in points)
+
+    def build_state(self, app: Application) -> Any:
+        members = {instance.instanceId: self.__points(instance.instanceId) for instance in app.instances}
+        ring = self.__ring_of(members)
+        return _HashRing([point for point, _ in ring], [owner for _, owner in ring], members)
+
+    def update_state(self, app: Application, state: Any) -> Any:
+        # The previous ring may be in use by `select` in other threads, so the changes are applied to a copy.
+        ring: _HashRing = state
+        instance_ids = {instance.instanceId for instance in app.instances}
+        removed = {instance_id for instance_id in ring.members if instance_id not in instance_ids}
+        added = [instance_id for instance_id in instance_ids if instance_id not in ring.members]
+        if not removed and not added:
+            return ring
+        members = {instance_id: ps for instance_id, ps in ring.members.items() if instance_id not in removed}
+        kept = ((point, owner) for point, owner in zip(ring.points, ring.owners) if owner not in removed)
+        new_members = {instance_id: self.__points(instance_id) for instance_id in added}
+        members.update(new_members)
+        # Both are sorted, merge them rather than inserting the new points one by one.
+        merged = list(heapq.merge(kept, self.__ring_of(new_members)))
+        _logger.debug(f"hash ring of [{app.name}]: {len(added)} instance(s) added, {len(removed)} removed.")
+        return _HashRing([point for point, _ in merged], [owner for _, owner in merged], members)
+
+    def select(self, context: SelectionContext) -> Instance:
+        ring: _HashRing = context.state
+        if not context.hash_key or not ring.points:
+            return random.choice(context.candidates)
+        candidates = {instance.instanceId: instance for instance in context.candidates}
+        start = bisect.bisect(ring.points, _hash(context.hash_key))
+        size = len(ring.points)
+        for offset in range(size):
+            instance = candidates.get(ring.owners[(start + offset) % size])
+            if instance is not None:
+                return instance
+        return random.choice(context.candidates)
+
+
+_STRATEGIES = {
+    HA_STRATEGY_RANDOM: RandomStrategy,
+    HA_STRATEGY_STICK: StickStrategy,
+    HA_STRATEGY_OTHER: OtherStrategy,
+    HA_STRATEGY_ROUND_ROBIN: RoundRobinStrategy,
+    HA_STRATEGY_WEIGHTED_RANDOM: WeightedRandomStrategy,
+    HA_STRATEGY_LEAST_OUTSTANDING: LeastOutstandingStrategy,
+    HA_STRATEGY_LEAST_LATENCY: LeastLatencyStrategy,
+    HA_STRATEGY_CONSISTENT_HASH: ConsistentHashStrategy
+}
+
+
+def get_strategy(ha_strategy: Union[int, LoadBalanceStrategy]) -> LoadBalanceStrategy:
+    """
+    Return the strategy itself if it is a `LoadBalanceStrategy`, or create the one of a `HA_STRATEGY_*` constant.
+    """
+    if isinstance(ha_strategy, LoadBalanceStrategy):
+        return ha_strategy
+    assert ha_strategy in _STRATEGIES, f"do not support strategy {ha_strategy}"
+    return _STRATEGIES[ha_strategy]()
@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (c) 2018 Keijack Wu
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import random
+import time
+
+from threading import RLock
+from typing import Dict, List
+
+import py_eureka_client.http_client as http_client
+from py_eureka_client.logger import get_logger
+from py_eureka_client.eureka_basic import Instance
+
+
+_logger = get_logger("outlier_detection")
+
+"""
+States of an instance in outlier detection
+"""
+OUTLIER_ACTIVE: str = "ACTIVE"
+OUTLIER_EJECTED: str = "EJECTED"
+OUTLIER_RECOVERING: str = "RECOVERING"
+
+_OUTLIER_CONSECUTIVE_FAILURES = 0
+_OUTLIER_ERROR_RATE_THRESHOLD = 0
+_OUTLIER_ERROR_RATE_MIN_REQUESTS = 10
+_OUTLIER_ERROR_RATE_ALPHA = 0.1
+_OUTLIER_BASE_EJECTION_IN_SECS = 30
+_OUTLIER_MAX_EJECTION_IN_SECS = 300
+_OUTLIER_MAX_EJECTION_PERCENT = 50
+_OUTLIER_REINSTATEMENT_IN_SECS = 30
+
+
+def is_node_failure(error: BaseException) -> bool:
+    """
+    Connection errors, timeouts and 5xx responses mean the instance is broken, a 4xx response means the request is.
+    """
+    if isinstance(error, http_client.HTTPError):
+        return error.code is None or error.code >= 500
+    return isinstance(error, OSError)
+
+
+class _InstanceOutlier:
+
+    def __init__(self, app_name: str):
+        self.app_name: str = app_name
+        self.consecutive_failures: int = 0
+        self.error_rate: float = 0
+        self.requests: int = 0
+        self.failures: int = 0
+        self.times_ejected: int = 0
+        self.ejected_until: float = 0
+
+
+class OutlierDetector:
+    """
+    Ejects the instances that keep failing from selection across `walk_nodes` calls.
+
+    An instance is ejected after `consecutive_failures` failures in a row, or when the moving average of its error rate reaches
+    `error_rate_threshold` (`0` disables it) after `_OUTLIER_ERROR_RATE_MIN_REQUESTS` requests. It is ejected for
+    `base_ejection_in_secs` multiplied by the times it has been ejected, up to `_OUTLIER_MAX_EJECTION_IN_SECS`, the multiplier drops
+    by one for every `base_ejection_in_secs` the instance stays healthy. After that, it gets a share of the traffic that grows
+    linearly to all in `reinstatement_in_secs`, and one failure in this period ejects it again. No more than `max_ejection_percent`
+    of the UP instances of an application are ejected at the same time, but one instance can always be ejected.
+    """
+
+    def __init__(self,
+                 consecutive_failures: int = _OUTLIER_CONSECUTIVE_FAILURES,
+                 error_rate_threshold: float = _OUTLIER_ERROR_RATE_THRESHOLD,
+                 base_ejection_in_secs: float = _OUTLIER_BASE_EJECTION_IN_SECS,
+                 max_ejection_percent: float = _OUTLIER_MAX_EJECTION_PERCENT,
+                 reinstatement_in_secs: float = _OUTLIER_REINSTATEMENT_IN_SECS):
+        self.consecutive_failures: int = consecutive_failures
+        self.error_rate_threshold: float = error_rate_threshold
+        self.base_ejection_in_secs: float = base_ejection_in_secs
+        self.max_ejection_percent: float = max_ejection_percent
+        self.reinstatement_in_secs: float = reinstatement_in_secs
+        self.ejections_total: int = 0
+        self.__instances: Dict[str, _InstanceOutlier] = {}
+        self.__app_sizes: Dict[str, int] = {}
+        self.__lock = RLock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.consecutive_failures > 0 or self.error_rate_threshold > 0
+
+    def __state(self, outlier: _InstanceOutlier, now: float) -> str:
+        if now < outlier.ejected_until:
+            return OUTLIER_EJECTED
+        if outlier.ejected_until and now < outlier.ejected_until + self.reinstatement_in_secs:
+            return OUTLIER_RECOVERING
+        return OUTLIER_ACTIVE
+
+    def state_of(self, instance_id: str) -> str:
+        with self.__lock:
+            outlier = self.__instances.get(instance_id)
+            return self.__state(outlier, time.monotonic()) if outlier else OUTLIER_ACTIVE
+
+    def record(self, app_name: str, instance_id: str, error: BaseException = None) -> None:
+        """
+        Record the result of a request, an error that is not a failure of the instance, see `is_node_failure`, is ignored.
+        """
+        if not self.enabled:
+            return
+        failed = error is not None and is_node_failure(error)
+        if error is not None and not failed:
+            return
+        now = time.monotonic()
+        with self.__lock:
+            outlier = self.__instances.get(instance_id)
+            if outlier is None:
+                if not failed and not self.error_rate_threshold:
+                    return
+                outlier = self.__instances[instance_id] = _InstanceOutlier(app_name)
+            state = self.__state(outlier, now)
+            outlier.requests += 1
+            outlier.error_rate = _OUTLIER_ERROR_RATE_ALPHA * (1 if failed else 0) + (1 - _OUTLIER_ERROR_RATE_ALPHA) * outlier.error_rate
+            if not failed:
+                outlier.consecutive_failures = 0
+                if state == OUTLIER_ACTIVE and not outlier.times_ejected and not self.error_rate_threshold:
+                    del self.__instances[instance_id]
+                return
+            outlier.failures += 1
+            outlier.consecutive_failures += 1
+            if state == OUTLIER_RECOVERING \
+                    or (self.consecutive_failures > 0 and outlier.consecutive_failures >= self.consecutive_failures) \
+                    or (self.error_rate_threshold > 0 and outlier.requests >= _OUTLIER_ERROR_RATE_MIN_REQUESTS
+                        and outlier.error_rate >= self.error_rate_threshold):
+                self.__eject(instance_id, outlier, state, now)
+
+    def __eject(self, instance_id: str, outlier: _InstanceOutlier, state: str, now: float) -> None:
+        if state == OUTLIER_EJECTED:
+            return
+        ejected = len([ins for ins in self.__instances.values()
+                       if ins.app_name == outlier.app_name and now < ins.ejected_until])
+        max_ejected = max(1, int(self.__app_sizes.get(outlier.app_name, 0) * self.max_ejection_percent / 100))
+        if ejected >= max_ejected:
+            _logger.debug(f"{ejected} instance(s) of [{outlier.app_name}] are ejected, do not eject [{instance_id}].")
+            return
+        if outlier.ejected_until and self.base_ejection_in_secs > 0:
+            healthy_for = now - outlier.ejected_until - self.reinstatement_in_secs
+            outlier.times_ejected = max(0, outlier.times_ejected - int(max(0, healthy_for) // self.base_ejection_in_secs))
+        outlier.times_ejected += 1
+        duration = min(self.base_ejection_in_secs * outlier.times_ejected, _OUTLIER_MAX_EJECTION_IN_SECS)
+        outlier.ejected_until = now + duration
+        outlier.consecutive_failures = 0
+        outlier.requests = 0
+        outlier.error_rate = 0
+        self.ejections_total += 1
+        _logger.warning(f"Instance [{instance_id}] of [{outlier.app_name}] keeps failing, eject it for {duration} seconds.")
+
+    def filter(self, app_name: str, instances: List[Instance], app_size: int = 0) -> List[Instance]:
+        """
+        Return the instances that are not ejected. An instance that is recovering is kept by the chance of how far it recovers.
+        `app_size` is the number of the UP instances of the application, it caps the ejected instances.
+        """
+        if not self.enabled:
+            return instances
+        now = time.monotonic()
+        with self.__lock:
+            if app_size:
+                self.__app_sizes[app_name] = app_size
+            if not self.__instances:
+                return instances
+            usable = []
+            for instance in instances:
+                outlier = self.__instances.get(instance.instanceId)
+                state = self.__state(outlier, now) if outlier else OUTLIER_ACTIVE
+                if state == OUTLIER_EJECTED:
+                    continue
+                if state == OUTLIER_RECOVERING \
+                        and random.random() * self.reinstatement_in_secs > now - outlier.ejected_until:
+                    continue
+                usable.append(instance)
+            return usable
+
+    def snapshot(self) -> Dict:
+        now = time.monotonic()
+        with self.__lock:
+            instances = {instance_id: {
+                "app": outlier.app_name,
+                "state": self.__state(outlier, now),
+                "consecutive_failures": outlier.consecutive_failures,
+                "error_rate": outlier.error_rate,
+                "failures": outlier.failures,
+                "times_ejected": outlier.times_ejected,
+                "ejected_for": max(0, outlier.ejected_until - now)
+            } for instance_id, outlier in self.__instances.items()}
+        return {
+            "ejected": len([ins for ins in instances.values() if ins["state"] == OUTLIER_EJECTED]),
+            "ejections_total": self.ejections_total,
+            "instances": instances
+        }
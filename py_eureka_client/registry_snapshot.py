@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (c) 2018 Keijack Wu
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import json
+import mmap
+import os
+import struct
+import time
+import zlib
+
+from typing import Dict, List
+
+from py_eureka_client.logger import get_logger
+
+from py_eureka_client.eureka_basic import LeaseInfo, DataCenterInfo, PortWrapper, Instance, Application, Applications
+
+_logger = get_logger("registry_snapshot")
+
+"""
+The snapshot file is `MAGIC + saved time in millis (8 bytes, big endian) + zlib compressed json`.
+The instances are stored as positional lists rather than dicts to keep the file compact.
+"""
+_MAGIC = b"PYEKSNP1"
+_HEADER = struct.Struct(">Q")
+_HEADER_LEN = len(_MAGIC) + _HEADER.size
+
+
+def _instance_to_list(instance: Instance) -> List:
+    lease = instance.leaseInfo
+    return [instance.instanceId, instance.sid, instance.app, instance.appGroupName, instance.ipAddr,
+            instance.port.port, instance.port.enabled, instance.securePort.port, instance.securePort.enabled,
+            instance.homePageUrl, instance.statusPageUrl, instance.healthCheckUrl, instance.secureHealthCheckUrl,
+            instance.vipAddress, instance.secureVipAddress, instance.countryId,
+            instance.dataCenterInfo.name, instance.dataCenterInfo.className, instance.dataCenterInfo.metadata,
+            instance.hostName, instance.status, instance.overriddenstatus,
+            lease.renewalIntervalInSecs, lease.durationInSecs, lease.registrationTimestamp, lease.lastRenewalTimestamp,
+            lease.renewalTimestamp, lease.evictionTimestamp, lease.serviceUpTimestamp,
+            instance.isCoordinatingDiscoveryServer, instance.metadata, instance.lastUpdatedTimestamp,
+            instance.lastDirtyTimestamp, instance.actionType, instance.asgName]
+
+
+def _instance_from_list(fields: List) -> Instance:
+    (instance_id, sid, app, app_group_name, ip_addr,
+     port, port_enabled, secure_port, secure_port_enabled,
+     home_page_url, status_page_url, health_check_url, secure_health_check_url,
+     vip_address, secure_vip_address, country_id,
+     dci_name, dci_class_name, dci_metadata,
+     host_name, status, overriddenstatus,
+     renewal_interval_in_secs, duration_in_secs, registration_timestamp, last_renewal_timestamp,
+     renewal_timestamp, eviction_timestamp, service_up_timestamp,
+     is_coordinating_discovery_server, metadata, last_updated_timestamp,
+     last_dirty_timestamp, action_type, asg_name) = fields
+    return Instance(instanceId=instance_id, sid=sid, app=app, appGroupName=app_group_name, ipAddr=ip_addr,
+                    port=PortWrapper(port=port, enabled=port_enabled),
+                    securePort=PortWrapper(port=secure_port, enabled=secure_port_enabled),
+                    homePageUrl=home_page_url, statusPageUrl=status_page_url,
+                    healthCheckUrl=health_check_url, secureHealthCheckUrl=secure_health_check_url,
+                    vipAddress=vip_address, secureVipAddress=secure_vip_address, countryId=country_id,
+                    dataCenterInfo=DataCenterInfo(name=dci_name, className=dci_class_name, metadata=dci_metadata),
+                    hostName=host_name, status=status, overriddenstatus=overriddenstatus,
+                    leaseInfo=LeaseInfo(renewalIntervalInSecs=renewal_interval_in_secs, durationInSecs=duration_in_secs,
+                                        registrationTimestamp=registration_timestamp, lastRenewalTimestamp=last_renewal_timestamp,
+                                        renewalTimestamp=renewal_timestamp, evictionTimestamp=eviction_timestamp,
+                                        serviceUpTimestamp=service_up_timestamp),
+                    isCoordinatingDiscoveryServer=is_coordinating_discovery_server, metadata=metadata,
+                    lastUpdatedTimestamp=last_updated_timestamp, lastDirtyTimestamp=last_dirty_timestamp,
+                    actionType=action_type, asgName=asg_name)
+
+
+def applications_to_dict(applications: Applications) -> Dict:
+    """
+    Copy the registry into plain python objects, this should be done in the thread that owns the registry.
+    """
+    return {
+        "versions_delta": applications.versionsDelta,
+        "apps_hashcode": applications.appsHashcode,
+        "applications": [[app.name, [_instance_to_list(ins) for ins in app.instances]] for app in applications.applications]
+    }
+
+
+def applications_from_dict(data: Dict) -> Applications:
+    applications = Applications(apps__hashcode=data["apps_hashcode"], versions__delta=data["versions_delta"])
+    for name, instances in data["applications"]:
+        application = Application(name=name)
+        for fields in instances:
+            application.add_instance(_instance_from_list(fields))
+        applications.add_application(application)
+    return applications
+
+
+def dumps(data: Dict, saved_at: float = None) -> bytes:
+    saved_at = time.time() if saved_at is None else saved_at
+    body = zlib.compress(json.dumps(data, separators=(",", ":")).encode())
+    return _MAGIC + _HEADER.pack(int(saved_at * 1000)) + body
+
+
+def save_snapshot(path: str, data: Dict) -> None:
+    """
+    Write the snapshot atomically, a reader will either see the old file or the new one.
+    """
+    content = dumps(data)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def _loads(buf, path: str, max_staleness_in_secs: float) -> Applications:
+    if len(buf) < _HEADER_LEN or buf[:len(_MAGIC)] != _MAGIC:
+        _logger.warning(f"[{path}] is not a registry snapshot, ignore it.")
+        return None
+    saved_at = _HEADER.unpack_from(buf, len(_MAGIC))[0] / 1000
+    age = time.time() - saved_at
+    if max_staleness_in_secs > 0 and age > max_staleness_in_secs:
+        _logger.info(f"Registry snapshot [{path}] was saved {age:.0f} seconds ago, it is too stale to use.")
+        return None
+    with memoryview(buf)[_HEADER_LEN:] as body:
+        raw = zlib.decompress(body)
+    return applications_from_dict(json.loads(raw))
+
+
+def load_snapshot(path: str, max_staleness_in_secs: float = 0) -> Applications:
+    """
+    Load the registry snapshot, the file is memory-mapped where possible. Return None if the file does not exist,
+    is broken or is older than `max_staleness_in_secs`(`0` means no limit).
+    """
+    if not path or not os.path.isfile(path):
+        return None
+    try:
+        with open(path, "rb") as f:
+            try:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (ValueError, OSError):
+                # Empty files and some file systems cannot be memory-mapped.
+                return _loads(f.read(), path, max_staleness_in_secs)
+            with mm:
+                return _loads(mm, path, max_staleness_in_secs)
+    except Exception:
+        _logger.warning(f"Load registry snapshot [{path}] error, ignore it.", exc_info=True)
+        return None
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (c) 2018 Keijack Wu
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import random
+import time
+
+from collections import deque
+from threading import RLock
+from typing import Deque, Iterable, List
+
+import py_eureka_client.http_client as http_client
+from py_eureka_client.logger import get_logger
+
+
+_logger = get_logger("retry")
+
+_RETRY_MAX_ATTEMPTS = 0
+_RETRY_BACKOFF_IN_SECS = 0
+_RETRY_BACKOFF_MAX_IN_SECS = 1
+_RETRY_IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+_RETRY_BUDGET_RATIO = 0
+_RETRY_BUDGET_MIN_PER_SEC = 10
+_RETRY_BUDGET_WINDOW_IN_SECS = 10
+
+
+class RetryPolicy:
+    """
+    How `walk_nodes` retries a failed call on the next node.
+
+    * max_attempts: How many nodes are tried in all, `0` means all the UP nodes.
+    * backoff_in_secs: The wait before the first retry, it doubles for each of the next retries up to `backoff_max_in_secs`,
+        and a random wait from `0` to it is used, so the retries of the clients are spread. `0` retries at once.
+    * retry_on_status_codes: The responses with these status codes are retried as well, e.g. `[502, 503, 504]`, `None` retries
+        all of them. `do_service` only retries them for `idempotent_methods`, a walker of `walk_nodes` should only raise them when
+        the call can be repeated.
+    * idempotent_methods: The http methods that can be sent again safely.
+    """
+
+    def __init__(self,
+                 max_attempts: int = _RETRY_MAX_ATTEMPTS,
+                 backoff_in_secs: float = _RETRY_BACKOFF_IN_SECS,
+                 backoff_max_in_secs: float = _RETRY_BACKOFF_MAX_IN_SECS,
+                 retry_on_status_codes: Iterable[int] = None,
+                 idempotent_methods: Iterable[str] = _RETRY_IDEMPOTENT_METHODS):
+        self.max_attempts: int = max_attempts
+        self.backoff_in_secs: float = backoff_in_secs
+        self.backoff_max_in_secs: float = backoff_max_in_secs
+        self.retry_on_status_codes: List[int] = None if retry_on_status_codes is None else list(retry_on_status_codes)
+        self.idempotent_methods: List[str] = [method.upper() for method in idempotent_methods]
+
+    def is_idempotent(self, method: str) -> bool:
+        return (method or "GET").upper() in self.idempotent_methods
+
+    def retry_on_status(self, error: BaseException, idempotent: bool = True) -> bool:
+        if not idempotent or not isinstance(error, http_client.HTTPError):
+            return False
+        return self.retry_on_status_codes is None or error.code in self.retry_on_status_codes
+
+    def can_attempt(self, attempts: int) -> bool:
+        """
+        Whether another node can be tried after `attempts` nodes are tried.
+        """
+        return self.max_attempts <= 0 or attempts < self.max_attempts
+
+    def backoff(self, retries: int) -> float:
+        """
+        The wait before the `retries`th retry.
+        """
+        if self.backoff_in_secs <= 0:
+            return 0
+        return random.uniform(0, min(self.backoff_max_in_secs, self.backoff_in_secs * 2 ** (retries - 1)))
+
+
+class RetryBudget:
+    """
+    Limits the retries of the whole client to `ratio` of the requests in the last `window_in_secs` seconds, plus
+    `min_retries_per_sec` so that the retries of a client with few requests are not blocked. When most of the calls fail,
+    the retries stop at the budget rather than multiplying the load on the instances that are left.
+    """
+
+    def __init__(self,
+                 ratio: float = _RETRY_BUDGET_RATIO,
+                 min_retries_per_sec: float = _RETRY_BUDGET_MIN_PER_SEC,
+                 window_in_secs: int = _RETRY_BUDGET_WINDOW_IN_SECS):
+        self.ratio: float = ratio
+        self.min_retries_per_sec: float = min_retries_per_sec
+        self.window_in_secs: int = window_in_secs
+        # [second, requests, retries]
+        self.__buckets: Deque[List[int]] = deque()
+        self.__exhausted: int = 0
+        self.__lock = RLock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ratio > 0
+
+    def __bucket(self) -> List[int]:
+        now = int(time.monotonic())
+        while self.__buckets and self.__buckets[0][0] <= now - self.window_in_secs:
+            self.__buckets.popleft()
+        if not self.__buckets or self.__buckets[-1][0] != now:
+            self.__buckets.append([now, 0, 0])
+        return self.__buckets[-1]
+
+    def record_request(self) -> None:
+        if not self.enabled:
+            return
+        with self.__lock:
+            self.__bucket()[1] += 1
+
+    def try_retry(self) -> bool:
+        """
+        Take one retry from the budget, return `False` when it is used up.
+        """
+        if not self.enabled:
+            return True
+        with self.__lock:
+            bucket = self.__bucket()
+            requests = sum(b[1] for b in self.__buckets)
+            retries = sum(b[2] for b in self.__buckets)
+            if retries + 1 > self.ratio * requests + self.min_retries_per_sec * self.window_in_secs:
+                self.__exhausted += 1
+                return False
+            bucket[2] += 1
+            return True
+
+    def snapshot(self):
+        with self.__lock:
+            self.__bucket()
+            return {
+                "requests": sum(b[1] for b in self.__buckets),
+                "retries": sum(b[2] for b in self.__buckets),
+                "exhausted": self.__exhausted
+            }
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (c) 2018 Keijack Wu
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import math
+import random
+import time
+
+from threading import RLock
+from typing import Dict, List
+
+from py_eureka_client.logger import get_logger
+from py_eureka_client.eureka_basic import Application, Instance
+
+
+_logger = get_logger("slow_start")
+
+"""
+How the share of the traffic of a new instance grows in the slow start window
+"""
+SLOW_START_LINEAR: str = "linear"
+SLOW_START_EXPONENTIAL: str = "exponential"
+
+_SLOW_START_WINDOW_IN_SECS = 0
+_SLOW_START_MIN_WEIGHT = 0.1
+
+
+class _AppSlowStart:
+
+    def __init__(self, window_in_secs: float, curve: str, min_weight: float):
+        self.window_in_secs: float = window_in_secs
+        self.curve: str = curve
+        self.min_weight: float = min_weight
+
+
+class SlowStart:
+    """
+    Ramps up the traffic of the newly registered instances so that they can warm up their caches and connection pools.
+
+    The window of an instance starts from its `serviceUpTimestamp` in the registry, or, when the eureka server does not give it,
+    from the time it is first seen by this client. The instances that are already there when an application is seen the first time
+    are treated as warmed. In the window, the weight of an instance grows from `min_weight` to `1`, linearly or exponentially,
+    and the instance is kept as a candidate by the chance of its weight, so it works with all the load balance strategies.
+    The window, the curve and the min weight can be configured for each application by `configure`.
+    """
+
+    def __init__(self,
+                 window_in_secs: float = _SLOW_START_WINDOW_IN_SECS,
+                 curve: str = SLOW_START_LINEAR,
+                 min_weight: float = _SLOW_START_MIN_WEIGHT):
+        assert curve in (SLOW_START_LINEAR, SLOW_START_EXPONENTIAL), f"slow start curve {curve} is not supported."
+        assert 0 < min_weight <= 1, "min_weight must be in (0, 1]"
+        self.__default = _AppSlowStart(window_in_secs, curve, min_weight)
+        self.__apps: Dict[str, _AppSlowStart] = {}
+        self.__first_seen: Dict[str, Dict[str, float]] = {}
+        self.__warming: Dict[str, Dict[str, float]] = {}
+        self.__lock = RLock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.__default.window_in_secs > 0 or any(conf.window_in_secs > 0 for conf in self.__apps.values())
+
+    def configure(self, app_name: str, window_in_secs: float = None, curve: str = None, min_weight: float = None) -> None:
+        """
+        Override the slow start settings of one application, the settings that are not given are the same as the default ones.
+        Set `window_in_secs` to `0` to disable the slow start of this application.
+        """
+        assert curve is None or curve in (SLOW_START_LINEAR, SLOW_START_EXPONENTIAL), f"slow start curve {curve} is not supported."
+        assert min_weight is None or 0 < min_weight <= 1, "min_weight must be in (0, 1]"
+        with self.__lock:
+            self.__apps[app_name.upper()] = _AppSlowStart(
+                window_in_secs if window_in_secs is not None else self.__default.window_in_secs,
+                curve or self.__default.curve,
+                min_weight if min_weight is not None else self.__default.min_weight)
+
+    def __conf(self, app_name: str) -> _AppSlowStart:
+        return self.__apps.get(app_name.upper(), self.__default)
+
+    def __started_at(self, app_name: str, instance: Instance, now: float) -> float:
+        up_ts = instance.leaseInfo.serviceUpTimestamp if instance.leaseInfo else 0
+        if up_ts:
+            return min(up_ts / 1000, now)
+        return self.__first_seen.setdefault(app_name, {}).setdefault(instance.instanceId, now)
+
+    def __see(self, app: Application) -> None:
+        seen = self.__first_seen.get(app.name)
+        if seen is None:
+            # The instances that are there when the application is seen the first time are not new.
+            self.__first_seen[app.name] = {instance.instanceId: 0 for instance in app.instances}
+        elif len(seen) > 2 * len(app.instances) + 16:
+            # Forget the instances that are gone, so an instance warms up again when it comes back.
+            instance_ids = {instance.instanceId for instance in app.instances}
+            self.__first_seen[app.name] = {instance_id: ts for instance_id, ts in seen.items() if instance_id in instance_ids}
+
+    def __weight(self, conf: _AppSlowStart, elapsed: float) -> float:
+        if elapsed >= conf.window_in_secs:
+            return 1
+        progress = max(0, elapsed) / conf.window_in_secs
+        if conf.curve == SLOW_START_EXPONENTIAL:
+            return conf.min_weight * math.pow(1 / conf.min_weight, progress)
+        return conf.min_weight + (1 - conf.min_weight) * progress
+
+    def weight_of(self, app_name: str, instance: Instance) -> float:
+        """
+        The weight of the instance from `min_weight` to `1`, `1` means it is warmed.
+        """
+        conf = self.__conf(app_name)
+        if conf.window_in_secs <= 0:
+            return 1
+        now = time.time()
+        with self.__lock:
+            started_at = self.__started_at(app_name, instance, now)
+            weight = self.__weight(conf, now - started_at)
+            warming = self.__warming.setdefault(app_name, {})
+            if weight < 1:
+                warming[instance.instanceId] = started_at
+            else:
+                warming.pop(instance.instanceId, None)
+            return weight
+
+    def filter(self, app: Application, instances: List[Instance]) -> List[Instance]:
+        """
+        Return the instances of `app` that are warmed, and each of the warming ones by the chance of its weight.
+        """
+        if self.__conf(app.name).window_in_secs <= 0:
+            return instances
+        with self.__lock:
+            self.__see(app)
+        return [instance for instance in instances if random.random() < self.weight_of(app.name, instance)]
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """
+        The weights of the instances that are in the slow start window now, keyed by application name and instance id.
+        """
+        now = time.time()
+        with self.__lock:
+            snapshot = {}
+            for app_name, warming in self.__warming.items():
+                conf = self.__conf(app_name)
+                weights = {instance_id: self.__weight(conf, now - started_at) for instance_id, started_at in warming.items()
+                           if now - started_at < conf.window_in_secs}
+                if weights:
+                    snapshot[app_name] = weights
+            return snapshot
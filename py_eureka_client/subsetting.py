@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (c) 2018 Keijack Wu
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import hashlib
+import random
+
+from threading import RLock
+from typing import Dict, List, Set, Tuple
+
+from py_eureka_client.logger import get_logger
+from py_eureka_client.eureka_basic import Application, Instance
+
+
+_logger = get_logger("subsetting")
+
+_SUBSET_SIZE = 0
+
+
+def client_index(client_id: str) -> int:
+    """
+    The index of a client in the subsetting rounds, it is a hash of the id of the client, so it does not change when the
+    instances of the application of the client come and go.
+    """
+    return int.from_bytes(hashlib.md5(client_id.encode()).digest()[:4], "big")
+
+
+def subset(instance_ids: List[str], client_index: int, subset_size: int) -> List[str]:
+    """
+    Deterministic subsetting: the instances are shuffled by a seed that is shared by a round of `len(instance_ids) // subset_size`
+    clients, and each client of the round takes one slice of them, so every instance is used by about the same number of clients.
+    """
+    ids = sorted(instance_ids)
+    if subset_size <= 0 or len(ids) <= subset_size:
+        return ids
+    subset_count = len(ids) // subset_size
+    rnd = random.Random(client_index // subset_count)
+    rnd.shuffle(ids)
+    start = (client_index % subset_count) * subset_size
+    return ids[start:start + subset_size]
+
+
+class Subsetter:
+    """
+    Limits the instances of an application that this client calls to a stable subset of `subset_size` in each zone, so that the
+    connections are kept to a few instances and stay warm when the application has a large fleet.
+
+    The index of this client is a hash of `client_id`, so the subsets do not move when the application of this client scales.
+    The subsets are computed from all the instances in the registry whatever their status, so an instance going down does not
+    move the subsets of the others, and they are recomputed only when the instances of the application change.
+    """
+
+    def __init__(self, subset_size: int = _SUBSET_SIZE):
+        self.subset_size: int = subset_size
+        self.__subsets: Dict[str, Tuple[Application, int, int, Set[str]]] = {}
+        self.__lock = RLock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.subset_size > 0
+
+    def subset_of(self, app: Application, client_id: str) -> Set[str]:
+        index = client_index(client_id)
+        with self.__lock:
+            cached = self.__subsets.get(app.name)
+            if cached is not None and cached[0] is app and cached[1] == app.version and cached[2] == index:
+                return cached[3]
+            version = app.version
+            zones: Dict[str, List[str]] = {}
+            for instance in app.instances:
+                zones.setdefault(instance.zone, []).append(instance.instanceId)
+            ids = set()
+            for instance_ids in zones.values():
+                ids.update(subset(instance_ids, index, self.subset_size))
+            _logger.debug(f"subset of application [{app.name}] for client #{index}: {len(ids)} of {len(app.instances)} instances.")
+            self.__subsets[app.name] = (app, version, index, ids)
+            return ids
+
+    def filter(self, app: Application, instances: List[Instance], client_id: str) -> List[Instance]:
+        if not self.enabled:
+            return instances
+        ids = self.subset_of(app, client_id)
+        return [instance for instance in instances if instance.instanceId in ids]
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (c) 2018 Keijack Wu
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import math
+import random
+import time
+
+from threading import RLock
+from typing import Dict, List
+
+from py_eureka_client.logger import get_logger
+from py_eureka_client.eureka_basic import Instance
+from py_eureka_client.outlier_detection import is_node_failure
+
+
+_logger = get_logger("zone_avoidance")
+
+_ZONE_ERROR_RATE_THRESHOLD = 0.2
+_ZONE_MAX_LOAD_PER_INSTANCE = 0
+_ZONE_STATS_ALPHA = 0.1
+_ZONE_STATS_DECAY_IN_SECS = 10
+
+
+class _ZoneStats:
+
+    def __init__(self):
+        self.requests: int = 0
+        self.failures: int = 0
+        self.in_flight: int = 0
+        self.error_rate: float = 0
+        self.ewma_latency: float = 0
+        self.updated_at: float = 0
+        self.instances: int = 0
+        self.spilled: int = 0
+        self.spill_ratio: float = 0
+
+
+class ZoneAvoidance:
+    """
+    Spills a part of the traffic from the zone of this client to the other zones when it is unhealthy or over loaded, instead of
+    waiting for all the instances in the zone to go down.
+
+    The statistics are kept for each zone of each application. When the moving average of the error rate of the local zone goes
+    over `error_rate_threshold` and is higher than the best other zone, the spilled part grows linearly from none to all when
+    the error rate reaches twice of the threshold. When `max_load_per_instance` is set and the requests in flight per instance in
+    the local zone exceed it, the part over it is spilled. The error rate decays by `exp(-idle / _ZONE_STATS_DECAY_IN_SECS)` when
+    a zone gets no traffic, so the traffic comes back after the zone recovers.
+    """
+
+    def __init__(self,
+                 enabled: bool = False,
+                 error_rate_threshold: float = _ZONE_ERROR_RATE_THRESHOLD,
+                 max_load_per_instance: float = _ZONE_MAX_LOAD_PER_INSTANCE):
+        self.enabled: bool = enabled
+        self.error_rate_threshold: float = error_rate_threshold
+        self.max_load_per_instance: float = max_load_per_instance
+        self.__stats: Dict[str, Dict[str, _ZoneStats]] = {}
+        self.__lock = RLock()
+
+    def __get_stats(self, app_name: str, zone: str) -> _ZoneStats:
+        zones = self.__stats.setdefault(app_name, {})
+        stats = zones.get(zone)
+        if stats is None:
+            stats = zones[zone] = _ZoneStats()
+        return stats
+
+    @staticmethod
+    def __error_rate(stats: _ZoneStats, now: float) -> float:
+        return stats.error_rate * math.exp(-max(0, now - stats.updated_at) / _ZONE_STATS_DECAY_IN_SECS)
+
+    def on_request_start(self, app_name: str, zone: str) -> None:
+        if not self.enabled:
+            return
+        with self.__lock:
+            self.__get_stats(app_name, zone).in_flight += 1
+
+    def on_request_end(self, app_name: str, zone: str, latency: float, error: BaseException = None) -> None:
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        with self.__lock:
+            stats = self.__get_stats(app_name, zone)
+            stats.in_flight = max(0, stats.in_flight - 1)
+            failed = error is not None and is_node_failure(error)
+            if failed:
+                stats.failures += 1
+            stats.error_rate = _ZONE_STATS_ALPHA * (1 if failed else 0) + (1 - _ZONE_STATS_ALPHA) * self.__error_rate(stats, now)
+            stats.ewma_latency = latency if stats.requests == 0 else _ZONE_STATS_ALPHA * latency + (1 - _ZONE_STATS_ALPHA) * stats.ewma_latency
+            stats.requests += 1
+            stats.updated_at = now
+
+    def spill_ratio(self, app_name: str, zone: str, local: List[Instance], others: List[Instance]) -> float:
+        """
+        How much of the traffic of the local `zone` should go to the other zones, from 0 to 1.
+        """
+        if not others:
+            return 0
+        if not local:
+            return 1
+        now = time.monotonic()
+        with self.__lock:
+            stats = self.__get_stats(app_name, zone)
+            stats.instances = len(local)
+            ratio = 0
+            error_rate = self.__error_rate(stats, now)
+            if self.error_rate_threshold > 0 and error_rate > self.error_rate_threshold:
+                other_zones = {instance.zone for instance in others}
+                best_other = min(self.__error_rate(self.__get_stats(app_name, other_zone), now) for other_zone in other_zones)
+                if best_other < error_rate:
+                    ratio = min(1, (error_rate - self.error_rate_threshold) / self.error_rate_threshold)
+            if self.max_load_per_instance > 0:
+                load = stats.in_flight / len(local)
+                if load > self.max_load_per_instance:
+                    ratio = max(ratio, 1 - self.max_load_per_instance / load)
+            if (ratio > 0) != (stats.spill_ratio > 0):
+                if ratio > 0:
+                    _logger.info(f"Zone [{zone}] of [{app_name}] is unhealthy or over loaded, spill {ratio:.0%} of the traffic to other zones.")
+                else:
+                    _logger.info(f"Zone [{zone}] of [{app_name}] recovers, stop spilling the traffic.")
+            stats.spill_ratio = ratio
+            return ratio
+
+    def choose(self, app_name: str, zone: str, local: List[Instance], others: List[Instance]) -> List[Instance]:
+        """
+        Return the candidates in the local zone, or, by the spill ratio, the ones in the other zones.
+        """
+        ratio = self.spill_ratio(app_name, zone, local, others)
+        if ratio > 0 and random.random() < ratio:
+            with self.__lock:
+                self.__get_stats(app_name, zone).spilled += 1
+            return others
+        return local
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict]]:
+        """
+        The statistics of the zones, keyed by application and then zone. `spilled` is how many requests are sent to other zones
+        instead of this one, and `spill_ratio` is the current part of the traffic that is spilled.
+        """
+        now = time.monotonic()
+        with self.__lock:
+            return {app_name: {zone: {
+                "requests": stats.requests,
+                "failures": stats.failures,
+                "in_flight": stats.in_flight,
+                "error_rate": self.__error_rate(stats, now),
+                "ewma_latency": stats.ewma_latency,
+                "instances": stats.instances,
+                "spilled": stats.spilled,
+                "spill_ratio": stats.spill_ratio
+            } for zone, stats in zones.items()} for app_name, zones in self.__stats.items()}
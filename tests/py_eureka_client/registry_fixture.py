@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (c) 2018 Keijack Wu
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+from typing import Dict, List
+
+from unittest import mock
+
+from py_eureka_client.eureka_basic import Application, Applications, Instance, PortWrapper
+from py_eureka_client.eureka_client import EurekaClient
+
+
+def build_applications(hosts: Dict[str, List[str]]) -> Applications:
+    """
+    Build a registry with an UP instance on port 8080 of each host, e.g. `{"ORDER": ["node0", "node1"]}`, the instances of
+    application `ORDER` are `ORDER-0` and `ORDER-1`.
+    """
+    applications = Applications(apps__hashcode="", versions__delta="1")
+    for app_name, app_hosts in hosts.items():
+        app = Application(name=app_name)
+        for idx, host in enumerate(app_hosts):
+            app.add_instance(Instance(instanceId=f"{app_name}-{idx}", app=app_name, ipAddr="127.0.0.1",
+                                      hostName=host, port=PortWrapper(8080, True), status="UP"))
+        applications.add_application(app)
+    return applications
+
+
+async def client_with_registry(applications: Applications, **kwargs) -> EurekaClient:
+    """
+    Create a client that does not register itself and pull `applications` as its registry.
+    """
+    async def get_applications(url, regions=[]):
+        return applications
+
+    client = EurekaClient(eureka_server="http://127.0.0.1:8761/eureka", should_register=False, **kwargs)
+    with mock.patch("py_eureka_client.eureka_client.get_applications", get_applications):
+        assert await client.refresh()
+    return client
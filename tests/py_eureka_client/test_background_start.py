@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (c) 2018 Keijack Wu
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import unittest
+import asyncio
+
+from unittest import mock
+
+from py_eureka_client.eureka_client import EurekaClient
+from tests.py_eureka_client.registry_fixture import build_applications
+
+
+class TestBackgroundStart(unittest.TestCase):
+
+    def setUp(self):
+        self.pulls = 0
+        self.registered = []
+
+        async def get_applications(url, regions=[]):
+            self.pulls += 1
+            await asyncio.sleep(0.2)
+            return build_applications({"ORDER": ["node0"]})
+
+        async def get_delta_if_changed(url, regions=[], fingerprint=""):
+            return None, fingerprint
+
+        async def register(url, instance):
+            self.registered.append(instance["instanceId"])
+
+        async def send_heartbeat(url, *args, **kwargs):
+            pass
+
+        async def cancel(url, app_name, instance_id):
+            pass
+
+        patches = [mock.patch("py_eureka_client.eureka_client.get_applications", get_applications),
+                   mock.patch("py_eureka_client.eureka_client.get_delta_if_changed", get_delta_if_changed),
+                   mock.patch("py_eureka_client.eureka_client._register", register),
+                   mock.patch("py_eureka_client.eureka_client.send_heartbeat", send_heartbeat),
+                   mock.patch("py_eureka_client.eureka_client.cancel", cancel)]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_wait_until_ready(self):
+        async def run():
+            client = EurekaClient(eureka_server="http://127.0.0.1:8761/eureka", should_register=False,
+                                  background_start=True, embedded_mode=True)
+            await client.start()
+            states = [client.is_ready, await client.wait_until_ready(0.01), await client.wait_until_ready(1), client.is_ready]
+            await client.stop()
+            return states
+
+        assert asyncio.run(run()) == [False, False, True, True]
+
+    def test_walk_nodes_waits_for_the_first_pull(self):
+        async def walker(url):
+            return url
+
+        async def run():
+            client = EurekaClient(eureka_server="http://127.0.0.1:8761/eureka", should_register=False,
+                                  background_start=True, embedded_mode=True, wait_for_ready_in_secs=1)
+            await client.start()
+            url = await client.walk_nodes("order", "/api", walker=walker)
+            await client.stop()
+            return url
+
+        assert asyncio.run(run()) == "http://node0:8080/api"
+        assert self.pulls == 1
+
+    def test_failed_registration_does_not_make_client_ready(self):
+        prepared = []
+        prepare = EurekaClient._EurekaClient__parepare_instance_info
+
+        async def prepare_instance_info(client):
+            prepared.append(True)
+            if len(prepared) == 1:
+                raise OSError("no network interface")
+            await prepare(client)
+
+        async def run():
+            client = EurekaClient(eureka_server="http://127.0.0.1:8761/eureka", app_name="cart", instance_id="cart-1",
+                                  instance_host="cart", instance_ip="127.0.0.1", renewal_interval_in_secs=0.05,
+                                  background_start=True, embedded_mode=True)
+            await client.start()
+            await client.wait_until_ready(1)
+            loaded = client.applications is not None
+            await asyncio.sleep(0.2)
+            await client.stop()
+            return loaded
+
+        with mock.patch.object(EurekaClient, "_EurekaClient__parepare_instance_info", prepare_instance_info):
+            assert asyncio.run(run())
+        assert len(prepared) == 2
+        assert self.registered[0] == "cart-1"
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (c) 2018 Keijack Wu
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import unittest
+import asyncio
+import threading
+
+from unittest import mock
+
+from py_eureka_client import http_client
+from py_eureka_client.eureka_client import ServiceRequest
+from tests.py_eureka_client.registry_fixture import build_applications, client_with_registry
+
+
+class _SlowHttpClient(http_client.HttpClient):
+
+    def __init__(self):
+        self.in_flight = {}
+        self.peak = {}
+
+    async def urlopen(self, request=None, data=None, timeout=None):
+        host = request.url.split("/")[2]
+        self.in_flight[host] = self.in_flight.get(host, 0) + 1
+        self.peak[host] = max(self.peak.get(host, 0), self.in_flight[host])
+        try:
+            await asyncio.sleep(0.05 if host.startswith("slow") else 0.01)
+            if request.url.endswith("/fail"):
+                raise http_client.HTTPError(request.url, 500, "Internal Server Error", None, None)
+            res = http_client.HttpResponse()
+            res.body_text = request.url
+            return res
+        finally:
+            self.in_flight[host] -= 1
+
+
+class TestBulkRequests(unittest.TestCase):
+
+    def test_do_services(self):
+        client_of_http = _SlowHttpClient()
+        requests = [ServiceRequest("slow", f"/{idx}") for idx in range(6)] + \
+            [ServiceRequest("fast", f"/{idx}") for idx in range(6)] + [ServiceRequest("fast", "/fail")]
+
+        async def run():
+            client = await client_with_registry(build_applications({"SLOW": ["slow"], "FAST": ["fast"]}))
+            return [res async for res in client.do_services(requests, concurrency=4, concurrency_per_app=2)]
+
+        with mock.patch("py_eureka_client.http_client.http_client", client_of_http):
+            results = asyncio.run(run())
+        assert sorted(res.index for res in results) == list(range(len(requests)))
+        assert results[0].request.app_name == "fast"
+        assert client_of_http.peak == {"slow:8080": 2, "fast:8080": 2}
+        assert [res.result for res in results if res.index == 7] == ["http://fast:8080/1"]
+        failed = [res for res in results if not res.ok]
+        assert len(failed) == 1 and failed[0].index == 12
+
+    def test_requests_are_taken_within_a_window(self):
+        taken = []
+
+        def requests():
+            for idx in range(20):
+                taken.append(idx)
+                yield ServiceRequest("fast", f"/{idx}")
+
+        async def run():
+            client = await client_with_registry(build_applications({"FAST": ["fast"]}))
+            seen = []
+            async for res in client.do_services(requests(), concurrency=2):
+                seen.append((res.index, len(taken)))
+            return seen
+
+        with mock.patch("py_eureka_client.http_client.http_client", _SlowHttpClient()):
+            seen = asyncio.run(run())
+        assert sorted(idx for idx, _ in seen) == list(range(20))
+        # At most 4 requests are in flight or waiting, the first result comes before the rest are taken.
+        assert seen[0][1] <= 6
+
+    def test_close_the_pools_of_all_loops(self):
+        pool = http_client.PooledHttpClient()
+        other = asyncio.new_event_loop()
+        thread = threading.Thread(target=other.run_forever, daemon=True)
+        thread.start()
+
+        async def open_pool():
+            return pool._PooledHttpClient__client()
+
+        try:
+            other_client = asyncio.run_coroutine_threadsafe(open_pool(), other).result(1)
+
+            async def run():
+                client = await open_pool()
+                await pool.aclose()
+                return client
+
+            client = asyncio.run(run())
+            assert client.is_closed
+            assert other_client.is_closed
+        finally:
+            other.call_soon_threadsafe(other.stop)
+            thread.join(1)
+            other.close()
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (c) 2018 Keijack Wu
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import unittest
+import asyncio
+
+from py_eureka_client.concurrency_limit import AdaptiveConcurrencyLimiter, ConcurrencyLimitExceeded, \
+    CONCURRENCY_LIMIT_AIMD, CONCURRENCY_LIMIT_GRADIENT
+
+
+class TestConcurrencyLimit(unittest.TestCase):
+
+    def test_fail_fast_and_queue(self):
+        async def run():
+            limiter = AdaptiveConcurrencyLimiter(CONCURRENCY_LIMIT_AIMD, initial_limit=2, max_limit=2, queue_size=1,
+                                                 queue_timeout_in_secs=0.1)
+            await limiter.acquire("ORDER")
+            await limiter.acquire("ORDER")
+            waiting = asyncio.ensure_future(limiter.acquire("ORDER"))
+            await asyncio.sleep(0)
+            with self.assertRaises(ConcurrencyLimitExceeded):
+                await limiter.acquire("ORDER")
+            limiter.release("ORDER", 0.01)
+            await waiting
+            with self.assertRaises(ConcurrencyLimitExceeded):
+                await limiter.acquire("ORDER")
+            return limiter.snapshot()["ORDER"]
+
+        stats = asyncio.run(run())
+        assert stats["in_flight"] == 2 and stats["queued"] == 0
+        assert stats["accepted"] == 3 and stats["rejected"] == 2
+
+    def test_aimd(self):
+        async def run():
+            limiter = AdaptiveConcurrencyLimiter(CONCURRENCY_LIMIT_AIMD, initial_limit=4)
+            for _ in range(3):
+                await limiter.acquire("ORDER")
+            for _ in range(3):
+                limiter.release("ORDER", 0.01)
+            grown = limiter.snapshot()["ORDER"]["limit"]
+            for _ in range(10):
+                await limiter.acquire("ORDER")
+                limiter.release("ORDER", 1, ConnectionError())
+            return grown, limiter.snapshot()["ORDER"]
+
+        grown, stats = asyncio.run(run())
+        assert grown == 5
+        assert stats["limit"] == 1 and stats["dropped"] == 10
+
+    def test_gradient(self):
+        async def run():
+            limiter = AdaptiveConcurrencyLimiter(CONCURRENCY_LIMIT_GRADIENT, initial_limit=20)
+            for latency in [0.01] * 50:
+                await limiter.acquire("ORDER")
+                limiter.release("ORDER", latency)
+            idle = limiter.snapshot()["ORDER"]["limit"]
+            for latency in [0.1] * 20:
+                await limiter.acquire("ORDER")
+                limiter.release("ORDER", latency)
+            slow = limiter.snapshot()["ORDER"]["limit"]
+            for _ in range(30):
+                for _ in range(slow):
+                    await limiter.acquire("ORDER")
+                for _ in range(slow):
+                    limiter.release("ORDER", 0.01)
+            return idle, slow, limiter.snapshot()["ORDER"]["limit"]
+
+        idle, slow, recovered = asyncio.run(run())
+        assert idle == 20
+        assert slow < 10
+        assert recovered > slow
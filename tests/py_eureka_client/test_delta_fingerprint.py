@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (c) 2018 Keijack Wu
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import unittest
+import asyncio
+import threading
+
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from py_eureka_client.eureka_basic import get_delta_if_changed
+
+_DELTA = b"<applications><versions__delta>3</versions__delta><apps__hashcode>UP_1_</apps__hashcode></applications>"
+
+
+class TestDeltaFingerprint(unittest.TestCase):
+
+    def _serve(self, etag=None):
+        requests = []
+
+        class Handler(BaseHTTPRequestHandler):
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                requests.append(self.headers.get("If-None-Match"))
+                if etag and self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(_DELTA)))
+                if etag:
+                    self.send_header("ETag", etag)
+                self.end_headers()
+                self.wfile.write(_DELTA)
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.shutdown)
+        return f"http://127.0.0.1:{server.server_address[1]}/eureka/", requests
+
+    def test_skip_unchanged_body(self):
+        url, _ = self._serve()
+        delta, fingerprint = asyncio.run(get_delta_if_changed(url))
+        assert delta is not None and delta.versionsDelta == "3"
+        delta, same_fingerprint = asyncio.run(get_delta_if_changed(url, fingerprint=fingerprint))
+        assert delta is None
+        assert same_fingerprint == fingerprint
+
+    def test_etag(self):
+        url, requests = self._serve(etag='"v3"')
+        delta, fingerprint = asyncio.run(get_delta_if_changed(url))
+        assert delta is not None
+        delta, _ = asyncio.run(get_delta_if_changed(url, fingerprint=fingerprint))
+        assert delta is None
+        assert requests == [None, '"v3"']
+
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (c) 2018 Keijack Wu
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import unittest
+import asyncio
+import threading
+
+from unittest import mock
+
+from py_eureka_client import eureka_client
+from py_eureka_client.eureka_basic import Applications
+from py_eureka_client.eureka_client import EurekaClient
+
+
+class TestEmbeddedMode(unittest.TestCase):
+
+    def test_heartbeat_runs_in_the_loop_of_the_caller(self):
+        pulls = []
+
+        async def get_applications(url, regions=[]):
+            pulls.append((asyncio.get_running_loop(), threading.current_thread()))
+            return Applications(apps__hashcode="", versions__delta="1")
+
+        async def run():
+            client = EurekaClient(eureka_server="http://127.0.0.1:8761/eureka", should_register=False,
+                                  renewal_interval_in_secs=0.05, embedded_mode=True)
+            await client.start()
+            await asyncio.sleep(0.3)
+            running = len(pulls)
+            await client.stop()
+            await asyncio.sleep(0.2)
+            return asyncio.get_running_loop(), running
+
+        with mock.patch("py_eureka_client.eureka_client.get_applications", get_applications):
+            loop, running = asyncio.run(run())
+        assert running >= 3
+        assert len(pulls) == running
+        assert all(pull == (loop, threading.main_thread()) for pull in pulls)
+
+    def test_sync_init_rejects_embedded_mode(self):
+        with self.assertRaises(AssertionError):
+            eureka_client.init(eureka_server="http://127.0.0.1:8761/eureka", should_register=False, embedded_mode=True)
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (c) 2018 Keijack Wu
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import unittest
+import asyncio
+import time
+
+from py_eureka_client import http_client
+from py_eureka_client.eureka_client import EurekaClient, EurekaServerConnectionException, FAILOVER_HEDGED
+
+_SERVERS = "http://peer1:8761/eureka,http://peer2:8761/eureka,http://peer3:8761/eureka"
+
+
+class TestHedgedFailover(unittest.TestCase):
+
+    def _client(self, **kwargs):
+        return EurekaClient(eureka_server=_SERVERS, should_register=False, failover_mode=FAILOVER_HEDGED, **kwargs)
+
+    def test_first_success_wins(self):
+        client = self._client(failover_hedge_delay_in_secs=0.05, failover_deadline_in_secs=2)
+        called = []
+        cancelled = []
+
+        async def fun(url):
+            called.append(url)
+            if "peer3" in url:
+                return
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(url)
+                raise
+
+        start = time.monotonic()
+        asyncio.run(client._EurekaClient__connect_to_eureka_server(fun))
+        assert time.monotonic() - start < 1
+        assert len(called) == 3
+        assert len(cancelled) == 2
+
+    def test_failure_tries_next_at_once(self):
+        client = self._client(failover_hedge_delay_in_secs=5, failover_deadline_in_secs=2)
+
+        async def fun(url):
+            if "peer3" not in url:
+                raise http_client.URLError("connection refused")
+
+        start = time.monotonic()
+        asyncio.run(client._EurekaClient__connect_to_eureka_server(fun))
+        assert time.monotonic() - start < 1
+
+    def test_deadline(self):
+        client = self._client(failover_hedge_delay_in_secs=0, failover_deadline_in_secs=0.2)
+
+        async def fun(url):
+            await asyncio.sleep(10)
+
+        start = time.monotonic()
+        with self.assertRaises(EurekaServerConnectionException):
+            asyncio.run(client._EurekaClient__connect_to_eureka_server(fun))
+        assert time.monotonic() - start < 1
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (c) 2018 Keijack Wu
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import unittest
+import time
+
+from py_eureka_client import http_client
+from py_eureka_client.eureka_server_health import EurekaServerHealthTracker, is_server_error
+from py_eureka_client.eureka_server_health import CIRCUIT_CLOSED, CIRCUIT_OPEN, CIRCUIT_HALF_OPEN
+
+
+class TestEurekaServerHealth(unittest.TestCase):
+
+    def test_sort_by_score(self):
+        tracker = EurekaServerHealthTracker()
+        tracker.get("http://a").record_success(0.5)
+        tracker.get("http://b").record_success(0.1)
+        tracker.get("http://c").record_failure(0.1)
+        assert tracker.sort(["http://a", "http://b", "http://c", "http://d"]) == ["http://d", "http://b", "http://a", "http://c"]
+
+    def test_fast_failing_server_sorts_last(self):
+        tracker = EurekaServerHealthTracker(failure_threshold=0)
+        tracker.get("http://dead").record_failure(0.001)
+        tracker.get("http://slow").record_success(0.05)
+        assert tracker.sort(["http://dead", "http://slow"]) == ["http://slow", "http://dead"]
+        tracker = EurekaServerHealthTracker(failure_threshold=1)
+        tracker.get("http://open").record_failure(0.001)
+        tracker.get("http://slow").record_success(10)
+        assert tracker.sort(["http://open", "http://slow"]) == ["http://slow", "http://open"]
+
+    def test_circuit_breaker(self):
+        tracker = EurekaServerHealthTracker(failure_threshold=2, reset_in_secs=0.1)
+        health = tracker.get("http://a")
+        health.record_failure()
+        assert health.allow_request()
+        health.record_failure()
+        assert health.circuit == CIRCUIT_OPEN
+        assert not health.allow_request()
+        time.sleep(0.15)
+        assert health.circuit == CIRCUIT_HALF_OPEN
+        # only one probe is let through
+        assert health.allow_request()
+        assert not health.allow_request()
+        health.record_failure()
+        assert health.circuit == CIRCUIT_OPEN
+        time.sleep(0.15)
+        assert health.allow_request()
+        health.record_success(0.01)
+        assert health.circuit == CIRCUIT_CLOSED
+        assert tracker.snapshot()["http://a"]["failures"] == 3
+
+    def test_server_error(self):
+        assert is_server_error(http_client.URLError("connection refused"))
+        assert is_server_error(http_client.HTTPError("http://a", 503, "", {}, None))
+        assert not is_server_error(http_client.HTTPError("http://a", 404, "", {}, None))
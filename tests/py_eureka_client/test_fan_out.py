@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (c) 2018 Keijack Wu
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import unittest
+import asyncio
+
+from py_eureka_client.eureka_client import WalkNodeException
+from tests.py_eureka_client.registry_fixture import build_applications, client_with_registry
+
+
+class TestFanOut(unittest.TestCase):
+
+    def test_walk_all_nodes(self):
+        running = []
+        peak = []
+
+        async def walker(url):
+            running.append(url)
+            peak.append(len(running))
+            try:
+                if url.startswith("http://node0"):
+                    raise ConnectionError("refused")
+                if url.startswith("http://node1"):
+                    await asyncio.sleep(1)
+                await asyncio.sleep(0.01)
+                return url
+            finally:
+                running.remove(url)
+
+        async def run():
+            client = await client_with_registry(build_applications({"ORDER": [f"node{idx}" for idx in range(5)]}))
+            all_results = await client.walk_all_nodes("order", "/cache", walker=walker, concurrency=2, timeout=0.2)
+            quorum_results = await client.walk_all_nodes("order", "/cache", walker=walker, quorum=True)
+            return all_results, quorum_results
+
+        all_results, quorum_results = asyncio.run(run())
+        assert max(peak[:5]) <= 2
+        assert [res.ok for res in all_results] == [False, False, True, True, True]
+        assert isinstance(all_results[0].error, ConnectionError)
+        assert isinstance(all_results[1].error, asyncio.TimeoutError)
+        assert all_results[2].result == "http://node2:8080/cache"
+        assert len([res for res in quorum_results if res.ok]) == 3
+        assert isinstance(quorum_results[1].error, asyncio.CancelledError)
+
+    def test_walk_no_nodes(self):
+        async def walker(url):
+            return url
+
+        async def run():
+            client = await client_with_registry(build_applications({"ORDER": ["node0"]}))
+            with self.assertRaises(WalkNodeException):
+                await client.walk_all_nodes("stock", "/cache", walker=walker)
+            with self.assertRaises(WalkNodeException):
+                await client.walk_all_nodes("stock", "/cache", walker=walker, quorum=True)
+
+        asyncio.run(run())
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (c) 2018 Keijack Wu
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import unittest
+import asyncio
+import threading
+import time
+
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from py_eureka_client.eureka_basic import Instance
+from py_eureka_client.health_checker import InstanceHealthChecker
+
+
+class TestHealthChecker(unittest.TestCase):
+
+    def setUp(self):
+        class Handler(BaseHTTPRequestHandler):
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                self.send_response(200 if self.path == "/health" else 503)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.shutdown)
+        self.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    def test_skip_unhealthy_instances(self):
+        instances = [Instance(instanceId="ok", healthCheckUrl=f"{self.base_url}/health"),
+                     Instance(instanceId="down", healthCheckUrl=f"{self.base_url}/down"),
+                     Instance(instanceId="no-url")]
+        checker = InstanceHealthChecker(interval_in_secs=0.1, unhealthy_threshold=2)
+
+        async def check_twice():
+            start = time.monotonic()
+            await checker.check(instances)
+            await checker.check(instances)
+            return time.monotonic() - start
+
+        cost = asyncio.run(check_twice())
+        assert cost >= 0.1
+        assert [ins.instanceId for ins in checker.filter(instances)] == ["ok", "no-url"]
+        assert checker.snapshot()["down"]["consecutive_failures"] == 2
+        assert "no-url" not in checker.snapshot()
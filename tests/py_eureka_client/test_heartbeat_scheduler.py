@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (c) 2018 Keijack Wu
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import unittest
+import time
+
+from py_eureka_client.eureka_client import HeartbeatScheduler, AdaptiveFetchInterval
+
+
+class TestHeartbeatScheduler(unittest.TestCase):
+
+    def test_no_drift(self):
+        scheduler = HeartbeatScheduler(interval=30)
+        run_at = scheduler.first_run_at(now=0)
+        assert run_at == 30
+        # the request took 2 seconds, the next run is still planned from the last planned time.
+        run_at = scheduler.next_run_at(run_at, True, now=32)
+        assert run_at == 60
+
+    def test_run_at_once_when_late(self):
+        scheduler = HeartbeatScheduler(interval=30)
+        assert scheduler.next_run_at(30, True, now=100) == 100
+
+    def test_backoff(self):
+        scheduler = HeartbeatScheduler(interval=30, backoff_bound=4)
+        run_at = 0
+        delays = []
+        for _ in range(4):
+            next_run_at = scheduler.next_run_at(run_at, False, now=run_at)
+            delays.append(next_run_at - run_at)
+            run_at = next_run_at
+        assert delays == [60, 120, 120, 120]
+        assert scheduler.next_run_at(run_at, True, now=run_at) - run_at == 30
+        assert scheduler.failures == 0
+
+    def test_jitter(self):
+        scheduler = HeartbeatScheduler(interval=30, jitter_ratio=0.1)
+        for _ in range(100):
+            delay = scheduler.next_run_at(0, True, now=0)
+            assert 27 <= delay <= 33
+
+
+class TestAdaptiveFetchInterval(unittest.TestCase):
+
+    def test_adapt_to_churn(self):
+        adaptive = AdaptiveFetchInterval(30, 5, 120)
+        adaptive.update(10, now=time.monotonic() + 1)
+        assert adaptive.interval == 15
+        for _ in range(5):
+            adaptive.update(3)
+        assert adaptive.interval == 5
+        assert adaptive.churn_rate > 0
+        for _ in range(20):
+            adaptive.update(0)
+        assert adaptive.interval == 120
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (c) 2018 Keijack Wu
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import unittest
+import asyncio
+
+from unittest import mock
+
+from py_eureka_client import http_client
+from py_eureka_client.eureka_basic import Application, Instance, PortWrapper
+from py_eureka_client.eureka_client import EurekaClient
+
+
+class TestInterestedApps(unittest.TestCase):
+
+    def test_load_at_first_use(self):
+        fetched = []
+
+        async def get_application(url, app_name):
+            fetched.append(app_name)
+            await asyncio.sleep(0.05)
+            if app_name == "MISSING":
+                raise http_client.HTTPError(url, 404, "Not Found", None, None)
+            app = Application(name=app_name)
+            app.add_instance(Instance(instanceId=f"{app_name}-1", app=app_name, ipAddr="127.0.0.1",
+                                      hostName="127.0.0.1", port=PortWrapper(8080, True), status="UP"))
+            return app
+
+        async def walker(url):
+            return url
+
+        async def run():
+            client = EurekaClient(eureka_server="http://127.0.0.1:8761/eureka", should_register=False,
+                                  fetch_interested_apps_only=True, interested_apps=["missing"])
+            urls = await asyncio.gather(*[client.walk_nodes("order", "/api", walker=walker) for _ in range(3)])
+            return client, urls
+
+        with mock.patch("py_eureka_client.eureka_client.get_application", get_application):
+            client, urls = asyncio.run(run())
+        assert urls == ["http://127.0.0.1:8080/api"] * 3
+        assert fetched == ["ORDER"]
+        assert client.interested_apps == ["MISSING", "ORDER"]
+        assert [app.name for app in client.applications.applications] == ["ORDER"]
+
+    def test_unknown_app_is_polled_less_often(self):
+        fetched = []
+
+        async def get_application(url, app_name):
+            fetched.append(app_name)
+            raise http_client.HTTPError(url, 404, "Not Found", None, None)
+
+        async def run():
+            client = EurekaClient(eureka_server="http://127.0.0.1:8761/eureka", should_register=False,
+                                  fetch_interested_apps_only=True, interested_apps=["missing"])
+            return [await client.refresh() for _ in range(3)]
+
+        with mock.patch("py_eureka_client.eureka_client.get_application", get_application):
+            results = asyncio.run(run())
+        assert results == [True] * 3
+        assert fetched == ["MISSING"]
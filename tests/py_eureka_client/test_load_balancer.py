@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (c) 2018 Keijack Wu
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import unittest
+
+from py_eureka_client.eureka_basic import Application, Instance
+from py_eureka_client.load_balancer import LoadBalanceStrategy, RoundRobinStrategy, WeightedRandomStrategy, \
+    LeastOutstandingStrategy, LeastLatencyStrategy, ConsistentHashStrategy, get_strategy
+from py_eureka_client import HA_STRATEGY_STICK
+
+
+def _app(*weights):
+    app = Application(name="ORDER")
+    for idx, weight in enumerate(weights):
+        app.add_instance(Instance(instanceId=f"order-{idx}", app="ORDER", status="UP", metadata={"weight": weight}))
+    return app
+
+
+class TestLoadBalancer(unittest.TestCase):
+
+    def test_state_rebuilt_when_app_changes(self):
+        built = []
+
+        class Strategy(LoadBalanceStrategy):
+
+            def build_state(self, app):
+                built.append(app.version)
+                return len(app.instances)
+
+            def select(self, context):
+                return context.candidates[context.state - 1]
+
+        app = _app("1", "1")
+        strategy = Strategy()
+        for _ in range(3):
+            assert strategy.choose(app, app.up_instances).instanceId == "order-1"
+        app.add_instance(Instance(instanceId="order-2", app="ORDER", status="UP"))
+        assert strategy.choose(app, app.up_instances).instanceId == "order-2"
+        assert len(built) == 2
+
+    def test_round_robin(self):
+        app = _app("1", "1", "1")
+        strategy = RoundRobinStrategy()
+        chosen = [strategy.choose(app, app.up_instances).instanceId for _ in range(6)]
+        assert sorted(chosen[:3]) == ["order-0", "order-1", "order-2"]
+        assert chosen[:3] == chosen[3:]
+
+    def test_weighted_random(self):
+        app = _app("0", "3", "bad")
+        strategy = WeightedRandomStrategy(default_weight=0)
+        assert {strategy.choose(app, app.up_instances).instanceId for _ in range(50)} == {"order-1"}
+
+    def test_least_outstanding(self):
+        app = _app("1", "1")
+        strategy = LeastOutstandingStrategy()
+        busy = app.get_instance("order-0")
+        strategy.on_request_start(app.name, busy)
+        assert strategy.choose(app, app.up_instances).instanceId == "order-1"
+        strategy.on_request_end(app.name, busy, 0.1)
+        assert strategy.outstanding("order-0") == 0
+
+    def test_stick_respects_exclusions(self):
+        app = _app("1", "1")
+        strategy = get_strategy(HA_STRATEGY_STICK)
+        first = strategy.choose(app, app.up_instances)
+        assert strategy.choose(app, app.up_instances) is first
+        others = [ins for ins in app.up_instances if ins is not first]
+        assert strategy.choose(app, others, [first.instanceId]) is others[0]
+
+    def test_least_latency_avoids_slow_instance(self):
+        app = _app("1", "1", "1")
+        strategy = LeastLatencyStrategy()
+        for instance in app.up_instances:
+            strategy.on_request_start(app.name, instance)
+            strategy.on_request_end(app.name, instance, 1 if instance.instanceId == "order-0" else 0.01)
+        chosen = [strategy.choose(app, app.up_instances).instanceId for _ in range(100)]
+        assert "order-0" not in chosen
+        assert strategy.stats()["order-0"]["requests"] == 1
+
+        failed = app.get_instance("order-1")
+        strategy.on_request_start(app.name, failed)
+        strategy.on_request_end(app.name, failed, 0.01, ConnectionError())
+        assert strategy.cost("order-1") > strategy.cost("order-2")
+
+    def test_least_latency_counts_in_flight_of_unmeasured_instance(self):
+        app = _app("1", "1")
+        strategy = LeastLatencyStrategy()
+        measured, hung = app.get_instance("order-0"), app.get_instance("order-1")
+        strategy.on_request_start(app.name, measured)
+        strategy.on_request_end(app.name, measured, 0.01)
+        for _ in range(50):
+            strategy.on_request_start(app.name, hung)
+        chosen = [strategy.choose(app, app.up_instances).instanceId for _ in range(100)]
+        assert chosen == ["order-0"] * 100
+
+        app.remove_instance(hung)
+        strategy.choose(app, app.up_instances)
+        assert list(strategy.stats().keys()) == ["order-0"]
+
+    def test_consistent_hash_moves_few_keys(self):
+        app = _app(*["1"] * 4)
+        strategy = ConsistentHashStrategy()
+        keys = [f"user-{idx}" for idx in range(1000)]
+        before = {key: strategy.choose(app, app.up_instances, hash_key=key).instanceId for key in keys}
+        assert before == {key: strategy.choose(app, app.up_instances, hash_key=key).instanceId for key in keys}
+
+        app.add_instance(Instance(instanceId="order-4", app="ORDER", status="UP"))
+        after = {key: strategy.choose(app, app.up_instances, hash_key=key).instanceId for key in keys}
+        moved = [key for key in keys if before[key] != after[key]]
+        assert all(after[key] == "order-4" for key in moved)
+        assert len(moved) < 400
+
+        owner = app.get_instance(after[keys[0]])
+        others = [ins for ins in app.up_instances if ins is not owner]
+        assert strategy.choose(app, others, [owner.instanceId], hash_key=keys[0]) is not owner
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (c) 2018 Keijack Wu
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import unittest
+import time
+
+from py_eureka_client import http_client
+from py_eureka_client.eureka_basic import Instance
+from py_eureka_client.outlier_detection import OutlierDetector, OUTLIER_ACTIVE, OUTLIER_EJECTED, OUTLIER_RECOVERING
+
+
+def _instances(count):
+    return [Instance(instanceId=f"order-{idx}", app="ORDER", status="UP") for idx in range(count)]
+
+
+class TestOutlierDetection(unittest.TestCase):
+
+    def test_eject_after_consecutive_failures(self):
+        detector = OutlierDetector(consecutive_failures=3, base_ejection_in_secs=0.1, reinstatement_in_secs=0.1)
+        instances = _instances(4)
+        detector.filter("ORDER", instances, len(instances))
+        for _ in range(2):
+            detector.record("ORDER", "order-0", ConnectionError())
+        detector.record("ORDER", "order-0", http_client.HTTPError("", 404, "", None, None))
+        assert detector.state_of("order-0") == OUTLIER_ACTIVE
+        detector.record("ORDER", "order-0", http_client.URLError("refused"))
+        assert detector.state_of("order-0") == OUTLIER_EJECTED
+        assert "order-0" not in [ins.instanceId for ins in detector.filter("ORDER", instances)]
+        assert detector.snapshot()["ejected"] == 1
+
+        time.sleep(0.12)
+        assert detector.state_of("order-0") == OUTLIER_RECOVERING
+        detector.record("ORDER", "order-0", TimeoutError())
+        assert detector.state_of("order-0") == OUTLIER_EJECTED
+        assert detector.snapshot()["instances"]["order-0"]["times_ejected"] == 2
+
+    def test_max_ejection_percent(self):
+        detector = OutlierDetector(consecutive_failures=1, max_ejection_percent=50)
+        instances = _instances(4)
+        detector.filter("ORDER", instances, len(instances))
+        for instance in instances:
+            detector.record("ORDER", instance.instanceId, ConnectionError())
+        assert len(detector.filter("ORDER", instances)) == 2
+        assert detector.ejections_total == 2
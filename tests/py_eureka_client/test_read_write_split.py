@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (c) 2018 Keijack Wu
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import unittest
+import asyncio
+
+from unittest import mock
+
+from py_eureka_client import http_client
+from py_eureka_client.eureka_client import EurekaClient
+from tests.py_eureka_client.registry_fixture import build_applications
+
+_PEER1 = "http://peer1:8761/eureka"
+_PEER2 = "http://peer2:8761/eureka"
+_PEER3 = "http://peer3:8761/eureka"
+
+
+class TestReadWriteSplit(unittest.TestCase):
+
+    def setUp(self):
+        self.reached = []
+        self.down = set()
+
+        def reach(op, url):
+            self.reached.append((op, url))
+            if url in self.down:
+                raise http_client.URLError("connection refused")
+
+        async def get_applications(url, regions=[]):
+            reach("fetch", url)
+            return build_applications({"ORDER": ["node0"]})
+
+        async def register(url, instance):
+            reach("register", url)
+
+        async def send_heartbeat(url, *args, **kwargs):
+            reach("renew", url)
+
+        patches = [mock.patch("py_eureka_client.eureka_client.get_applications", get_applications),
+                   mock.patch("py_eureka_client.eureka_client._register", register),
+                   mock.patch("py_eureka_client.eureka_client.send_heartbeat", send_heartbeat)]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def _client(self):
+        client = EurekaClient(eureka_server=",".join([_PEER1, _PEER2, _PEER3]), app_name="cart", instance_id="cart-1",
+                              instance_host="cart", instance_ip="127.0.0.1", eureka_server_read_write_split=True)
+        asyncio.run(client._EurekaClient__parepare_instance_info())
+        return client
+
+    def _measure(self, client, latencies):
+        for url, latency in latencies.items():
+            health = client._EurekaClient__eureka_server_health.get(url)
+            health.start_request()
+            health.record_success(latency)
+
+    def _reached(self, op):
+        return [url for _op, url in self.reached if _op == op]
+
+    def test_writes_stick_to_the_lease_owner(self):
+        client = self._client()
+
+        async def run():
+            await client.register()
+            # Another server becomes the fastest, the lease should not move to it.
+            self._measure(client, {_PEER1: 0.5, _PEER2: 0.1, _PEER3: 0.01})
+            for _ in range(3):
+                await client.send_heartbeat()
+            await client.refresh()
+
+        asyncio.run(run())
+        assert self._reached("register") == [_PEER1]
+        assert self._reached("renew") == [_PEER1] * 3
+        assert self._reached("fetch") == [_PEER3]
+
+    def test_writes_move_to_another_server_when_the_lease_owner_is_down(self):
+        client = self._client()
+
+        async def run():
+            await client.register()
+            self.down.add(_PEER1)
+            await client.send_heartbeat()
+            # The new owner keeps the lease even if the old one recovers.
+            self.down.clear()
+            await client.send_heartbeat()
+
+        asyncio.run(run())
+        assert self._reached("register") == [_PEER1]
+        assert self._reached("renew") == [_PEER1, _PEER2, _PEER2]
+
+    def test_reads_go_to_the_best_ranked_server(self):
+        client = self._client()
+        self._measure(client, {_PEER1: 0.1, _PEER2: 0.01, _PEER3: 0.5})
+        asyncio.run(client.refresh())
+        assert self._reached("fetch") == [_PEER2]
+
+    def test_read_fails_over_to_another_replica(self):
+        client = self._client()
+        self._measure(client, {_PEER1: 0.1, _PEER2: 0.01, _PEER3: 0.5})
+        self.down.add(_PEER2)
+        assert asyncio.run(client.refresh())
+        assert self._reached("fetch") == [_PEER2, _PEER1]
+        assert len(client.applications.applications) == 1
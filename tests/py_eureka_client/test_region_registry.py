@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (c) 2018 Keijack Wu
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import unittest
+import asyncio
+
+from unittest import mock
+
+from py_eureka_client import http_client
+from py_eureka_client.eureka_basic import Application, Applications, Instance
+from py_eureka_client.eureka_client import EurekaClient, _merge_regions
+
+
+def _applications(**apps):
+    applications = Applications()
+    for app_name, statuses in apps.items():
+        app = Application(name=app_name)
+        for idx, status in enumerate(statuses):
+            app.add_instance(Instance(instanceId=f"{app_name}-{idx}", app=app_name, status=status))
+        applications.add_application(app)
+    return applications
+
+
+class TestMergeRegions(unittest.TestCase):
+
+    def test_prefer_local_region(self):
+        local = _applications(ORDER=["UP"], USER=["DOWN"])
+        west = _applications(ORDER=["UP", "UP"], USER=["UP"], STOCK=["UP"])
+        east = _applications(USER=["UP", "UP"])
+        merged = _merge_regions(local, [west, east])
+        assert [app.name for app in merged.applications] == ["ORDER", "USER", "STOCK"]
+        assert merged.get_application("ORDER") is local.get_application("ORDER")
+        assert merged.get_application("USER") is west.get_application("USER")
+        assert merged.get_application("STOCK") is west.get_application("STOCK")
+
+    def test_no_up_instances(self):
+        local = _applications(ORDER=["DOWN"])
+        merged = _merge_regions(None, [_applications(), local])
+        assert merged.get_application("ORDER") is local.get_application("ORDER")
+
+    def test_failing_region_does_not_hold_up_the_others(self):
+        pulled = []
+
+        async def get_applications(url, regions=[]):
+            pulled.append(regions)
+            if regions == ["eu-west-1"]:
+                raise http_client.URLError("timed out")
+            return _applications(ORDER=["UP"]) if not regions else _applications(ORDER=["UP"], STOCK=["UP"])
+
+        async def run():
+            client = EurekaClient(eureka_server="http://127.0.0.1:8761/eureka", should_register=False,
+                                  remote_regions=["us-west-1", "eu-west-1"])
+            return await client.refresh(), client.applications
+
+        with mock.patch("py_eureka_client.eureka_client.get_applications", get_applications):
+            succeeded, applications = asyncio.run(run())
+        assert not succeeded
+        assert pulled.count(["us-west-1"]) == 1 and ["eu-west-1"] in pulled
+        assert [app.name for app in applications.applications] == ["ORDER", "STOCK"]
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (c) 2018 Keijack Wu
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import unittest
+import asyncio
+
+from unittest import mock
+
+from py_eureka_client import http_client
+from py_eureka_client.eureka_basic import Applications
+from py_eureka_client.eureka_client import EurekaClient, DiscoverException
+
+
+class TestRegistryRefresh(unittest.TestCase):
+
+    def test_concurrent_refreshes_share_one_pull(self):
+        pulled = []
+
+        async def get_applications(url, regions=[]):
+            pulled.append(url)
+            await asyncio.sleep(0.1)
+            return Applications(apps__hashcode="", versions__delta="1")
+
+        async def run():
+            client = EurekaClient(eureka_server="http://127.0.0.1:8761/eureka", should_register=False)
+            return await asyncio.gather(*[client.refresh() for _ in range(5)])
+
+        with mock.patch("py_eureka_client.eureka_client.get_applications", get_applications):
+            results = asyncio.run(run())
+        assert results == [True] * 5
+        assert len(pulled) == 1
+
+    def test_failed_full_pull_fails_refresh(self):
+        async def get_applications(url, regions=[]):
+            raise http_client.URLError("connection refused")
+
+        async def run():
+            client = EurekaClient(eureka_server="http://127.0.0.1:8761/eureka", should_register=False)
+            return await client.refresh(), client.applications
+
+        with mock.patch("py_eureka_client.eureka_client.get_applications", get_applications):
+            succeeded, applications = asyncio.run(run())
+        assert succeeded is False
+        assert applications is None
+
+    def test_calls_do_not_pull_again_after_a_failed_pull(self):
+        pulled = []
+
+        async def get_applications(url, regions=[]):
+            pulled.append(url)
+            await asyncio.sleep(0.05)
+            raise http_client.URLError("connection refused")
+
+        async def walker(url):
+            return url
+
+        async def call(client):
+            try:
+                await client.walk_nodes("order", "/api", walker=walker)
+            except DiscoverException:
+                return False
+            return True
+
+        async def run():
+            client = EurekaClient(eureka_server="http://127.0.0.1:8761/eureka", should_register=False, wait_for_ready_in_secs=0.01)
+            return await asyncio.gather(*[call(client) for _ in range(5)]) + [await call(client) for _ in range(5)]
+
+        with mock.patch("py_eureka_client.eureka_client.get_applications", get_applications):
+            results = asyncio.run(run())
+        assert results == [False] * 10
+        assert len(pulled) == 1
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (c) 2018 Keijack Wu
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import os
+import tempfile
+import unittest
+import asyncio
+
+from unittest import mock
+
+from py_eureka_client.eureka_client import _applications_hash
+from py_eureka_client.eureka_basic import Instance, Application, Applications, PortWrapper
+from py_eureka_client.registry_snapshot import applications_to_dict, save_snapshot, load_snapshot, dumps
+from tests.py_eureka_client.registry_fixture import build_applications, client_with_registry
+
+
+def _applications():
+    applications = Applications(apps__hashcode="UP_2_", versions__delta="3")
+    app = Application(name="OTHER-SERVICE")
+    for i in range(2):
+        app.add_instance(Instance(instanceId=f"ins-{i}", app="OTHER-SERVICE", ipAddr=f"10.0.0.{i}", hostName=f"host-{i}",
+                                  port=PortWrapper(port=8080, enabled=True), status="UP", metadata={"zone": "zone1"}))
+    applications.add_application(app)
+    return applications
+
+
+class TestRegistrySnapshot(unittest.TestCase):
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "registry.snapshot")
+            save_snapshot(path, applications_to_dict(_applications()))
+            applications = load_snapshot(path, 60)
+            assert applications.appsHashcode == "UP_2_"
+            assert applications.versionsDelta == "3"
+            app = applications.get_application("OTHER-SERVICE")
+            assert len(app.up_instances) == 2
+            ins = app.get_instance("ins-1")
+            assert ins.ipAddr == "10.0.0.1"
+            assert ins.port.port == 8080 and ins.port.enabled
+            assert ins.zone == "zone1"
+
+    def test_stale_and_broken(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "registry.snapshot")
+            with open(path, "wb") as f:
+                f.write(dumps(applications_to_dict(_applications()), saved_at=0))
+            assert load_snapshot(path, 60) is None
+            assert load_snapshot(path, 0) is not None
+            with open(path, "wb") as f:
+                f.write(b"broken")
+            assert load_snapshot(path, 60) is None
+            open(path, "wb").close()
+            assert load_snapshot(path, 60) is None
+            assert load_snapshot(os.path.join(tmp_dir, "not-exists"), 60) is None
+
+    def test_save_only_when_changed(self):
+        saved = []
+        deltas = [Applications(apps__hashcode=_applications_hash(build_applications({"ORDER": ["node0"]})), versions__delta="2")]
+        delta = Applications(apps__hashcode=_applications_hash(build_applications({"ORDER": ["node0", "node1"]})), versions__delta="3")
+        delta.add_application(build_applications({"ORDER": ["node0", "node1"]}).get_application("ORDER"))
+        deltas.append(delta)
+
+        def save(path, data):
+            saved.append([len(instances) for _, instances in data["applications"]])
+
+        async def get_delta_if_changed(url, regions=[], fingerprint=""):
+            return deltas.pop(0), fingerprint
+
+        async def run():
+            client = await client_with_registry(build_applications({"ORDER": ["node0"]}), registry_snapshot_path="registry.snapshot")
+            assert await client.refresh()
+            assert await client.refresh()
+
+        with mock.patch("py_eureka_client.eureka_client.save_snapshot", save), \
+                mock.patch("py_eureka_client.eureka_client.get_delta_if_changed", get_delta_if_changed):
+            asyncio.run(run())
+        assert saved == [[1], [2]]
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (c) 2018 Keijack Wu
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import unittest
+import asyncio
+
+from unittest import mock
+
+from py_eureka_client import http_client
+from py_eureka_client.eureka_client import WalkNodeException
+from py_eureka_client.retry import RetryPolicy, RetryBudget
+from tests.py_eureka_client.registry_fixture import build_applications, client_with_registry
+
+
+_REGISTRY = build_applications({"ORDER": [f"node{idx}" for idx in range(4)]})
+
+
+class _UnavailableHttpClient(http_client.HttpClient):
+
+    def __init__(self):
+        self.calls = []
+
+    async def urlopen(self, request=None, data=None, timeout=None):
+        self.calls.append((request.method, request.url))
+        raise http_client.HTTPError(request.url, 503, "Service Unavailable", None, None)
+
+
+class TestRetry(unittest.TestCase):
+
+    def test_policy(self):
+        policy = RetryPolicy(max_attempts=3, backoff_in_secs=0.1, backoff_max_in_secs=0.3, retry_on_status_codes=[503])
+        assert policy.can_attempt(2) and not policy.can_attempt(3)
+        assert all(0 <= policy.backoff(retries) <= 0.3 for retries in range(1, 10) for _ in range(10))
+        error = http_client.HTTPError("http://node0/", 503, "Service Unavailable", None, None)
+        assert policy.retry_on_status(error, policy.is_idempotent("get"))
+        assert not policy.retry_on_status(error, policy.is_idempotent("POST"))
+
+    def test_budget(self):
+        budget = RetryBudget(ratio=0.1, min_retries_per_sec=0.1, window_in_secs=10)
+        for _ in range(20):
+            budget.record_request()
+        assert [budget.try_retry() for _ in range(4)] == [True, True, True, False]
+        assert budget.snapshot() == {"requests": 20, "retries": 3, "exhausted": 1}
+
+    def test_retry_in_do_service(self):
+        client_of_http = _UnavailableHttpClient()
+
+        async def run():
+            client = await client_with_registry(_REGISTRY, strict_service_error_policy=False, retry_max_attempts=3,
+                                                retry_on_status_codes=[503], retry_budget_ratio=1, retry_budget_min_per_sec=0.1)
+            errors = []
+            for method in ("GET", "POST"):
+                try:
+                    await client.do_service("order", "/api", method=method)
+                except http_client.URLError as e:
+                    errors.append(e)
+            return errors, client.retry_stats
+
+        with mock.patch("py_eureka_client.http_client.http_client", client_of_http):
+            errors, stats = asyncio.run(run())
+        assert isinstance(errors[0], WalkNodeException) and len(errors[0].node_errors) == 3
+        assert errors[1].code == 503 and not isinstance(errors[1], WalkNodeException)
+        assert [method for method, _ in client_of_http.calls] == ["GET"] * 3 + ["POST"]
+        assert stats["retries"] == 2
+
+    def test_default_settings_do_not_replay_post(self):
+        client_of_http = _UnavailableHttpClient()
+
+        async def run():
+            client = await client_with_registry(_REGISTRY)
+            errors = []
+            for method in ("GET", "POST"):
+                try:
+                    await client.do_service("order", "/api", method=method)
+                except http_client.URLError as e:
+                    errors.append(e)
+            return errors
+
+        with mock.patch("py_eureka_client.http_client.http_client", client_of_http):
+            errors = asyncio.run(run())
+        assert isinstance(errors[0], WalkNodeException) and len(errors[0].node_errors) == 4
+        assert errors[1].code == 503 and not isinstance(errors[1], WalkNodeException)
+        assert [method for method, _ in client_of_http.calls] == ["GET"] * 4 + ["POST"]
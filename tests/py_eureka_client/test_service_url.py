@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (c) 2018 Keijack Wu
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import unittest
+
+from py_eureka_client.eureka_basic import Application, Instance, PortWrapper
+
+
+class TestServiceUrl(unittest.TestCase):
+
+    def test_base_urls(self):
+        app = Application(name="ORDER")
+        app.add_instance(Instance(instanceId="order-0", app="ORDER", ipAddr="10.0.0.1", hostName="order.local",
+                                  port=PortWrapper(port=80, enabled=True), securePort=PortWrapper(port=8443, enabled=True)))
+        instance = app.get_instance("order-0")
+        assert instance.base_url() == "http://order.local/"
+        assert instance.base_url(prefer_ip=True, prefer_https=True) == "https://10.0.0.1:8443/"
+
+        updated = Instance(instanceId="order-0", app="ORDER", ipAddr="10.0.0.2", hostName="order.local",
+                           port=PortWrapper(port=0, enabled=False), securePort=PortWrapper(port=443, enabled=True))
+        app.update_instance(updated)
+        assert app.get_instance("order-0").base_url(prefer_ip=True) == "https://10.0.0.2/"
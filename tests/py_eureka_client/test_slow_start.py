@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (c) 2018 Keijack Wu
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import time
+import unittest
+
+from py_eureka_client.eureka_basic import Application, Instance, LeaseInfo
+from py_eureka_client.slow_start import SlowStart, SLOW_START_EXPONENTIAL
+
+
+def _instance(instance_id, up_secs_ago=None):
+    lease = LeaseInfo(serviceUpTimestamp=int((time.time() - up_secs_ago) * 1000)) if up_secs_ago is not None else LeaseInfo()
+    return Instance(instanceId=instance_id, app="ORDER", status="UP", leaseInfo=lease)
+
+
+class TestSlowStart(unittest.TestCase):
+
+    def test_weight_by_service_up_timestamp(self):
+        slow_start = SlowStart(window_in_secs=100, min_weight=0.1)
+        assert slow_start.weight_of("ORDER", _instance("old", 200)) == 1
+        assert abs(slow_start.weight_of("ORDER", _instance("new", 50)) - 0.55) < 0.01
+        assert "new" in slow_start.snapshot()["ORDER"]
+
+        slow_start.configure("order", curve=SLOW_START_EXPONENTIAL)
+        assert abs(slow_start.weight_of("ORDER", _instance("new", 50)) - 0.316) < 0.01
+        slow_start.configure("order", window_in_secs=0)
+        assert slow_start.weight_of("ORDER", _instance("new", 50)) == 1
+
+    def test_first_seen_instances(self):
+        app = Application(name="ORDER")
+        app.add_instance(_instance("order-0"))
+        slow_start = SlowStart(window_in_secs=100, min_weight=0.01)
+        assert slow_start.filter(app, app.instances) == app.instances
+
+        app.add_instance(_instance("order-1"))
+        kept = [len(slow_start.filter(app, app.instances)) for _ in range(100)]
+        assert sum(kept) < 150
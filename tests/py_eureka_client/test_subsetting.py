@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (c) 2018 Keijack Wu
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import asyncio
+import collections
+import unittest
+
+from py_eureka_client import HA_STRATEGY_CONSISTENT_HASH
+from py_eureka_client.eureka_basic import Application, Instance
+from py_eureka_client.subsetting import Subsetter, subset
+from tests.py_eureka_client.registry_fixture import build_applications, client_with_registry
+
+
+def _app(name, count, zones=("a",)):
+    app = Application(name=name)
+    for idx in range(count):
+        app.add_instance(Instance(instanceId=f"{name.lower()}-{idx}", app=name, status="UP",
+                                  metadata={"zone": zones[idx % len(zones)]}))
+    return app
+
+
+class TestSubsetting(unittest.TestCase):
+
+    def test_subsets_are_even(self):
+        instance_ids = [f"order-{idx}" for idx in range(800)]
+        connections = collections.Counter()
+        for client_index in range(2000):
+            ids = subset(instance_ids, client_index, 20)
+            assert len(set(ids)) == 20
+            connections.update(ids)
+        assert min(connections.values()) >= 40 and max(connections.values()) <= 60
+        assert subset(instance_ids, 7, 20) == subset(list(reversed(instance_ids)), 7, 20)
+
+    def test_subset_in_each_zone(self):
+        app = _app("ORDER", 30, zones=("a", "b"))
+        subsetter = Subsetter(subset_size=5)
+        ids = subsetter.subset_of(app, "cart-3")
+        assert len(ids) == 10
+        assert len([ins for ins in app.instances if ins.instanceId in ids and ins.zone == "a"]) == 5
+
+        down = app.get_instance("order-0")
+        app.update_instance(Instance(instanceId=down.instanceId, app="ORDER", status="DOWN", metadata=down.metadata))
+        assert subsetter.subset_of(app, "cart-3") == ids
+        assert len(subsetter.filter(app, app.up_instances, "cart-3")) >= 9
+
+    def test_hash_key_is_not_limited_to_subset(self):
+        registry = build_applications({"ORDER": [f"node{idx}" for idx in range(10)]})
+
+        async def walker(url):
+            return url
+
+        async def run():
+            clients = [await client_with_registry(registry, instance_id=f"cart-{idx}", subset_size=2,
+                                                  ha_strategy=HA_STRATEGY_CONSISTENT_HASH) for idx in range(5)]
+            return [{await client.walk_nodes("order", "/", walker=walker, hash_key=f"user-{key}") for client in clients}
+                    for key in range(20)]
+
+        assert all(len(urls) == 1 for urls in asyncio.run(run()))
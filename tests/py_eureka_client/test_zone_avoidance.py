@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (c) 2018 Keijack Wu
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import unittest
+
+from py_eureka_client.eureka_basic import Instance
+from py_eureka_client.zone_avoidance import ZoneAvoidance
+
+
+def _instances(zone, count):
+    return [Instance(instanceId=f"{zone}-{idx}", app="ORDER", status="UP", metadata={"zone": zone}) for idx in range(count)]
+
+
+class TestZoneAvoidance(unittest.TestCase):
+
+    def test_spill_by_error_rate(self):
+        avoidance = ZoneAvoidance(enabled=True, error_rate_threshold=0.2)
+        local, others = _instances("a", 2), _instances("b", 2)
+        assert avoidance.choose("ORDER", "a", local, others) is local
+        for _ in range(3):
+            avoidance.on_request_start("ORDER", "a")
+            avoidance.on_request_end("ORDER", "a", 1, ConnectionError())
+        ratio = avoidance.spill_ratio("ORDER", "a", local, others)
+        assert 0 < ratio < 1
+        for _ in range(20):
+            avoidance.on_request_start("ORDER", "a")
+            avoidance.on_request_end("ORDER", "a", 1, ConnectionError())
+        assert avoidance.spill_ratio("ORDER", "a", local, others) == 1
+        assert avoidance.choose("ORDER", "a", local, others) is others
+        assert avoidance.snapshot()["ORDER"]["a"]["spilled"] == 1
+
+    def test_spill_by_load(self):
+        avoidance = ZoneAvoidance(enabled=True, max_load_per_instance=2)
+        local, others = _instances("a", 2), _instances("b", 2)
+        for _ in range(8):
+            avoidance.on_request_start("ORDER", "a")
+        assert avoidance.spill_ratio("ORDER", "a", local, others) == 0.5
+        assert avoidance.spill_ratio("ORDER", "a", local, []) == 0